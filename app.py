@@ -1,46 +1,275 @@
-from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for, make_response
+from flask import Flask, Request, render_template, request, jsonify, send_file, flash, redirect, url_for, make_response, g, Response, stream_with_context
 import os
 import io
+import json
+import time
 import base64
+import queue
+import tempfile
+import threading
+import uuid
+import zipfile
 from werkzeug.utils import secure_filename
-from ciphers.shift_cipher import ShiftCipher
-from ciphers.substitution_cipher import SubstitutionCipher
-from ciphers.affine_cipher import AffineCipher
-from ciphers.vigenere_cipher import VigenereCipher
-from ciphers.hill_cipher import HillCipher
-from ciphers.permutation_cipher import PermutationCipher
-from ciphers.onetimepad_cipher import OneTimePadCipher
-from ciphers.playfair_cipher import PlayfairCipher
+from collections import ChainMap, deque
+from concurrent.futures import ThreadPoolExecutor
+from ciphers.registry import CipherRegistry
+from ciphers.pipeline_cipher import PipelineCipher
 from utils.file_handler import FileHandler
 from utils.crypto_utils import CryptoUtils
-from utils.file_processor import FileProcessor
+from utils.file_processor import BoundedReader, FileProcessor, COMPRESSORS
+from utils.metrics import Metrics
+from utils.result_cache import ResultCache
+from utils.artifact_registry import ArtifactRegistry
+from utils.cipher_executor import CipherExecutor, CipherQueueFull
+from cryptanalysis.dictionary_attack import ATTACK_CIPHERS, DictionaryAttack, load_wordlist, parse_wordlist
+from cryptanalysis.classifier import identify_cipher
+from cryptanalysis.two_time_pad import CribDragger, read_ciphertext, scan_folder
+from cryptanalysis.solvers import SOLVER_CIPHERS, create_solver
+from cryptanalysis.checkpoint import Checkpoint
+
+class UploadRequest(Request):
+    """Request that spools uploads in memory up to UPLOAD_SPOOL_SIZE before using an anonymous temp file"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=app.config['UPLOAD_SPOOL_SIZE'], mode='rb+')
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.secret_key = 'your-secret-key-here'
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['ENCRYPTED_FOLDER'] = 'encrypted'
 app.config['TEMP_FOLDER'] = 'temp'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['UPLOAD_SPOOL_SIZE'] = 4 * 1024 * 1024  # uploads up to 4MB never touch the disk
+app.config['RESULT_CACHE_MAX_BYTES'] = 256 * 1024 * 1024  # disk budget for cached encryption results
+app.config['ARTIFACT_DB'] = os.path.join(app.config['ENCRYPTED_FOLDER'], '.artifacts.db')
+app.config['ARTIFACT_TTL'] = 24 * 60 * 60  # generated files expire after 24 hours
+app.config['ARTIFACT_QUOTA_BYTES'] = 1024 * 1024 * 1024  # disk budget for all generated files
+app.config['MAX_GENERATED_KEYS'] = 100000  # upper bound for /generate_keys?count=N
+app.config['CIPHER_WORKERS'] = os.cpu_count() or 1  # worker processes for large cipher calls (0 runs everything inline)
+app.config['CIPHER_QUEUE_DEPTH'] = 32  # calls allowed to wait for a worker before answering 429
+app.config['INLINE_CIPHER_BYTES'] = 64 * 1024  # letter buffers up to this size run in the request thread
+app.config['CIPHER_SEGMENT_THREADS'] = 1  # threads each worker splits one large letter buffer across
+app.config['STREAM_CHUNK_SIZE'] = 64 * 1024  # characters read per step by /decrypt_stream
+app.config['BATCH_DECRYPT_WORKERS'] = os.cpu_count() or 1  # members of one /batch_decrypt package decrypted at once
+app.config['BATCH_DECRYPT_MAX_MEMBER_BYTES'] = 64 * 1024 * 1024  # largest uncompressed .dat member /batch_decrypt accepts
+app.config['MAX_DECOMPRESSED_BYTES'] = 64 * 1024 * 1024  # most letters a compressed .dat payload may expand to
+app.config['PAYLOAD_COMPRESSION'] = None  # default .dat payload compression: None, 'zlib' or 'lzma'
+app.config['WORDLIST_PATH'] = None  # wordlist used by /dictionary_attack when none is uploaded
+app.config['ATTACK_JOBS'] = 1  # worker processes per dictionary attack
+app.config['ATTACK_MAX_WORDS'] = 500000  # distinct words an uploaded /dictionary_attack wordlist may hold
+app.config['ATTACK_MAX_LETTERS'] = 1024 * 1024  # ciphertext letters /dictionary_attack accepts
+app.config['AUTO_ATTACK_MIN_PROBABILITY'] = 0.05  # cipher_type=auto attacks a type only if it is at least this likely
+app.config['PAD_REUSE_MAX_LETTERS'] = 4096  # leading letters of each stored OTP ciphertext compared by /pad_reuse
+app.config['CRIB_DRAG_MAX_LETTERS'] = 1024 * 1024  # letters of each ciphertext loaded by /crib_drag
+app.config['CRACK_MAX_SECONDS'] = 120  # longest key search /crack runs
+app.config['CRACK_PROGRESS_INTERVAL'] = 0.5  # seconds between best-so-far events streamed by /crack
+app.config['SEARCH_MAX_CONCURRENT'] = 2  # searches run by /crack and /dictionary_attack at once before answering 429
+app.config['CHECKPOINT_FOLDER'] = 'checkpoints'  # saved state of /crack and /dictionary_attack searches
+app.config['CHECKPOINT_INTERVAL'] = 10  # seconds between checkpoint saves of a running search
 
 # Ensure directories exist
-for folder in [app.config['UPLOAD_FOLDER'], app.config['ENCRYPTED_FOLDER'], app.config['TEMP_FOLDER']]:
+for folder in [app.config['UPLOAD_FOLDER'], app.config['ENCRYPTED_FOLDER'], app.config['TEMP_FOLDER'],
+               app.config['CHECKPOINT_FOLDER']]:
     os.makedirs(folder, exist_ok=True)
 
 # Initialize handlers
 file_handler = FileHandler(app.config['UPLOAD_FOLDER'])
-file_processor = FileProcessor(app.config['ENCRYPTED_FOLDER'])
-
-# Initialize cipher classes
-ciphers = {
-    'shift': ShiftCipher(),
-    'substitution': SubstitutionCipher(),
-    'affine': AffineCipher(),
-    'vigenere': VigenereCipher(),
-    'hill': HillCipher(),
-    'permutation': PermutationCipher(),
-    'onetimepad': OneTimePadCipher(),
-    'playfair': PlayfairCipher()
-}
+file_processor = FileProcessor(app.config['ENCRYPTED_FOLDER'], app.config['MAX_DECOMPRESSED_BYTES'])
+artifacts = ArtifactRegistry(app.config['ARTIFACT_DB'], app.config['ARTIFACT_TTL'], app.config['ARTIFACT_QUOTA_BYTES'])
+result_cache = ResultCache(app.config['ENCRYPTED_FOLDER'], app.config['RESULT_CACHE_MAX_BYTES'],
+                           on_evict=lambda path: artifacts.unregister(os.path.basename(path)))
+metrics = Metrics()
+metrics.describe('request_duration_seconds', 'histogram', 'Request latency by route and cipher')
+metrics.describe('stage_duration_seconds', 'histogram', 'Latency of individual request stages')
+metrics.describe('request_bytes_in_total', 'counter', 'Request body bytes received')
+metrics.describe('request_bytes_out_total', 'counter', 'Response body bytes sent')
+metrics.describe('request_failures_total', 'counter', 'Requests answered with an error status')
+
+# Cipher instances are created on first use
+ciphers = CipherRegistry()
+pipeline_cipher = PipelineCipher(ciphers)
+
+def record_offload(wait, service):
+    """Record queue wait and worker time of an offloaded cipher call"""
+    metrics.observe('cipher_queue_wait_seconds', wait)
+    metrics.observe('cipher_worker_seconds', service)
+
+cipher_executor = CipherExecutor(ChainMap({'pipeline': pipeline_cipher}, ciphers), app.config['CIPHER_WORKERS'],
+                                 app.config['CIPHER_QUEUE_DEPTH'], app.config['INLINE_CIPHER_BYTES'],
+                                 app.config['CIPHER_SEGMENT_THREADS'], on_complete=record_offload)
+metrics.describe('cipher_queue_wait_seconds', 'histogram', 'Time offloaded cipher calls waited for a worker')
+metrics.describe('cipher_worker_seconds', 'histogram', 'Time offloaded cipher calls spent in a worker')
+
+def collect_key_cache_metrics():
+    """Report compiled-key cache counters of every cipher"""
+    for cipher_type, cipher in ciphers.loaded().items():
+        yield ('key_cache_hits_total', 'counter', 'Compiled key cache hits', {'cipher': cipher_type}, cipher.key_cache_hits)
+        yield ('key_cache_misses_total', 'counter', 'Compiled key cache misses', {'cipher': cipher_type}, cipher.key_cache_misses)
+
+metrics.register_collector(collect_key_cache_metrics)
+
+def collect_result_cache_metrics():
+    """Report encryption result cache counters"""
+    stats = result_cache.stats()
+    for name in ('hits', 'misses', 'coalesced', 'evictions'):
+        yield (f'result_cache_{name}_total', 'counter', f'Encryption result cache {name}', {}, stats[name])
+    yield ('result_cache_bytes', 'gauge', 'Bytes held by the encryption result cache', {}, stats['bytes'])
+
+metrics.register_collector(collect_result_cache_metrics)
+
+def collect_executor_metrics():
+    """Report worker pool queue depth and call counters"""
+    stats = cipher_executor.stats()
+    yield ('cipher_workers', 'gauge', 'Cipher worker processes', {}, stats['workers'])
+    yield ('cipher_queue_depth', 'gauge', 'Cipher calls waiting for a worker', {}, stats['queue_depth'])
+    yield ('cipher_pending', 'gauge', 'Offloaded cipher calls in flight', {}, stats['pending'])
+    for name in ('inline', 'offloaded', 'rejected'):
+        yield ('cipher_calls_total', 'counter', 'Cipher calls by execution mode', {'mode': name}, stats[name])
+
+metrics.register_collector(collect_executor_metrics)
+
+def classify_artifact(filename):
+    """Kind of a file found in ENCRYPTED_FOLDER at startup, or None to leave it alone"""
+    if filename.endswith('.zip'):
+        return 'package'
+    if filename.startswith('decrypted_'):
+        return 'decrypted'
+    if filename.endswith('.dat'):
+        return 'encrypted'
+    return None
+
+def forget_cached_artifact(row):
+    """Keep the result cache in step with files the registry deletes"""
+    if result_cache.owns(row['name']):
+        result_cache.discard(row['name'])
+
+artifacts.on_delete(forget_cached_artifact)
+artifacts.adopt_folder(app.config['ENCRYPTED_FOLDER'], classify_artifact)
+# Uploads are spooled by UploadRequest; files left in TEMP_FOLDER by older versions expire like any artifact
+artifacts.adopt_folder(app.config['TEMP_FOLDER'], lambda filename: 'temp')
+artifacts.adopt_folder(app.config['CHECKPOINT_FOLDER'],
+                       lambda filename: 'checkpoint' if filename.endswith('.json') else None)
+artifacts.start_reaper()
+
+def collect_artifact_metrics():
+    """Report disk usage of generated files"""
+    usage = artifacts.usage()
+    yield ('artifacts', 'gauge', 'Generated files awaiting download', {}, usage['artifacts'])
+    yield ('artifact_bytes', 'gauge', 'Bytes held by generated files', {}, usage['bytes'])
+
+metrics.register_collector(collect_artifact_metrics)
+
+def run_cipher(cipher_type, operation, text, key, labels):
+    """Run encrypt/decrypt over the letter buffer, timing each stage"""
+    cipher = cipher_executor.registry[cipher_type]
+    with metrics.time_stage('clean', **labels):
+        buffer = cipher.to_buffer(text)
+    with metrics.time_stage('cipher', **labels):
+        result = cipher_executor.run(cipher_type, operation, buffer, key)
+    with metrics.time_stage('format', **labels):
+        return cipher.from_buffer(result)
+
+def requested_compression():
+    """Payload compression asked for by the form, falling back to the configured default"""
+    compression = request.form.get('compression') or app.config['PAYLOAD_COMPRESSION'] or 'none'
+    if compression != 'none' and compression not in COMPRESSORS:
+        raise ValueError(f'Invalid compression: {compression}')
+    return None if compression == 'none' else compression
+
+def sse_event(event, data):
+    """Format one Server-Sent Event carrying JSON data"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# job id -> threading.Event that ends a streamed /crack search early
+crack_jobs = {}
+crack_jobs_lock = threading.Lock()
+# Key searches and dictionary attacks hold CPUs for seconds to minutes, outside the cipher worker pool and its queue
+search_slots = threading.BoundedSemaphore(app.config['SEARCH_MAX_CONCURRENT'])
+
+def acquire_search_slot():
+    """Reserve one of the SEARCH_MAX_CONCURRENT search slots; raises CipherQueueFull when all are taken"""
+    if not search_slots.acquire(blocking=False):
+        # Searches take seconds to minutes, so suggest waiting for the typical one to finish
+        raise CipherQueueFull(retry_after=30)
+
+def search_checkpoint(name):
+    """Checkpoint file for a client-chosen name, or None when no name was given"""
+    if not name:
+        return None
+    filename = secure_filename(name)
+    if not filename:
+        raise ValueError('Invalid checkpoint name')
+    if not filename.endswith('.json'):
+        filename += '.json'
+    path = os.path.join(app.config['CHECKPOINT_FOLDER'], filename)
+    
+    # Checkpoints are artifacts: they expire with ARTIFACT_TTL, count against the quota and belong to one client
+    owner = request.remote_addr
+    artifact = artifacts.resolve(filename)
+    if artifact is not None:
+        if artifact['kind'] != 'checkpoint' or artifact['owner'] not in (None, owner):
+            raise PermissionError('Checkpoint belongs to another client')
+    elif os.path.exists(path):
+        # Expired, the reaper just has not removed it yet
+        os.remove(path)
+    return Checkpoint(path, app.config['CHECKPOINT_INTERVAL'],
+                      on_save=lambda saved: artifacts.register(saved, 'checkpoint', owner=owner))
+
+def raw_response_requested():
+    """Whether the client wants the result itself as the response body (?raw=1 or Accept) instead of JSON"""
+    if str(request.args.get('raw', request.form.get('raw', ''))).lower() in ('1', 'true', 'yes'):
+        return True
+    # Without an Accept header, or with */*, JSON stays the default
+    best = request.accept_mimetypes.best_match(['application/json', 'application/octet-stream', 'text/plain'])
+    return best in ('application/octet-stream', 'text/plain')
+
+def raw_response(body, mimetype, headers, download_name=None):
+    """Response with the result as its body and the fields of the JSON answer as X-* headers"""
+    response = Response(body, mimetype=mimetype)
+    for name, value in headers.items():
+        if value is not None:
+            response.headers[name] = str(value).lower() if isinstance(value, bool) else str(value)
+    if download_name:
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+    return response
+
+def iter_encrypted_payload(path):
+    """Yield the ciphertext letters stored in an encrypted file, decompressing on the fly"""
+    with open(path, 'rb') as f:
+        _, chunks = file_processor.open_encrypted_stream(f, app.config['STREAM_CHUNK_SIZE'])
+        for chunk in chunks:
+            yield chunk.encode('utf-8')
+
+def busy_response(error):
+    """429 answer for a saturated worker pool"""
+    response = jsonify({'error': str(error)})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency, byte counts and failures for every request"""
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    labels = {'route': route, 'cipher': g.get('cipher_type', '')}
+    
+    metrics.observe('request_duration_seconds', time.perf_counter() - g.get('request_start', time.perf_counter()), **labels)
+    metrics.inc('request_bytes_in_total', request.content_length or 0, **labels)
+    metrics.inc('request_bytes_out_total', response.content_length or 0, **labels)
+    if response.status_code >= 400:
+        metrics.inc('request_failures_total', status=response.status_code, **labels)
+    
+    return response
+
+@app.route('/metrics')
+def export_metrics():
+    """Expose request metrics in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def index():
@@ -54,15 +283,8 @@ def get_file_info():
         if not file or not file.filename:
             return jsonify({'error': 'No file provided'}), 400
         
-        # Save temporary file
-        temp_path = os.path.join(app.config['TEMP_FOLDER'], secure_filename(file.filename))
-        file.save(temp_path)
-        
-        # Get file info
-        info = file_processor.get_file_info(temp_path)
-        
-        # Cleanup
-        file_processor.cleanup_temp_files([temp_path])
+        # Get file info straight from the upload stream
+        info = file_processor.get_file_info(file.stream, secure_filename(file.filename))
         
         return jsonify({'success': True, 'file_info': info})
     except Exception as e:
@@ -78,6 +300,7 @@ def batch_encrypt():
         
         if cipher_type not in ciphers:
             return jsonify({'error': 'Invalid cipher type'}), 400
+        g.cipher_type = cipher_type
         
         if not files:
             return jsonify({'error': 'No files provided'}), 400
@@ -87,57 +310,156 @@ def batch_encrypt():
         if not validation['valid']:
             return jsonify({'error': f'Invalid key: {validation["message"]}'}), 400
         
+        try:
+            compression = requested_compression()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         cipher = ciphers[cipher_type]
         encrypted_files = []
+        labels = {'route': '/batch_encrypt', 'cipher': cipher_type}
         
         for file in files:
             if file.filename:
-                # Process each file
-                temp_path = os.path.join(app.config['TEMP_FOLDER'], secure_filename(file.filename))
-                file.save(temp_path)
-                
-                # Process file
-                file_data = file_processor.process_file_for_encryption(temp_path, cipher_type)
+                # Process each file straight from its upload stream
+                with metrics.time_stage('read', **labels):
+                    file_data = file_processor.process_file_for_encryption(
+                        file.stream, cipher_type, secure_filename(file.filename))
                 
                 # Encrypt content
                 if file_data['metadata']['is_binary']:
                     # Binary file
-                    text_repr = ''.join(chr(b) if b < 128 else f'\\x{b:02x}' for b in file_data['content'])
-                    encrypted_content = cipher.encrypt(text_repr, key)
+                    with metrics.time_stage('escape', **labels):
+                        text_repr = file_processor.encode_binary_content(file_data['content'])
+                    encrypted_content = run_cipher(cipher_type, 'encrypt', text_repr, key, labels)
                 else:
                     # Text file
                     content_str = file_data['content'].decode('utf-8')
-                    encrypted_content = cipher.encrypt(content_str, key)
+                    encrypted_content = run_cipher(cipher_type, 'encrypt', content_str, key, labels)
                 
                 # Save encrypted file
                 encrypted_filename = f"encrypted_{os.path.splitext(file_data['filename'])[0]}.dat"
                 encrypted_path = os.path.join(app.config['ENCRYPTED_FOLDER'], encrypted_filename)
                 
-                file_processor.create_encrypted_file(encrypted_content, file_data['metadata'], encrypted_path)
+                with metrics.time_stage('write', **labels):
+                    file_processor.create_encrypted_file(encrypted_content, file_data['metadata'], encrypted_path,
+                                                         compression)
+                artifacts.register(encrypted_path, 'encrypted', owner=request.remote_addr)
                 encrypted_files.append(encrypted_path)
-                
-                # Cleanup temp file
-                file_processor.cleanup_temp_files([temp_path])
         
         # Create ZIP package
-        package_path = file_processor.create_download_package(encrypted_files, f"batch_encrypted_{cipher_type}")
+        with metrics.time_stage('package', **labels):
+            package_path = file_processor.create_download_package(encrypted_files, f"batch_encrypted_{cipher_type}")
+        artifacts.register(package_path, 'package', owner=request.remote_addr)
         
         return jsonify({
             'success': True,
             'encrypted_count': len(encrypted_files),
             'package_url': f'/download/package/{os.path.basename(package_path)}'
         })
+    
+    except CipherQueueFull as e:
+        return busy_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/batch_decrypt', methods=['POST'])
+def batch_decrypt():
+    """Decrypt every .dat file of a ZIP package and stream back a ZIP of the restored files"""
+    try:
+        key = request.form.get('key', '')
+        file = request.files.get('package')
         
+        if not file or not file.filename:
+            return jsonify({'error': 'No package provided'}), 400
+        
+        # Members are read straight out of the uploaded archive, never extracted to disk
+        try:
+            package = zipfile.ZipFile(file.stream)
+        except zipfile.BadZipFile:
+            return jsonify({'error': 'Package is not a ZIP file'}), 400
+        
+        members = [info for info in package.infolist() if not info.is_dir() and info.filename.endswith('.dat')]
+        if not members:
+            package.close()
+            return jsonify({'error': 'Package contains no .dat files'}), 400
+        
+        workers = max(1, app.config['BATCH_DECRYPT_WORKERS'])
+        
+        def restored_files():
+            """(filename, chunks) of every restored member in package order, decrypting a few members ahead"""
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-decrypt')
+            pending = deque()
+            names = set()
+            failures = []
+            
+            def finish(info, future):
+                try:
+                    metadata, data = future.result()
+                except Exception as e:
+                    failures.append(f'{info.filename}: {e}')
+                    return
+                
+                name = restored_file_type(metadata)[1]
+                base, extension = os.path.splitext(name)
+                suffix = 1
+                while name in names:
+                    name = f'{base}_{suffix}{extension}'
+                    suffix += 1
+                names.add(name)
+                yield name, [data]
+            
+            try:
+                for info in members:
+                    pending.append((info, pool.submit(decrypt_package_member, package, info, key)))
+                    if len(pending) > workers:
+                        yield from finish(*pending.popleft())
+                while pending:
+                    yield from finish(*pending.popleft())
+            finally:
+                pool.shutdown(cancel_futures=True)
+                package.close()
+            
+            if failures:
+                # Members that could not be decrypted are listed instead of failing the whole package
+                yield 'batch_decrypt_errors.txt', ['\n'.join(failures).encode('utf-8')]
+        
+        download_name = f"decrypted_{os.path.splitext(secure_filename(file.filename))[0] or 'package'}.zip"
+        return Response(stream_with_context(file_processor.iter_zip(restored_files())), mimetype='application/zip',
+                        headers={'Content-Disposition': f'attachment; filename="{download_name}"'})
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def decrypt_package_member(package, info, key):
+    """Decrypt one .dat member of a ZIP package with the cipher named in its metadata; returns (metadata, restored bytes)"""
+    limit = app.config['BATCH_DECRYPT_MAX_MEMBER_BYTES']
+    if info.file_size > limit:
+        raise ValueError(f'Content is larger than {limit} bytes')
+    
+    # The size in the archive header can be forged, so the cap applies to the bytes actually decompressed:
+    # both the ZIP member and a compressed payload inside the .dat
+    with package.open(info) as member:
+        metadata, chunks = file_processor.open_encrypted_stream(BoundedReader(member, limit),
+                                                                app.config['STREAM_CHUNK_SIZE'], max_bytes=limit)
+        encrypted_content = ''.join(chunks)
+    
+    cipher_type = metadata.get('cipher_type')
+    if cipher_type not in ciphers:
+        raise ValueError(f'Unknown cipher type: {cipher_type}')
+    
+    decrypted = run_cipher(cipher_type, 'decrypt', encrypted_content, key, {'route': '/batch_decrypt', 'cipher': cipher_type})
+    if metadata.get('is_binary'):
+        return metadata, b''.join(file_processor.restore_binary_chunks([decrypted]))
+    return metadata, decrypted.encode('utf-8')
+
 @app.route('/download/package/<filename>')
 def download_package(filename):
     """Download ZIP package"""
     try:
-        filepath = os.path.join(app.config['ENCRYPTED_FOLDER'], filename)
-        if os.path.exists(filepath):
-            return send_file(filepath, as_attachment=True, download_name=filename)
+        artifact = artifacts.resolve(filename, 'package')
+        if artifact and os.path.exists(artifact['path']):
+            return send_file(os.path.abspath(artifact['path']), as_attachment=True, download_name=artifact['download_name'])
         else:
             return jsonify({'error': 'Package not found'}), 404
     except Exception as e:
@@ -155,6 +477,28 @@ def generate_key(cipher_type):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/generate_keys/<cipher_type>')
+def generate_keys(cipher_type):
+    """Stream many random keys for specified cipher as NDJSON"""
+    try:
+        if cipher_type not in ciphers:
+            return jsonify({'error': 'Invalid cipher type'}), 400
+        g.cipher_type = cipher_type
+        if cipher_type not in CryptoUtils.BULK_KEY_TYPES:
+            return jsonify({'error': f'Bulk key generation is not supported for {cipher_type}'}), 400
+        
+        count = request.args.get('count', 1, type=int)
+        if count is None or not 1 <= count <= app.config['MAX_GENERATED_KEYS']:
+            return jsonify({'error': f"Count must be between 1 and {app.config['MAX_GENERATED_KEYS']}"}), 400
+        
+        def stream():
+            for key in CryptoUtils.generate_random_keys(cipher_type, count):
+                yield json.dumps({'key': key}) + '\n'
+        
+        return Response(stream(), mimetype='application/x-ndjson')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/validate_key', methods=['POST'])
 def validate_key():
     """Validate key for specified cipher"""
@@ -177,6 +521,245 @@ def analyze_text():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/dictionary_attack', methods=['POST'])
+def dictionary_attack():
+    """Try every word of a wordlist as the key of a Vigenere, Playfair or Permutation ciphertext"""
+    try:
+        cipher_type = request.form.get('cipher_type')
+        ciphertext = request.form.get('ciphertext', '')
+        wordlist = request.files.get('wordlist')
+        if len(ciphers['vigenere'].to_buffer(ciphertext)) > app.config['ATTACK_MAX_LETTERS']:
+            return jsonify({'error': f"Ciphertext must have at most {app.config['ATTACK_MAX_LETTERS']} letters"}), 400
+        
+        identification = None
+        if cipher_type == 'auto':
+            # Attack only the most likely keyword cipher according to the statistical classifier
+            try:
+                identification = identify_cipher(ciphertext)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            likely = [r['cipher_type'] for r in identification['ranking']
+                      if r['cipher_type'] in ATTACK_CIPHERS and r['probability'] >= app.config['AUTO_ATTACK_MIN_PROBABILITY']]
+            if not likely:
+                return jsonify({'error': f'Ciphertext looks like {identification["best"]}, which has no dictionary attack',
+                                'ranking': identification['ranking']}), 400
+            cipher_type = likely[0]
+        
+        if cipher_type not in ATTACK_CIPHERS:
+            return jsonify({'error': f'Dictionary attack supports: {", ".join(ATTACK_CIPHERS)}'}), 400
+        g.cipher_type = cipher_type
+        
+        if wordlist and wordlist.filename:
+            words = parse_wordlist(io.TextIOWrapper(wordlist.stream, encoding='utf-8', errors='ignore'))
+            if len(words) > app.config['ATTACK_MAX_WORDS']:
+                return jsonify({'error': f"Wordlist must have at most {app.config['ATTACK_MAX_WORDS']} words"}), 400
+        elif app.config['WORDLIST_PATH']:
+            words = load_wordlist(app.config['WORDLIST_PATH'])
+        else:
+            return jsonify({'error': 'No wordlist provided'}), 400
+        
+        try:
+            top = max(1, min(int(request.form.get('top', 10)), 100))
+            attack = DictionaryAttack(cipher_type, words, jobs=app.config['ATTACK_JOBS'], top=top)
+            checkpoint = search_checkpoint(request.form.get('checkpoint'))
+            acquire_search_slot()
+            try:
+                # Repeating a request with the same checkpoint name skips the chunks it already searched
+                result = attack.run(ciphertext, checkpoint)
+            finally:
+                search_slots.release()
+        except CipherQueueFull as e:
+            return busy_response(e)
+        except PermissionError as e:
+            return jsonify({'error': str(e)}), 403
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if identification is not None:
+            result['ranking'] = identification['ranking']
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/identify_cipher', methods=['POST'])
+def identify_cipher_type():
+    """Rank the cipher types by how likely they produced a ciphertext"""
+    try:
+        text = request.json.get('text', '')
+        try:
+            identification = identify_cipher(text)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'success': True, **identification})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/pad_reuse', methods=['POST'])
+def pad_reuse():
+    """Find stored one-time pad ciphertexts that were encrypted with the same pad"""
+    try:
+        options = request.get_json(silent=True) or {}
+        try:
+            report = scan_folder(app.config['ENCRYPTED_FOLDER'], max_letters=app.config['PAD_REUSE_MAX_LETTERS'],
+                                 min_overlap=int(options.get('min_overlap', 200)),
+                                 alpha=float(options.get('alpha', 0.01)))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'success': True, **report})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/crib_drag', methods=['POST'])
+def crib_drag():
+    """Drag a crib across two stored ciphertexts that share a pad, after applying earlier placements"""
+    try:
+        first = artifacts.resolve(request.json.get('first', ''), 'encrypted')
+        second = artifacts.resolve(request.json.get('second', ''), 'encrypted')
+        if not first or not second:
+            return jsonify({'error': 'File not found'}), 404
+        
+        crib = request.json.get('crib')
+        placements = request.json.get('placements', [])
+        
+        dragger = CribDragger(read_ciphertext(first['path'], app.config['CRIB_DRAG_MAX_LETTERS']),
+                              read_ciphertext(second['path'], app.config['CRIB_DRAG_MAX_LETTERS']))
+        try:
+            top = max(1, min(int(request.json.get('top', 10)), 100))
+            # The client keeps the placements it accepted and sends them with every call
+            for placement in placements:
+                dragger.place(placement['crib'], int(placement['offset']), placement.get('message', 'first'))
+            candidates = dragger.drag(crib, top) if crib else []
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'length': dragger.length,
+            'candidates': candidates,
+            'plaintexts': dragger.plaintexts()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/crack', methods=['GET', 'POST'])
+def crack():
+    """Search for the key of a substitution, Playfair or permutation ciphertext, optionally streaming the best key so far"""
+    try:
+        # GET lets a browser EventSource open the stream directly
+        data = request.get_json(silent=True) or request.values
+        cipher_type = data.get('cipher_type')
+        
+        if cipher_type not in SOLVER_CIPHERS:
+            return jsonify({'error': f'Key search supports: {", ".join(SOLVER_CIPHERS)}'}), 400
+        g.cipher_type = cipher_type
+        
+        try:
+            seconds = float(data.get('seconds', 30))
+            seed = data.get('seed')
+            seed = int(seed) if seed not in (None, '') else None
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Seconds and seed must be numbers'}), 400
+        if not 0 < seconds <= app.config['CRACK_MAX_SECONDS']:
+            return jsonify({'error': f"Seconds must be between 0 and {app.config['CRACK_MAX_SECONDS']}"}), 400
+        
+        try:
+            solver = create_solver(cipher_type, data.get('ciphertext', ''), seconds=seconds, seed=seed,
+                                   progress_interval=app.config['CRACK_PROGRESS_INTERVAL'])
+            checkpoint = search_checkpoint(data.get('checkpoint'))
+            # A resumed search runs for the requested seconds on top of the time it already spent
+            if checkpoint is not None and solver.resume(checkpoint):
+                solver.options['seconds'] += solver.elapsed
+        except PermissionError as e:
+            return jsonify({'error': str(e)}), 403
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        stream = str(data.get('stream', '')).lower() in ('1', 'true', 'yes')
+        try:
+            acquire_search_slot()
+        except CipherQueueFull as e:
+            return busy_response(e)
+        if not stream and request.accept_mimetypes.best_match(['application/json', 'text/event-stream']) != 'text/event-stream':
+            try:
+                return jsonify({'success': True, **solver.run(checkpoint=checkpoint)})
+            finally:
+                search_slots.release()
+        
+        job_id = uuid.uuid4().hex
+        stop = threading.Event()
+        events = queue.Queue()
+        with crack_jobs_lock:
+            crack_jobs[job_id] = stop
+        
+        def search():
+            try:
+                result = solver.run(on_progress=lambda progress: events.put(('progress', progress)),
+                                    should_stop=stop.is_set, checkpoint=checkpoint)
+                events.put(('result', result))
+            except Exception as e:
+                events.put(('error', {'error': str(e)}))
+            finally:
+                # The slot is freed by the search itself, even if the client never reads the stream
+                search_slots.release()
+                with crack_jobs_lock:
+                    crack_jobs.pop(job_id, None)
+        
+        threading.Thread(target=search, name=f'crack-{job_id}', daemon=True).start()
+        
+        def generate():
+            try:
+                yield sse_event('start', {'job_id': job_id, 'cipher_type': cipher_type, 'seconds': seconds})
+                while True:
+                    event, payload = events.get()
+                    yield sse_event(event, payload)
+                    if event != 'progress':
+                        break
+            finally:
+                # Closing the connection ends the search as well
+                stop.set()
+                with crack_jobs_lock:
+                    crack_jobs.pop(job_id, None)
+        
+        response = Response(generate(), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/crack/<job_id>/stop', methods=['POST'])
+def stop_crack(job_id):
+    """End a streamed key search; its stream still sends the best result found so far"""
+    try:
+        with crack_jobs_lock:
+            stop = crack_jobs.get(job_id)
+        if stop is None:
+            return jsonify({'error': 'Job not found'}), 404
+        stop.set()
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/checkpoints/<name>', methods=['GET', 'DELETE'])
+def search_checkpoint_file(name):
+    """Show a saved search checkpoint, or delete it so the next search with that name starts over"""
+    try:
+        checkpoint = search_checkpoint(name)
+        if not os.path.exists(checkpoint.path):
+            return jsonify({'error': 'Checkpoint not found'}), 404
+        
+        if request.method == 'DELETE':
+            os.remove(checkpoint.path)
+            artifacts.unregister(os.path.basename(checkpoint.path))
+            return jsonify({'success': True})
+        return send_file(os.path.abspath(checkpoint.path), mimetype='application/json')
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/generate_otp_key', methods=['POST'])
 def generate_otp_key():
     """Generate One-Time Pad key file"""
@@ -205,65 +788,116 @@ def encrypt():
         
         if cipher_type not in ciphers:
             return jsonify({'error': 'Invalid cipher type'}), 400
+        g.cipher_type = cipher_type
         
         # Validate key first
         validation = CryptoUtils.validate_key(cipher_type, key)
         if not validation['valid']:
             return jsonify({'error': f'Invalid key: {validation["message"]}'}), 400
         
+        try:
+            compression = requested_compression()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         cipher = ciphers[cipher_type]
+        labels = {'route': '/encrypt', 'cipher': cipher_type}
         
         if file and file.filename:
-            # File encryption using FileProcessor
-            temp_path = os.path.join(app.config['TEMP_FOLDER'], secure_filename(file.filename))
-            file.save(temp_path)
+            # File encryption using FileProcessor, reading the upload stream directly
+            with metrics.time_stage('read', **labels):
+                file_data = file_processor.process_file_for_encryption(
+                    file.stream, cipher_type, secure_filename(file.filename))
             
-            # Process file
-            file_data = file_processor.process_file_for_encryption(temp_path, cipher_type)
+            encrypted_filename = f"encrypted_{os.path.splitext(file_data['filename'])[0]}.dat"
+            computed = {}
             
-            # Encrypt content
-            if file_data['metadata']['is_binary']:
-                # Binary file
-                text_repr = ''.join(chr(b) if b < 128 else f'\\x{b:02x}' for b in file_data['content'])
-                encrypted_content = cipher.encrypt(text_repr, key)
-            else:
-                # Text file
-                content_str = file_data['content'].decode('utf-8')
-                encrypted_content = cipher.encrypt(content_str, key)
+            def encrypt_to(encrypted_path):
+                # Encrypt content
+                if file_data['metadata']['is_binary']:
+                    # Binary file
+                    with metrics.time_stage('escape', **labels):
+                        text_repr = file_processor.encode_binary_content(file_data['content'])
+                    computed['content'] = run_cipher(cipher_type, 'encrypt', text_repr, key, labels)
+                else:
+                    # Text file
+                    content_str = file_data['content'].decode('utf-8')
+                    computed['content'] = run_cipher(cipher_type, 'encrypt', content_str, key, labels)
+                
+                # Save encrypted file
+                with metrics.time_stage('write', **labels):
+                    file_processor.create_encrypted_file(computed['content'], file_data['metadata'], encrypted_path,
+                                                         compression)
             
-            # Save encrypted file
-            encrypted_filename = f"encrypted_{os.path.splitext(file_data['filename'])[0]}.dat"
-            encrypted_path = os.path.join(app.config['ENCRYPTED_FOLDER'], encrypted_filename)
+            # Identical (cipher, key, content, filename, compression) uploads share one cached .dat
+            with metrics.time_stage('cache_key', **labels):
+                cache_key = result_cache.make_key(cipher_type, cipher.key_fingerprint(key),
+                                                  file_data['content'], file_data['filename'], compression or '')
+            encrypted_path, cached = result_cache.get_or_compute(cache_key, encrypt_to)
+            # Re-registering refreshes the expiry of a cached result
+            artifacts.register(encrypted_path, 'encrypted', owner=request.remote_addr, download_name=encrypted_filename)
             
-            file_processor.create_encrypted_file(encrypted_content, file_data['metadata'], encrypted_path)
+            if raw_response_requested():
+                # The ciphertext is the body, so there is no JSON or base64 copy; a cached result is
+                # streamed straight from its .dat file
+                is_binary = file_data['metadata']['is_binary']
+                if 'content' in computed:
+                    body = computed['content'].encode('utf-8')
+                else:
+                    body = iter_encrypted_payload(encrypted_path)
+                with metrics.time_stage('respond', **labels):
+                    return raw_response(body, 'application/octet-stream' if is_binary else 'text/plain', {
+                        'X-Cipher-Type': cipher_type,
+                        'X-Is-Binary': is_binary,
+                        'X-Filename': file_data['filename'],
+                        'X-File-Size': file_data['metadata']['file_size'],
+                        'X-Encrypted-Filename': encrypted_filename,
+                        'X-Download-Url': f'/download/encrypted/{os.path.basename(encrypted_path)}',
+                        'X-Cached': cached
+                    })
             
-            # Cleanup temp file
-            file_processor.cleanup_temp_files([temp_path])
+            if 'content' in computed:
+                encrypted_content = computed['content']
+            else:
+                with metrics.time_stage('cache_read', **labels):
+                    encrypted_content = file_processor.parse_encrypted_file(encrypted_path)['encrypted_content']
             
-            return jsonify({
-                'success': True,
-                'encrypted_text': encrypted_content if not file_data['metadata']['is_binary'] else None,
-                'encrypted_data': base64.b64encode(encrypted_content.encode()).decode() if file_data['metadata']['is_binary'] else None,
-                'is_file': True,
-                'is_binary': file_data['metadata']['is_binary'],
-                'filename': file_data['filename'],
-                'encrypted_filename': encrypted_filename,
-                'download_url': f'/download/encrypted/{encrypted_filename}',
-                'file_info': file_data['metadata']
-            })
+            encrypted_data = None
+            if file_data['metadata']['is_binary']:
+                with metrics.time_stage('base64', **labels):
+                    encrypted_data = base64.b64encode(encrypted_content.encode()).decode()
+            
+            with metrics.time_stage('respond', **labels):
+                return jsonify({
+                    'success': True,
+                    'encrypted_text': encrypted_content if not file_data['metadata']['is_binary'] else None,
+                    'encrypted_data': encrypted_data,
+                    'is_file': True,
+                    'is_binary': file_data['metadata']['is_binary'],
+                    'filename': file_data['filename'],
+                    'encrypted_filename': encrypted_filename,
+                    'download_url': f'/download/encrypted/{os.path.basename(encrypted_path)}',
+                    'cached': cached,
+                    'file_info': file_data['metadata']
+                })
         
         elif text_input:
             # Text encryption
-            encrypted = cipher.encrypt(text_input, key)
-            return jsonify({
-                'success': True,
-                'encrypted_text': encrypted,
-                'is_file': False
-            })
+            encrypted = run_cipher(cipher_type, 'encrypt', text_input, key, labels)
+            if raw_response_requested():
+                return raw_response(encrypted, 'text/plain', {'X-Cipher-Type': cipher_type})
+            with metrics.time_stage('respond', **labels):
+                return jsonify({
+                    'success': True,
+                    'encrypted_text': encrypted,
+                    'is_file': False
+                })
         
         else:
             return jsonify({'error': 'No input provided'}), 400
-            
+    
+    except CipherQueueFull as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -277,21 +911,34 @@ def decrypt():
         
         if cipher_type not in ciphers:
             return jsonify({'error': 'Invalid cipher type'}), 400
+        g.cipher_type = cipher_type
         
         cipher = ciphers[cipher_type]
+        labels = {'route': '/decrypt', 'cipher': cipher_type}
         
         if file and file.filename:
-            # File decryption using FileProcessor
-            temp_path = os.path.join(app.config['TEMP_FOLDER'], secure_filename(file.filename))
-            file.save(temp_path)
-            
-            # Parse encrypted file
-            parsed_data = file_processor.parse_encrypted_file(temp_path)
+            # File decryption using FileProcessor, reading the upload stream directly
+            with metrics.time_stage('read', **labels):
+                parsed_data = file_processor.parse_encrypted_file(file.stream)
             metadata = parsed_data['metadata']
             encrypted_content = parsed_data['encrypted_content']
             
             # Decrypt content
-            decrypted = cipher.decrypt(encrypted_content, key)
+            decrypted = run_cipher(cipher_type, 'decrypt', encrypted_content, key, labels)
+            
+            if raw_response_requested():
+                # The restored file is the body; nothing is written to disk for a later download
+                mime_type, download_name = restored_file_type(metadata)
+                if metadata.get('is_binary'):
+                    body = file_processor.restore_binary_chunks([decrypted])
+                else:
+                    body, mime_type = decrypted, 'text/plain'
+                return raw_response(body, mime_type, {
+                    'X-Cipher-Type': cipher_type,
+                    'X-Is-Binary': bool(metadata.get('is_binary')),
+                    'X-Original-Filename': download_name,
+                    'X-File-Size': metadata.get('file_size')
+                }, download_name if metadata.get('is_binary') else None)
             
             # Restore file
             if metadata.get('is_binary'):
@@ -299,10 +946,10 @@ def decrypt():
                 decrypted_filename = metadata.get('original_filename', 'decrypted_file')
                 decrypted_path = os.path.join(app.config['ENCRYPTED_FOLDER'], f"decrypted_{decrypted_filename}")
                 
-                file_processor.restore_binary_file(decrypted, decrypted_path)
-                
-                # Cleanup temp file
-                file_processor.cleanup_temp_files([temp_path])
+                with metrics.time_stage('write', **labels):
+                    file_processor.restore_binary_file(decrypted, decrypted_path)
+                artifacts.register(decrypted_path, 'decrypted', owner=request.remote_addr,
+                                   download_name=decrypted_filename)
                 
                 return jsonify({
                     'success': True,
@@ -313,8 +960,6 @@ def decrypt():
                 })
             else:
                 # Text file
-                file_processor.cleanup_temp_files([temp_path])
-                
                 return jsonify({
                     'success': True,
                     'decrypted_text': decrypted,
@@ -324,7 +969,9 @@ def decrypt():
         
         elif encrypted_input:
             # Text decryption
-            decrypted = cipher.decrypt(encrypted_input, key)
+            decrypted = run_cipher(cipher_type, 'decrypt', encrypted_input, key, labels)
+            if raw_response_requested():
+                return raw_response(decrypted, 'text/plain', {'X-Cipher-Type': cipher_type})
             return jsonify({
                 'success': True,
                 'decrypted_text': decrypted
@@ -332,16 +979,192 @@ def decrypt():
         
         else:
             return jsonify({'error': 'No input provided'}), 400
+    
+    except CipherQueueFull as e:
+        return busy_response(e)
+    except ValueError as e:
+        # Malformed files, payloads that expand past MAX_DECOMPRESSED_BYTES and bad keys
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/decrypt_stream', methods=['POST'])
+def decrypt_stream():
+    """Decrypt an uploaded .dat file and stream the restored file back as it is decrypted"""
+    try:
+        cipher_type = request.form.get('cipher_type')
+        key = request.form.get('key', '')
+        file = request.files.get('encrypted_file')
+        
+        if cipher_type not in ciphers:
+            return jsonify({'error': 'Invalid cipher type'}), 400
+        g.cipher_type = cipher_type
+        
+        if not file or not file.filename:
+            return jsonify({'error': 'No file provided'}), 400
+        
+        cipher = ciphers[cipher_type]
+        metadata, chunks = file_processor.open_encrypted_stream(file.stream, app.config['STREAM_CHUNK_SIZE'])
+        
+        # Ciphertext chunks (decompressed on the fly) -> letter buffers -> plaintext letters,
+        # with cipher state carried between chunks
+        letters = (cipher.to_buffer(chunk) for chunk in chunks)
+        plaintext = (cipher.from_buffer(buffer) for buffer in cipher.decrypt_stream(letters, key))
+        if metadata.get('is_binary'):
+            body = file_processor.restore_binary_chunks(plaintext)
+        else:
+            body = (text.encode('utf-8') for text in plaintext)
+        
+        # Produce the first chunk now so bad keys and malformed files still get a JSON error
+        first = next(body, b'')
+        
+        def generate():
+            yield first
+            yield from body
+        
+        mime_type, download_name = restored_file_type(metadata)
+        return Response(stream_with_context(generate()), mimetype=mime_type,
+                        headers={'Content-Disposition': f'attachment; filename="{download_name}"'})
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def restored_file_type(metadata):
+    """Mime type and download name of the file an encrypted file restores to"""
+    mime_type = metadata.get('mime_type')
+    if not mime_type or mime_type == 'None':
+        mime_type = 'application/octet-stream' if metadata.get('is_binary') else 'text/plain'
+    download_name = secure_filename(str(metadata.get('original_filename', ''))) or 'decrypted_file'
+    return mime_type, download_name
+
+def iter_decrypted_range(reader, cipher, key, start, stop):
+    """Yield plaintext letters [start, stop) of an encrypted file, decrypting only that slice"""
+    block_size = cipher.random_access_block_size(key)
+    step = max(app.config['STREAM_CHUNK_SIZE'] // block_size, 1) * block_size
+    position = start - start % block_size
+    
+    while position < stop:
+        # Read whole blocks so the slice decrypts on its own
+        end = min(position + step, stop)
+        read_end = min(end + (-end) % block_size, reader.length)
+        letters = cipher.to_buffer(reader.read(position, read_end - position))
+        plaintext = cipher.from_buffer(cipher.decrypt_at(letters, position, key))
+        yield plaintext[max(start - position, 0):end - position].encode('ascii')
+        position = end
+
+@app.route('/decrypt_range/<filename>', methods=['GET', 'POST'])
+def decrypt_range(filename):
+    """Decrypt all or an HTTP Range of a stored encrypted file without processing the rest"""
+    try:
+        cipher_type = request.values.get('cipher_type')
+        key = request.values.get('key', '')
+        
+        if cipher_type not in ciphers:
+            return jsonify({'error': 'Invalid cipher type'}), 400
+        g.cipher_type = cipher_type
+        
+        artifact = artifacts.resolve(filename, 'encrypted')
+        if not artifact or not os.path.exists(artifact['path']):
+            return jsonify({'error': 'File not found'}), 404
+        
+        cipher = ciphers[cipher_type]
+        if cipher.random_access_block_size(key) is None:
+            return jsonify({'error': f'Random access decryption is not supported for {cipher_type}'}), 400
+        
+        reader = file_processor.open_content(artifact['path'])
+        if reader.metadata.get('is_binary'):
+            # Ranges address the escaped letter stream, which has no byte offsets of the original file
+            reader.close()
+            return jsonify({'error': 'Range decryption is only available for text files; '
+                                     'use /decrypt_stream for binary files'}), 415
+        try:
+            total = reader.length
+            start, stop, status = 0, total, 200
+            if request.range is not None:
+                byte_range = request.range.range_for_length(total)
+                if byte_range is None:
+                    reader.close()
+                    response = jsonify({'error': 'Requested range not satisfiable'})
+                    response.status_code = 416
+                    response.headers['Content-Range'] = f'bytes */{total}'
+                    return response
+                start, stop = byte_range
+                status = 206
             
+            body = iter_decrypted_range(reader, cipher, key, start, stop)
+            # Decrypt the first slice now so bad keys still get a JSON error
+            first = next(body, b'')
+        except Exception:
+            reader.close()
+            raise
+        
+        def generate():
+            try:
+                yield first
+                yield from body
+            finally:
+                reader.close()
+        
+        mime_type, download_name = restored_file_type(reader.metadata)
+        response = Response(stream_with_context(generate()), status=status, mimetype=mime_type)
+        response.headers['Accept-Ranges'] = 'bytes'
+        response.headers['Content-Length'] = str(stop - start)
+        response.headers['Content-Disposition'] = f'inline; filename="{download_name}"'
+        if status == 206:
+            response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{total}'
+        return response
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/pipeline', methods=['POST'])
+def pipeline():
+    """Encrypt or decrypt text through an ordered list of cipher stages"""
+    try:
+        data = request.json or {}
+        mode = data.get('mode', 'encrypt')
+        text = data.get('text', '')
+        g.cipher_type = 'pipeline'
+        
+        if mode not in ('encrypt', 'decrypt'):
+            return jsonify({'error': 'Mode must be "encrypt" or "decrypt"'}), 400
+        
+        try:
+            stages = pipeline_cipher.normalize_stages(data.get('stages'))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid stages: {e}'}), 400
+        
+        # Validate every stage key
+        for position, (cipher_type, key) in enumerate(stages, 1):
+            validation = CryptoUtils.validate_key(cipher_type, key)
+            if not validation['valid']:
+                return jsonify({'error': f'Invalid key in stage {position}: {validation["message"]}'}), 400
+        
+        if not text:
+            return jsonify({'error': 'No input provided'}), 400
+        
+        labels = {'route': '/pipeline', 'cipher': 'pipeline'}
+        result = run_cipher('pipeline', mode, text, stages, labels)
+        
+        return jsonify({
+            'success': True,
+            f'{mode}ed_text': result,
+            'stages': len(stages),
+            'fused_stages': pipeline_cipher.fused_length(stages)
+        })
+    except CipherQueueFull as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/download/encrypted/<filename>')
 def download_encrypted(filename):
     try:
-        filepath = os.path.join(app.config['ENCRYPTED_FOLDER'], filename)
-        if os.path.exists(filepath):
-            return send_file(filepath, as_attachment=True, download_name=filename)
+        artifact = artifacts.resolve(filename, 'encrypted')
+        if artifact and os.path.exists(artifact['path']):
+            return send_file(os.path.abspath(artifact['path']), as_attachment=True, download_name=artifact['download_name'])
         else:
             return jsonify({'error': 'File not found'}), 404
     except Exception as e:
@@ -350,9 +1173,9 @@ def download_encrypted(filename):
 @app.route('/download/decrypted/<filename>')
 def download_decrypted(filename):
     try:
-        filepath = os.path.join(app.config['ENCRYPTED_FOLDER'], filename)
-        if os.path.exists(filepath):
-            return send_file(filepath, as_attachment=True, download_name=filename.replace('decrypted_', ''))
+        artifact = artifacts.resolve(filename, 'decrypted')
+        if artifact and os.path.exists(artifact['path']):
+            return send_file(os.path.abspath(artifact['path']), as_attachment=True, download_name=artifact['download_name'])
         else:
             return jsonify({'error': 'File not found'}), 404
     except Exception as e:
@@ -361,32 +1184,10 @@ def download_decrypted(filename):
 # Cleanup endpoint for removing old files
 @app.route('/cleanup', methods=['POST'])
 def cleanup_files():
-    """Clean up old temporary and encrypted files"""
+    """Clean up old temporary and expired generated files"""
     try:
-        import time
-        current_time = time.time()
-        cleanup_age = 24 * 60 * 60  # 24 hours
-        
-        cleaned_files = 0
-        
-        # Clean temp files
-        for filename in os.listdir(app.config['TEMP_FOLDER']):
-            filepath = os.path.join(app.config['TEMP_FOLDER'], filename)
-            if os.path.isfile(filepath):
-                file_age = current_time - os.path.getctime(filepath)
-                if file_age > cleanup_age:
-                    os.remove(filepath)
-                    cleaned_files += 1
-        
-        # Clean old encrypted files
-        for filename in os.listdir(app.config['ENCRYPTED_FOLDER']):
-            if filename.endswith('.zip'):  # Only clean package files
-                filepath = os.path.join(app.config['ENCRYPTED_FOLDER'], filename)
-                if os.path.isfile(filepath):
-                    file_age = current_time - os.path.getctime(filepath)
-                    if file_age > cleanup_age:
-                        os.remove(filepath)
-                        cleaned_files += 1
+        # Expired encrypted, decrypted, package and temp files (also reaped in the background)
+        cleaned_files = artifacts.reap()
         
         return jsonify({
             'success': True,
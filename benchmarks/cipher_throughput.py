@@ -0,0 +1,284 @@
+"""Throughput benchmark for every cipher in the app registry.
+
+Usage:
+    python -m benchmarks.cipher_throughput --sizes 1KB,1MB --output result.json
+    python -m benchmarks.cipher_throughput --threshold 0.15
+    python -m benchmarks.cipher_throughput --save-baseline
+    python -m benchmarks.cipher_throughput --sizes 1GB --operations encrypt,segmented_encrypt --threads 8
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from ciphers.registry import CipherRegistry
+from utils.file_processor import FileProcessor
+from utils.segment_runner import SegmentRunner
+from benchmarks.corpus import generate_corpus, parse_size, format_size
+
+ciphers = CipherRegistry()
+
+DEFAULT_SIZES = '1KB,10KB,100KB,1MB,10MB,100MB'
+# Report of the default grid that runs are compared against unless --no-baseline is given
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Every measurement keeps repeating for at least this long, so small inputs get more runs
+MIN_MEASURE_SECONDS = 0.2
+# Inputs smaller than this are reported against the baseline but never fail the run: their
+# timings are dominated by per-call overhead and scheduler noise
+MIN_GATED_BYTES = 1024 * 1024
+# Slowdowns below this many seconds per call are treated as noise
+NOISE_FLOOR = 0.005
+OPERATIONS = ['encrypt', 'decrypt', 'file_encrypt', 'file_decrypt', 'segmented_encrypt', 'segmented_decrypt']
+
+# Fixed keys so that runs are comparable; the one-time pad key is generated per run
+BENCHMARK_KEYS = {
+    'shift': '7',
+    'substitution': 'QWERTYUIOPASDFGHJKLZXCVBNM',
+    'affine': '5,8',
+    'vigenere': 'LEMON',
+    'hill': '3,2,5,7',
+    'permutation': 'ZEBRAS',
+    'playfair': 'MONARCHY',
+}
+
+
+def prepare_key(cipher_type: str, text_length: int, workdir: str, seed: int) -> str:
+    """Return the benchmark key for a cipher, writing an OTP pad file if needed"""
+    if cipher_type != 'onetimepad':
+        return BENCHMARK_KEYS[cipher_type]
+
+    rng = random.Random(seed)
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    pad_path = os.path.join(workdir, f'otp_pad_{text_length}.txt')
+    with open(pad_path, 'w') as f:
+        f.write(''.join(rng.choices(alphabet, k=text_length)))
+    return f'file:{pad_path}'
+
+
+def measure(fn: Callable[[], Any], repeat: int, track_memory: bool) -> Dict[str, Any]:
+    """Time fn (best of at least repeat runs, more for fast calls) and optionally record its peak traced allocation"""
+    best = math.inf
+    runs = 0
+    deadline = time.perf_counter() + MIN_MEASURE_SECONDS
+    while runs < repeat or time.perf_counter() < deadline:
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+        runs += 1
+
+    peak = None
+    if track_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {'seconds': best, 'runs': runs, 'peak_memory_bytes': peak}
+
+
+def benchmark_cipher(cipher_type: str, corpus: bytes, kind: str, operations: List[str],
+                     workdir: str, seed: int, repeat: int, track_memory: bool,
+                     segments: Optional[SegmentRunner] = None) -> List[Dict[str, Any]]:
+    """Run the selected operations for one cipher over one corpus"""
+    cipher = ciphers[cipher_type]
+    processor = FileProcessor(workdir)
+    segments = segments or SegmentRunner(1)
+
+    if kind == 'binary':
+        text = processor.encode_binary_content(corpus)
+    else:
+        text = corpus.decode('utf-8')
+
+    key = prepare_key(cipher_type, len(text), workdir, seed)
+    ciphertext = cipher.encrypt(text, key)
+
+    source_path = os.path.join(workdir, 'corpus.txt' if kind == 'text' else 'corpus.bin')
+    encrypted_path = os.path.join(workdir, 'corpus.dat')
+    restored_path = os.path.join(workdir, 'restored.bin')
+    with open(source_path, 'wb') as f:
+        f.write(corpus)
+
+    def file_encrypt():
+        file_data = processor.process_file_for_encryption(source_path, cipher_type)
+        if file_data['metadata']['is_binary']:
+            content = processor.encode_binary_content(file_data['content'])
+        else:
+            content = file_data['content'].decode('utf-8')
+        encrypted = cipher.encrypt(content, key)
+        processor.create_encrypted_file(encrypted, file_data['metadata'], encrypted_path)
+
+    def file_decrypt():
+        parsed = processor.parse_encrypted_file(encrypted_path)
+        decrypted = cipher.decrypt(parsed['encrypted_content'], key)
+        if parsed['metadata'].get('is_binary'):
+            processor.restore_binary_file(decrypted, restored_path)
+
+    # Letter buffers for the segmented (multi-threaded) kernels, which skip text conversion
+    plain_buffer = cipher.to_buffer(text)
+    cipher_buffer = cipher.to_buffer(ciphertext)
+
+    runners = {
+        'encrypt': lambda: cipher.encrypt(text, key),
+        'decrypt': lambda: cipher.decrypt(ciphertext, key),
+        'file_encrypt': file_encrypt,
+        'file_decrypt': file_decrypt,
+        'segmented_encrypt': lambda: segments.run(cipher, 'encrypt', plain_buffer, key),
+        'segmented_decrypt': lambda: segments.run(cipher, 'decrypt', cipher_buffer, key),
+    }
+
+    # file_decrypt needs the .dat produced by file_encrypt
+    file_encrypt()
+
+    results = []
+    for operation in operations:
+        stats = measure(runners[operation], repeat, track_memory)
+        seconds = stats['seconds']
+        results.append({
+            'cipher': cipher_type,
+            'operation': operation,
+            'kind': kind,
+            'size': len(corpus),
+            'size_label': format_size(len(corpus)),
+            'seconds': seconds,
+            'runs': stats['runs'],
+            'mb_per_s': (len(corpus) / (1024 * 1024)) / seconds if seconds > 0 else None,
+            'peak_memory_bytes': stats['peak_memory_bytes'],
+        })
+    return results
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    return f"{result['cipher']}/{result['operation']}/{result.get('kind', 'text')}/{result['size']}"
+
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Any],
+                        threshold: float) -> List[Dict[str, Any]]:
+    """Return the results of at least MIN_GATED_BYTES whose throughput dropped more than threshold below the baseline"""
+    baseline_results = {result_key(r): r for r in baseline.get('results', [])}
+    regressions = []
+
+    for result in results:
+        previous = baseline_results.get(result_key(result))
+        if not previous or not previous.get('mb_per_s') or not result.get('mb_per_s'):
+            continue
+
+        change = (result['mb_per_s'] - previous['mb_per_s']) / previous['mb_per_s']
+        result['baseline_mb_per_s'] = previous['mb_per_s']
+        result['change'] = change
+        slowdown = result['seconds'] - previous.get('seconds', result['seconds'])
+        if change < -threshold and result['size'] >= MIN_GATED_BYTES and slowdown > NOISE_FLOOR:
+            regressions.append({
+                'cipher': result['cipher'],
+                'operation': result['operation'],
+                'size_label': result['size_label'],
+                'baseline_mb_per_s': previous['mb_per_s'],
+                'mb_per_s': result['mb_per_s'],
+                'change': change,
+            })
+
+    return regressions
+
+
+def run(sizes: List[int], cipher_types: List[str], operations: List[str], kind: str,
+        seed: int, repeat: int, track_memory: bool, threads: int = 1) -> Dict[str, Any]:
+    """Run the benchmark grid and return the JSON report"""
+    results = []
+    segments = SegmentRunner(threads, min_parallel_bytes=0)
+    with tempfile.TemporaryDirectory(prefix='cipher_bench_') as workdir:
+        for size in sizes:
+            corpus = generate_corpus(size, kind, seed)
+            for cipher_type in cipher_types:
+                results.extend(benchmark_cipher(cipher_type, corpus, kind, operations,
+                                                workdir, seed, repeat, track_memory, segments))
+                print(f"{cipher_type:<13} {format_size(size):>6} done", file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'kind': kind,
+            'seed': seed,
+            'repeat': repeat,
+            'threads': threads,
+            'created': time.time(),
+        },
+        'results': results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Cipher throughput benchmark')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Comma separated input sizes, e.g. 1KB,1MB')
+    parser.add_argument('--ciphers', default=','.join(ciphers), help='Comma separated cipher types')
+    parser.add_argument('--operations', default=','.join(OPERATIONS), help='Comma separated operations')
+    parser.add_argument('--kind', choices=['text', 'binary'], default='text', help='Synthetic corpus kind')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus and key seed')
+    parser.add_argument('--repeat', type=int, default=3, help='Minimum timed runs per measurement (best is kept)')
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1,
+                        help='Threads used by the segmented_* operations')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak memory pass')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Baseline JSON report to compare against (default benchmarks/baseline.json)')
+    parser.add_argument('--no-baseline', action='store_true', help='Skip the comparison against --baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='Write the report to --baseline')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Allowed relative throughput drop before failing (default 0.10)')
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    cipher_types = [c.strip() for c in args.ciphers.split(',') if c.strip()]
+    operations = [o.strip() for o in args.operations.split(',') if o.strip()]
+
+    for cipher_type in cipher_types:
+        if cipher_type not in ciphers:
+            parser.error(f'Unknown cipher type: {cipher_type}')
+    for operation in operations:
+        if operation not in OPERATIONS:
+            parser.error(f'Unknown operation: {operation}')
+
+    report = run(sizes, cipher_types, operations, args.kind, args.seed, args.repeat, not args.no_memory,
+                 max(args.threads, 1))
+
+    regressions = []
+    if not args.no_baseline and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report['results'], baseline, args.threshold)
+        report['threshold'] = args.threshold
+        report['regressions'] = regressions
+        if not any('baseline_mb_per_s' in result for result in report['results']):
+            print(f"WARNING {args.baseline} has no results for this grid; nothing was compared", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression['cipher']}/{regression['operation']}/{regression['size_label']}: "
+              f"{regression['baseline_mb_per_s']:.3f} -> {regression['mb_per_s']:.3f} MB/s "
+              f"({regression['change']:+.1%})", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import random
+import re
+from typing import List
+
+# Small vocabulary weighted towards common English words so that the
+# letter distribution of the corpus roughly resembles real plaintext.
+WORDS = [
+    'the', 'of', 'and', 'to', 'in', 'a', 'is', 'that', 'for', 'it', 'as', 'was',
+    'with', 'be', 'by', 'on', 'not', 'he', 'this', 'are', 'or', 'his', 'from',
+    'at', 'which', 'but', 'have', 'an', 'had', 'they', 'you', 'were', 'their',
+    'one', 'all', 'we', 'can', 'her', 'has', 'there', 'been', 'if', 'more',
+    'when', 'will', 'would', 'who', 'so', 'no', 'cipher', 'secret', 'message',
+    'key', 'letter', 'alphabet', 'attack', 'plaintext', 'encryption', 'quickly',
+    'zebra', 'jumping', 'over', 'lazy', 'dog', 'brown', 'fox', 'quiz', 'vex',
+]
+PUNCTUATION = ['.', ',', ';', '!', '?']
+
+SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def generate_text(size: int, seed: int = 0) -> bytes:
+    """Generate a seeded English-like text corpus of exactly size bytes"""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+
+    while length < size:
+        sentence = [rng.choice(WORDS) for _ in range(rng.randint(4, 14))]
+        sentence[0] = sentence[0].capitalize()
+        line = ' '.join(sentence) + rng.choice(PUNCTUATION)
+        line += '\n' if rng.random() < 0.2 else ' '
+        parts.append(line)
+        length += len(line)
+
+    return ''.join(parts).encode('ascii')[:size]
+
+
+def generate_binary(size: int, seed: int = 0) -> bytes:
+    """Generate seeded random bytes of exactly size bytes"""
+    return random.Random(seed).randbytes(size)
+
+
+def generate_corpus(size: int, kind: str = 'text', seed: int = 0) -> bytes:
+    """Generate a synthetic corpus of the given kind ('text' or 'binary')"""
+    if kind == 'text':
+        return generate_text(size, seed)
+    elif kind == 'binary':
+        return generate_binary(size, seed)
+    raise ValueError(f"Unknown corpus kind: {kind}")
+
+
+def parse_size(value: str) -> int:
+    """Parse a human readable size such as '1KB' or '100MB' into bytes"""
+    match = re.fullmatch(r'\s*(\d+)\s*([KMG]?B)?\s*', value.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2) or 'B']
+
+
+def format_size(size: int) -> str:
+    """Format a byte count using the largest exact unit"""
+    for unit in ('GB', 'MB', 'KB'):
+        if size >= SIZE_UNITS[unit] and size % SIZE_UNITS[unit] == 0:
+            return f"{size // SIZE_UNITS[unit]}{unit}"
+    return f"{size}B"
@@ -0,0 +1,265 @@
+"""Success-rate benchmark for the cryptanalysis crackers.
+
+Every trial encrypts a slice of held-out English text (or of --plaintext) with a
+fresh key and hands the ciphertext to a cracker. A trial
+counts as recovered once the cracker's best key decrypts at least --threshold
+of the letters correctly; the report gives the recovery rate under each time
+budget, the time to solution and the evaluations per second, per cracker,
+cipher and ciphertext length.
+
+Keys, decoy words and plaintext offsets all come from generators seeded with
+--seed, so two runs with the same options attack the same ciphertexts and
+their reports can be compared across releases. The default plaintext,
+benchmarks/heldout_english.txt, is the text of the GNU GPL version 3, which
+was left out of the quadgram table the solvers score with.
+
+The annealing solvers follow the same schedule whatever their deadline, so one
+seeded run with the largest budget also answers every smaller budget.
+
+Usage:
+    python -m benchmarks.cryptanalysis_success --lengths 200,400,800 --budgets 1,5,20 --output crack.json
+    python -m benchmarks.cryptanalysis_success --crackers dictionary --ciphers vigenere --wordlist-size 50000
+    python -m benchmarks.cryptanalysis_success --plaintext book.txt --crackers anneal --ciphers playfair --budgets 30,60
+    python -m benchmarks.cryptanalysis_success --plaintext synthetic --lengths 400
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ciphers.registry import load_cipher_class
+from cryptanalysis.dictionary_attack import ATTACK_CIPHERS, DictionaryAttack
+from cryptanalysis.solvers import SOLVER_CIPHERS, create_solver
+from utils.crypto_utils import AFFINE_MULTIPLIERS, CryptoUtils
+from benchmarks.corpus import generate_text
+
+DEFAULT_LENGTHS = '100,200,400,800'
+DEFAULT_BUDGETS = '1,5,20'
+# English text none of the scoring tables were built from; --plaintext synthetic uses the corpus instead
+DEFAULT_PLAINTEXT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'heldout_english.txt')
+
+# Seconds between checks of the annealing solver's best key
+PROGRESS_INTERVAL = 0.1
+
+
+def make_plaintext(letters: int, seed: int, source: Optional[str] = None) -> str:
+    """Return letters A-Z letters of the seeded synthetic corpus, or from a seeded offset of source"""
+    if source is None:
+        text = generate_text(letters * 2 + 64, seed)
+        return ''.join(c for c in text.decode('ascii').upper() if 'A' <= c <= 'Z')[:letters]
+
+    start = random.Random(seed).randrange(max(len(source) - letters, 0) + 1)
+    return source[start:start + letters]
+
+
+def random_word(rng: random.Random, min_length: int, max_length: int) -> str:
+    """Random uppercase word with a length in [min_length, max_length]"""
+    return ''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(min_length, max_length)))
+
+
+def seeded_key(cipher_type: str, rng: random.Random) -> str:
+    """A random key in the format of CryptoUtils.generate_random_key, drawn from rng so runs repeat"""
+    if cipher_type == 'shift':
+        return str(rng.randint(1, 25))
+    if cipher_type == 'substitution':
+        return ''.join(rng.sample(string.ascii_uppercase, 26))
+    if cipher_type == 'affine':
+        return f"{rng.choice(AFFINE_MULTIPLIERS)},{rng.randrange(26)}"
+    if cipher_type in ('vigenere', 'permutation'):
+        return random_word(rng, 3, 8)
+    if cipher_type == 'playfair':
+        return random_word(rng, 5, 10)
+    if cipher_type == 'hill':
+        while True:
+            matrix = [rng.randrange(26) for _ in range(4)]
+            if CryptoUtils.gcd((matrix[0] * matrix[3] - matrix[1] * matrix[2]) % 26, 26) == 1:
+                return ','.join(map(str, matrix))
+    raise ValueError(f"Cannot generate keys for cipher type '{cipher_type}'")
+
+
+def letter_accuracy(cipher, buffer: bytes, key: str, truth: bytes) -> float:
+    """Fraction of letters a key decrypts the same way as the true key"""
+    try:
+        decrypted = cipher.decrypt_buffer(buffer, key)
+    except ValueError:
+        return 0.0
+    if not truth:
+        return 0.0
+    return sum(a == b for a, b in zip(decrypted, truth)) / len(truth)
+
+
+def crack_anneal(cipher_type: str, ciphertext: str, key: str, accuracy: Callable[[str], float], budget: float,
+                 threshold: float, seed: int, wordlist_size: int) -> Dict[str, Any]:
+    """Run the annealing solver until it recovers the plaintext or the budget runs out"""
+    solver = create_solver(cipher_type, ciphertext, seconds=budget, seed=seed, progress_interval=PROGRESS_INTERVAL)
+    solved = {}
+
+    def check(progress):
+        if 'seconds' not in solved and accuracy(progress['key']) >= threshold:
+            solved['seconds'] = progress['seconds']
+
+    result = solver.run(on_progress=check, should_stop=lambda: 'seconds' in solved)
+    final_accuracy = accuracy(result['key'])
+    if 'seconds' not in solved and final_accuracy >= threshold:
+        solved['seconds'] = result['seconds']
+    return {
+        'key': result['key'],
+        'accuracy': final_accuracy,
+        'time_to_solution': solved.get('seconds'),
+        'seconds': result['seconds'],
+        'evaluations': result['iterations'],
+        'evaluations_per_second': result['evaluations_per_second'],
+    }
+
+
+def crack_dictionary(cipher_type: str, ciphertext: str, key: str, accuracy: Callable[[str], float], budget: float,
+                     threshold: float, seed: int, wordlist_size: int) -> Dict[str, Any]:
+    """Run the dictionary attack with a wordlist of random decoys that also holds the true key"""
+    rng = random.Random(f'decoys:{seed}')
+    words = [seeded_key(cipher_type, rng) for _ in range(wordlist_size)] + [key]
+    result = DictionaryAttack(cipher_type, words, top=1).run(ciphertext)
+    # The budget does not apply: the attack always tests the whole wordlist
+    best = result['candidates'][0]['key'] if result['candidates'] else ''
+    best_accuracy = accuracy(best) if best else 0.0
+    return {
+        'key': best,
+        'accuracy': best_accuracy,
+        'time_to_solution': result['seconds'] if best_accuracy >= threshold else None,
+        'seconds': result['seconds'],
+        'evaluations': result['tested'] + result['pruned'],
+        'evaluations_per_second': (result['tested'] + result['pruned']) / result['seconds'] if result['seconds'] else None,
+    }
+
+
+# name -> (cipher types it attacks, run function)
+CRACKERS = {
+    'anneal': (SOLVER_CIPHERS, crack_anneal),
+    'dictionary': (ATTACK_CIPHERS, crack_dictionary),
+}
+
+
+def run_trial(cracker: str, cipher_type: str, letters: int, budget: float, threshold: float, seed: int,
+              wordlist_size: int, source: Optional[str] = None) -> Dict[str, Any]:
+    """Encrypt one plaintext with a seeded random key and try to crack it"""
+    cipher = load_cipher_class(cipher_type)()
+    key = seeded_key(cipher_type, random.Random(f'key:{seed}'))
+    ciphertext = cipher.encrypt(make_plaintext(letters, seed, source), key)
+    buffer = cipher.to_buffer(ciphertext)
+    truth = cipher.decrypt_buffer(buffer, key)
+
+    # Only the dictionary attack sees the true key, which it hides among its decoy words
+    crack = CRACKERS[cracker][1]
+    outcome = crack(cipher_type, ciphertext, key, lambda candidate: letter_accuracy(cipher, buffer, candidate, truth),
+                    budget, threshold, seed, wordlist_size)
+    return dict(outcome, true_key=key, seed=seed)
+
+
+def summarize(trials: List[Dict[str, Any]], budgets: List[float]) -> Dict[str, Any]:
+    """Recovery rate per budget, time to solution and evaluation rate over the trials of one grid cell"""
+    times = [trial['time_to_solution'] for trial in trials if trial['time_to_solution'] is not None]
+    rates = [trial['evaluations_per_second'] for trial in trials if trial['evaluations_per_second']]
+    return {
+        'trials': len(trials),
+        'recovery_rate': {
+            str(budget): sum(1 for t in times if t <= budget) / len(trials) for budget in budgets
+        },
+        'median_time_to_solution': statistics.median(times) if times else None,
+        'mean_accuracy': statistics.fmean(trial['accuracy'] for trial in trials),
+        'evaluations_per_second': statistics.fmean(rates) if rates else None,
+    }
+
+
+def run(crackers: List[str], cipher_types: Optional[List[str]], lengths: List[int], budgets: List[float],
+        trials: int, threshold: float, seed: int, wordlist_size: int,
+        source: Optional[str] = None, plaintext_name: str = 'synthetic') -> Dict[str, Any]:
+    """Run every cracker over the grid of ciphers and lengths and return the JSON report"""
+    results = []
+    budget = max(budgets)
+    for cracker in crackers:
+        for cipher_type in CRACKERS[cracker][0]:
+            if cipher_types and cipher_type not in cipher_types:
+                continue
+            for letters in lengths:
+                runs = [run_trial(cracker, cipher_type, letters, budget, threshold, seed + trial, wordlist_size,
+                                  source)
+                        for trial in range(trials)]
+                summary = summarize(runs, budgets)
+                results.append(dict(summary, cracker=cracker, cipher=cipher_type, letters=letters, runs=runs))
+                rate = summary['recovery_rate'][str(budget)]
+                print(f"{cracker:<11} {cipher_type:<13} {letters:>6} letters  "
+                      f"recovered {rate:6.1%} within {budget:g}s", file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'trials': trials,
+            'budgets': budgets,
+            'threshold': threshold,
+            'wordlist_size': wordlist_size,
+            'plaintext': plaintext_name,
+            'created': time.time(),
+        },
+        'results': results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Success-rate benchmark for the cryptanalysis crackers')
+    parser.add_argument('--crackers', default=','.join(CRACKERS), help='Comma separated crackers')
+    parser.add_argument('--ciphers', help='Comma separated cipher types (default: every type a cracker attacks)')
+    parser.add_argument('--lengths', default=DEFAULT_LENGTHS, help='Comma separated ciphertext lengths in letters')
+    parser.add_argument('--budgets', default=DEFAULT_BUDGETS, help='Comma separated time budgets in seconds')
+    parser.add_argument('--trials', type=int, default=5, help='Random keys per grid cell')
+    parser.add_argument('--threshold', type=float, default=0.95,
+                        help='Fraction of letters decrypted correctly that counts as recovered (default 0.95)')
+    parser.add_argument('--wordlist-size', type=int, default=10000, help='Decoy words given to the dictionary attack')
+    parser.add_argument('--plaintext', default=DEFAULT_PLAINTEXT,
+                        help="English text file to draw plaintexts from, or 'synthetic' for the synthetic corpus "
+                             "(default benchmarks/heldout_english.txt)")
+    parser.add_argument('--seed', type=int, default=0, help='Key, plaintext and solver seed')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    crackers = [c.strip() for c in args.crackers.split(',') if c.strip()]
+    cipher_types = [c.strip() for c in args.ciphers.split(',') if c.strip()] if args.ciphers else None
+    lengths = [int(n) for n in args.lengths.split(',') if n.strip()]
+    budgets = sorted(float(b) for b in args.budgets.split(',') if b.strip())
+
+    for cracker in crackers:
+        if cracker not in CRACKERS:
+            parser.error(f'Unknown cracker: {cracker}')
+    for cipher_type in cipher_types or []:
+        if not any(cipher_type in CRACKERS[cracker][0] for cracker in crackers):
+            parser.error(f'No selected cracker attacks {cipher_type}')
+    if not budgets or not lengths:
+        parser.error('Need at least one length and one budget')
+
+    source = None
+    if args.plaintext != 'synthetic':
+        with open(args.plaintext, 'r', encoding='utf-8', errors='ignore') as f:
+            source = ''.join(c for c in f.read().upper() if 'A' <= c <= 'Z')
+        if len(source) < max(lengths):
+            parser.error(f'{args.plaintext} holds fewer than {max(lengths)} letters')
+
+    report = run(crackers, cipher_types, lengths, budgets, max(args.trials, 1), args.threshold, args.seed,
+                 args.wordlist_size, source, os.path.basename(args.plaintext))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Regression check for decompression bombs sent to the decryption routes.
+
+Every case uploads a small .dat whose zlib payload expands to --expands-to
+bytes, far past the decompressed-size caps, and fails unless the route
+refuses it and the peak traced allocation while handling it stays within
+a few times the cap. The caps are lowered to --limit for the run so the
+check is quick; the app's own defaults behave the same at a larger scale.
+The batch cases turn MAX_DECOMPRESSED_BYTES off, so they show that
+BATCH_DECRYPT_MAX_MEMBER_BYTES also holds the payload inside a member.
+
+Cases:
+    decrypt          /decrypt answers 400
+    decrypt_stream   /decrypt_stream stops once the cap is passed
+    batch_stored     /batch_decrypt lists a stored ZIP member in batch_decrypt_errors.txt
+    batch_deflated   the same for a deflated member, whose ZIP size header is small too
+
+Usage:
+    python -m benchmarks.decompression_bomb
+    python -m benchmarks.decompression_bomb --limit 16MB --expands-to 1GB
+"""
+import argparse
+import gc
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+import zipfile
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.corpus import parse_size, format_size
+from benchmarks.memory_footprint import load_app
+
+DEFAULT_LIMIT = '4MB'
+DEFAULT_EXPANDS_TO = '300MB'
+
+# Peak traced bytes allowed per byte of the cap, plus a fixed allowance
+PEAK_FACTOR = 4
+BASE_ALLOWANCE = 4 * 1024 * 1024
+
+CASES = ('decrypt', 'decrypt_stream', 'batch_stored', 'batch_deflated')
+
+
+def make_bomb(app_module, expands_to: int) -> bytes:
+    """A Shift-cipher .dat whose zlib payload holds expands_to letters and whose header gives no CONTENT_LENGTH"""
+    compressor = zlib.compressobj(9)
+    block = b'A' * (1024 * 1024)
+    parts = [compressor.compress(block) for _ in range(expands_to // len(block))]
+    parts.append(compressor.compress(b'A' * (expands_to % len(block))))
+    parts.append(compressor.flush())
+    header = app_module.file_processor.format_header({
+        'original_filename': 'a.txt',
+        'cipher_type': 'shift',
+        'is_binary': False,
+        'compression': 'zlib',
+    })
+    return header.encode('utf-8') + b''.join(parts)
+
+
+def make_package(bomb: bytes, compression: int) -> bytes:
+    """A ZIP package holding the bomb as a.dat"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression) as package:
+        package.writestr('a.dat', bomb)
+    return buffer.getvalue()
+
+
+def measure_request(app_module, route: str, data: Dict[str, Any]) -> Tuple[int, int, bytes]:
+    """Send one request and return (status code, peak traced bytes while it was handled, body)"""
+    from werkzeug.test import EnvironBuilder
+
+    builder = EnvironBuilder(path=route, method='POST', data=data)
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+    client = app_module.app.test_client()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        response = client.open(environ)
+        try:
+            body = b''.join(response.response)
+        finally:
+            response.close()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return response.status_code, peak, body
+
+
+def check_case(app_module, case: str, bomb: bytes, limit: int) -> Dict[str, Any]:
+    """Send one bomb and check the route refused it within the memory allowance"""
+    form = {'key': '3'}
+    if case.startswith('batch'):
+        route = '/batch_decrypt'
+        compression = zipfile.ZIP_STORED if case == 'batch_stored' else zipfile.ZIP_DEFLATED
+        form['package'] = (io.BytesIO(make_package(bomb, compression)), 'bomb.zip')
+    else:
+        route = '/' + case
+        form.update(cipher_type='shift', encrypted_file=(io.BytesIO(bomb), 'a.dat'))
+
+    result = {'case': case, 'route': route, 'ok': False}
+    processor = app_module.file_processor
+    # Batch members must be held by BATCH_DECRYPT_MAX_MEMBER_BYTES alone, not by the app-wide cap
+    processor.max_decompressed_bytes = None if case.startswith('batch') else limit
+    try:
+        status, peak, body = measure_request(app_module, route, form)
+    except ValueError as e:
+        # /decrypt_stream has sent its headers by the time the cap is passed, so the stream itself fails
+        status, peak, body = None, None, str(e).encode('utf-8')
+        if case != 'decrypt_stream':
+            result['error'] = f'unexpected error: {e}'
+            return result
+    result.update(status=status, peak_bytes=peak)
+
+    budget = PEAK_FACTOR * limit + BASE_ALLOWANCE
+    if case == 'decrypt' and status != 400:
+        result['error'] = f'answered {status}, expected 400'
+    elif case == 'decrypt_stream' and status is not None:
+        result['error'] = f'streamed the whole payload ({len(body)} bytes) with {status}'
+    elif case.startswith('batch'):
+        names = zipfile.ZipFile(io.BytesIO(body)).namelist() if status == 200 else []
+        if names != ['batch_decrypt_errors.txt']:
+            result['error'] = f'answered {status} with {names}, expected only batch_decrypt_errors.txt'
+        else:
+            result['ok'] = True
+    else:
+        result['ok'] = True
+
+    if result['ok'] and peak is not None and peak > budget:
+        result.update(ok=False, error=f'peak {peak} bytes is over the {budget} byte allowance')
+    return result
+
+
+def run(cases: List[str], limit: int, expands_to: int) -> List[Dict[str, Any]]:
+    """Check every case with the caps lowered to limit"""
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='bomb_check_') as workdir:
+        try:
+            app_module = load_app(workdir)
+            app_module.app.config['MAX_DECOMPRESSED_BYTES'] = limit
+            app_module.app.config['BATCH_DECRYPT_MAX_MEMBER_BYTES'] = limit
+            bomb = make_bomb(app_module, expands_to)
+            print(f"bomb: {format_size(len(bomb))} expanding to {format_size(expands_to)}, "
+                  f"cap {format_size(limit)}", file=sys.stderr)
+            for case in cases:
+                result = check_case(app_module, case, bomb, limit)
+                results.append(result)
+                status = 'ok' if result['ok'] else f"FAILED {result['error']}"
+                peak = result.get('peak_bytes')
+                peak_text = f"{peak / 1024 / 1024:8.1f} MB" if peak is not None else '       - MB'
+                print(f"{case:<15} {peak_text} {status}", file=sys.stderr)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Check that the decryption routes refuse decompression bombs')
+    parser.add_argument('--cases', default=','.join(CASES), help='Comma separated cases')
+    parser.add_argument('--limit', default=DEFAULT_LIMIT, help='Decompressed-size cap used for the run')
+    parser.add_argument('--expands-to', default=DEFAULT_EXPANDS_TO, help='Letters the bomb payload expands to')
+    args = parser.parse_args(argv)
+
+    cases = [c.strip() for c in args.cases.split(',') if c.strip()]
+    for case in cases:
+        if case not in CASES:
+            parser.error(f'Unknown case: {case}')
+    limit, expands_to = parse_size(args.limit), parse_size(args.expands_to)
+    if expands_to <= limit:
+        parser.error('--expands-to must be larger than --limit')
+
+    results = run(cases, limit, expands_to)
+    return 0 if all(result['ok'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
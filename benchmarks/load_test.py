@@ -0,0 +1,396 @@
+"""Load-testing harness with per-route latency percentiles.
+
+Starts the app on a local port in its own interpreter (or targets --url) and
+runs a weighted mix of requests from concurrent client threads. Running
+several concurrency levels shows the saturation point as the level where
+throughput stops growing while p95/p99 latency keeps climbing.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 1,4,16 --duration 10 --output load.json
+    python -m benchmarks.load_test --mix encrypt=3,decrypt=3,analyze_text=1 --ciphers vigenere,hill
+    python -m benchmarks.load_test --client test --concurrency 8
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --duration 30
+"""
+import argparse
+import http.client
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.cipher_throughput import BENCHMARK_KEYS
+from benchmarks.corpus import generate_corpus, parse_size
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUTES = ['encrypt', 'decrypt', 'encrypt_file', 'batch_encrypt', 'analyze_text', 'validate_key',
+          'generate_key', 'generate_keys']
+DEFAULT_MIX = 'encrypt=4,decrypt=4,encrypt_file=2,batch_encrypt=1,analyze_text=2,validate_key=2,generate_key=1,generate_keys=1'
+# Different payloads per (route, cipher), so repeated uploads are not all answered by the result cache
+PAYLOAD_VARIANTS = 8
+# Keys requested per /generate_keys call
+GENERATED_KEYS = 100
+
+# One prepared HTTP request; body is already encoded
+LoadRequest = namedtuple('LoadRequest', ['route', 'cipher', 'method', 'path', 'body', 'headers'])
+
+# Serves the app on a free local port and prints the port once it is listening
+SERVER_CODE = """
+from werkzeug.serving import make_server
+import app
+server = make_server('127.0.0.1', 0, app.app, threaded=True)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+
+def _form(fields: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+    """Encode form fields (file values are (bytes, filename) tuples, or lists of them) as multipart"""
+    from werkzeug.test import EnvironBuilder
+
+    data = {}
+    for name, value in fields.items():
+        if isinstance(value, list):
+            data[name] = [(io.BytesIO(content), filename) for content, filename in value]
+        elif isinstance(value, tuple):
+            data[name] = (io.BytesIO(value[0]), value[1])
+        else:
+            data[name] = value
+    builder = EnvironBuilder(method='POST', data=data)
+    try:
+        environ = builder.get_environ()
+        body = environ['wsgi.input'].read()
+    finally:
+        builder.close()
+    return body, {'Content-Type': environ['CONTENT_TYPE']}
+
+
+def _json(payload: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+    """Encode a JSON request body"""
+    return json.dumps(payload).encode('utf-8'), {'Content-Type': 'application/json'}
+
+
+def build_requests(route: str, cipher_type: str, payload_size: int, seed: int) -> List[LoadRequest]:
+    """Prepare the request variants of one route for one cipher"""
+    from ciphers.registry import CipherRegistry
+    from utils.crypto_utils import CryptoUtils
+
+    key = BENCHMARK_KEYS[cipher_type]
+    requests = []
+    for variant in range(PAYLOAD_VARIANTS):
+        text = generate_corpus(payload_size, 'text', seed + variant)
+        if route == 'encrypt':
+            body, headers = _form({'cipher_type': cipher_type, 'key': key, 'text_input': text.decode('ascii')})
+            method, path = 'POST', '/encrypt'
+        elif route == 'encrypt_file':
+            body, headers = _form({'cipher_type': cipher_type, 'key': key, 'file': (text, f'load_{variant}.txt')})
+            method, path = 'POST', '/encrypt'
+        elif route == 'decrypt':
+            ciphertext = CipherRegistry()[cipher_type].encrypt(text.decode('ascii'), key)
+            body, headers = _form({'cipher_type': cipher_type, 'key': key, 'encrypted_input': ciphertext})
+            method, path = 'POST', '/decrypt'
+        elif route == 'batch_encrypt':
+            files = [(generate_corpus(payload_size, 'text', seed + variant * 3 + i), f'load_{variant}_{i}.txt')
+                     for i in range(3)]
+            body, headers = _form({'cipher_type': cipher_type, 'key': key, 'files': files})
+            method, path = 'POST', '/batch_encrypt'
+        elif route == 'analyze_text':
+            body, headers = _json({'text': text.decode('ascii')})
+            method, path = 'POST', '/analyze_text'
+        elif route == 'validate_key':
+            body, headers = _json({'cipher_type': cipher_type, 'key': key})
+            method, path = 'POST', '/validate_key'
+        elif route == 'generate_key':
+            body, headers = b'', {}
+            method, path = 'GET', f'/generate_key/{cipher_type}'
+        elif route == 'generate_keys':
+            if cipher_type not in CryptoUtils.BULK_KEY_TYPES:
+                return []
+            body, headers = b'', {}
+            method, path = 'GET', f'/generate_keys/{cipher_type}?count={GENERATED_KEYS}'
+        else:
+            raise ValueError(f"Unknown route: {route}")
+        # Routes that ignore the cipher are reported under '-'
+        label = '-' if route == 'analyze_text' else cipher_type
+        requests.append(LoadRequest(route, label, method, path, body, headers))
+    return requests
+
+
+def build_schedule(mix: Dict[str, int], cipher_types: List[str], payload_size: int,
+                   seed: int) -> List[Tuple[List[LoadRequest], float]]:
+    """Return (request variants, weight) per route and cipher; a route's weight is shared by its ciphers"""
+    schedule = []
+    for route, weight in mix.items():
+        targets = cipher_types[:1] if route == 'analyze_text' else cipher_types
+        groups = [build_requests(route, cipher_type, payload_size, seed) for cipher_type in targets]
+        groups = [group for group in groups if group]
+        for group in groups:
+            schedule.append((group, weight / len(groups)))
+    return schedule
+
+
+class HttpSender:
+    """Sends requests over keep-alive HTTP connections, one per client thread"""
+
+    def __init__(self, url: str):
+        parsed = urllib.parse.urlsplit(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.prefix = parsed.path.rstrip('/')
+        self._local = threading.local()
+
+    def __call__(self, request: LoadRequest) -> int:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        try:
+            connection.request(request.method, self.prefix + request.path, request.body, request.headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            return 0
+
+
+class TestClientSender:
+    """Sends requests through the Flask test client inside this process, one client per thread"""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def __call__(self, request: LoadRequest) -> int:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(request.path, method=request.method, data=request.body, headers=request.headers)
+        response.get_data()
+        return response.status_code
+
+
+def start_server(workdir: str) -> Tuple[subprocess.Popen, str]:
+    """Start the app on a free local port in a fresh interpreter and return (process, base URL)"""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    # The app creates its working folders relative to its working directory
+    process = subprocess.Popen([sys.executable, '-c', SERVER_CODE], cwd=workdir, env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    port = process.stdout.readline().strip()
+    if not port:
+        process.kill()
+        raise RuntimeError('The app server did not start')
+    return process, f'http://127.0.0.1:{port}'
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list (0.0 when it is empty)"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(math.ceil(fraction * len(sorted_values)) - 1, 0)]
+
+
+def summarize(samples: List[Tuple[str, str, int, float]], seconds: float) -> List[Dict[str, Any]]:
+    """Throughput, error count and latency percentiles per route and cipher"""
+    groups = {}
+    for route, cipher_type, status, latency in samples:
+        groups.setdefault((route, cipher_type), []).append((status, latency))
+
+    results = []
+    for (route, cipher_type), group in sorted(groups.items()):
+        latencies = sorted(latency for _, latency in group)
+        statuses = {}
+        for status, _ in group:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        results.append({
+            'route': route,
+            'cipher': cipher_type,
+            'requests': len(group),
+            'errors': sum(1 for status, _ in group if not 200 <= status < 400),
+            'statuses': statuses,
+            'throughput_rps': len(group) / seconds if seconds else 0.0,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000,
+        })
+    return results
+
+
+def run_level(send: Callable[[LoadRequest], int], schedule: List[Tuple[List[LoadRequest], float]],
+              concurrency: int, duration: float, max_requests: Optional[int], seed: int) -> Dict[str, Any]:
+    """Run the mix with concurrency client threads until duration or max_requests is reached"""
+    groups = [group for group, _ in schedule]
+    weights = [weight for _, weight in schedule]
+    samples = []
+    lock = threading.Lock()
+    issued = [0]
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def client(index: int):
+        rng = random.Random(seed * 1000 + index)
+        local = []
+        while time.perf_counter() < deadline:
+            if max_requests is not None:
+                with lock:
+                    if issued[0] >= max_requests:
+                        break
+                    issued[0] += 1
+            request = rng.choice(rng.choices(groups, weights)[0])
+            start = time.perf_counter()
+            status = send(request)
+            local.append((request.route, request.cipher, status, time.perf_counter() - start))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    latencies = sorted(latency for *_, latency in samples)
+    return {
+        'concurrency': concurrency,
+        'seconds': seconds,
+        'requests': len(samples),
+        'errors': sum(1 for _, _, status, _ in samples if not 200 <= status < 400),
+        'throughput_rps': len(samples) / seconds if seconds else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'routes': summarize(samples, seconds),
+    }
+
+
+def run(mix: Dict[str, int], cipher_types: List[str], levels: List[int], duration: float,
+        max_requests: Optional[int], payload_size: int, client: str, url: Optional[str],
+        warmup: float, seed: int) -> Dict[str, Any]:
+    """Run every concurrency level against the app and return the JSON report"""
+    schedule = build_schedule(mix, cipher_types, payload_size, seed)
+    results = []
+    cwd = os.getcwd()
+    process = None
+
+    with tempfile.TemporaryDirectory(prefix='load_test_') as workdir:
+        try:
+            if client == 'test':
+                # The app creates its working folders relative to the working directory on import
+                if REPO_ROOT not in sys.path:
+                    sys.path.insert(0, REPO_ROOT)
+                os.chdir(workdir)
+                import app as app_module
+                send = TestClientSender(app_module.app)
+            else:
+                if url is None:
+                    process, url = start_server(workdir)
+                send = HttpSender(url)
+
+            if warmup > 0:
+                run_level(send, schedule, 1, warmup, None, seed)
+            for concurrency in levels:
+                result = run_level(send, schedule, concurrency, duration, max_requests, seed)
+                results.append(result)
+                print(f"concurrency {concurrency:>3}: {result['throughput_rps']:8.1f} req/s  "
+                      f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+                      f"p99 {result['p99_ms']:7.1f} ms  errors {result['errors']}", file=sys.stderr)
+        finally:
+            os.chdir(cwd)
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'client': client,
+            'url': url if client == 'http' else None,
+            'mix': mix,
+            'ciphers': cipher_types,
+            'payload_bytes': payload_size,
+            'duration': duration,
+            'max_requests': max_requests,
+            'seed': seed,
+            'created': time.time(),
+        },
+        'levels': results,
+    }
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse 'route=weight,...' into a weight per route"""
+    mix = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        route, _, weight = item.partition('=')
+        route = route.strip()
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route: {route}")
+        mix[route] = int(weight) if weight.strip() else 1
+        if mix[route] <= 0:
+            del mix[route]
+    if not mix:
+        raise ValueError('The mix contains no routes')
+    return mix
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Load test the app with a concurrent request mix')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Comma separated route=weight pairs')
+    parser.add_argument('--ciphers', default=','.join(BENCHMARK_KEYS), help='Comma separated cipher types')
+    parser.add_argument('--concurrency', default='1,4,16', help='Comma separated client thread counts')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per concurrency level')
+    parser.add_argument('--requests', type=int, help='Stop a level after this many requests')
+    parser.add_argument('--payload-size', default='4KB', help='Text size sent to the cipher routes')
+    parser.add_argument('--client', choices=['http', 'test'], default='http',
+                        help='http: real HTTP against a server process; test: threaded Flask test client')
+    parser.add_argument('--url', help='Base URL of an already running app (http client only)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Seconds of single-client warm-up')
+    parser.add_argument('--seed', type=int, default=0, help='Payload and request order seed')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+        levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+        payload_size = parse_size(args.payload_size)
+    except ValueError as e:
+        parser.error(str(e))
+    cipher_types = [c.strip() for c in args.ciphers.split(',') if c.strip()]
+    for cipher_type in cipher_types:
+        if cipher_type not in BENCHMARK_KEYS:
+            parser.error(f'Unsupported cipher type: {cipher_type}')
+    if not levels or min(levels) < 1:
+        parser.error('Concurrency levels must be positive')
+    if args.url and args.client != 'http':
+        parser.error('--url requires the http client')
+
+    report = run(mix, cipher_types, levels, args.duration, args.requests, payload_size, args.client,
+                 args.url, args.warmup, args.seed)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
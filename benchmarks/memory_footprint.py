@@ -0,0 +1,272 @@
+"""Peak-memory regression suite for the upload routes.
+
+Every scenario sends one request through the Flask test client while
+tracemalloc records the peak traced allocation, and fails when that peak
+exceeds the scenario's byte budget. Budgets are a multiple of the upload
+size plus a fixed allowance, so one extra copy of a large payload shows up
+as an overrun at every size. Routes that are known to need more than their
+budget are pinned, per cipher, in KNOWN_OVERRUNS to the peak they were
+measured at: they are reported, and fail the run as soon as they need more
+than that. Every other route is held to its scenario budget.
+
+Usage:
+    python -m benchmarks.memory_footprint --sizes 64KB,1MB,4MB --output memory.json
+    python -m benchmarks.memory_footprint --scenarios encrypt_file_binary --ciphers vigenere --sizes 16MB
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+from ciphers.registry import CIPHER_CLASSES
+from benchmarks.cipher_throughput import prepare_key
+from benchmarks.corpus import generate_corpus, parse_size, format_size
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = '64KB,1MB,4MB'
+DEFAULT_CIPHERS = list(CIPHER_CLASSES)
+
+# Fixed allowance on top of every budget (interpreter, Flask and Werkzeug overhead)
+BASE_ALLOWANCE = 2 * 1024 * 1024
+# Smaller uploads fit most budgets on BASE_ALLOWANCE alone, so they never mark a pin as stale
+STALE_PIN_MIN_BYTES = 1024 * 1024
+
+# name -> (route, corpus kind, peak bytes allowed per upload byte). Budgets state what a route
+# should need: the upload, the letter buffer, the result and its response body, with room for a
+# couple of transient copies. They are not calibrated to what the routes currently use
+SCENARIOS = {
+    'encrypt_text': ('/encrypt', 'text', 6.0),
+    'encrypt_file_text': ('/encrypt', 'text', 6.0),
+    'encrypt_file_binary': ('/encrypt', 'binary', 6.0),
+    'decrypt_text': ('/decrypt', 'text', 6.0),
+    'decrypt_file_text': ('/decrypt', 'text', 6.0),
+    'decrypt_file_binary': ('/decrypt', 'binary', 6.0),
+    'decrypt_stream_binary': ('/decrypt_stream', 'binary', 6.0),
+}
+
+_FORM_COPIES = 'the form field, its letter buffer and the JSON response hold extra copies'
+_HILL_VECTORS = 'Hill multiplies the whole text as int64 letter vectors'
+_PLAYFAIR_INDEX = 'Playfair decrypts through an index array of the whole text'
+
+# (scenario, cipher) -> (peak bytes allowed per upload byte, why the route needs more than its
+# scenario budget). Factors are the largest peak measured at 64KB-4MB, less BASE_ALLOWANCE, plus
+# 5%: a pinned route still fails once it grows. Lower or remove an entry once the route is fixed.
+# /encrypt of binary files (about 39x) is deliberately not pinned and fails until it is fixed
+KNOWN_OVERRUNS = {
+    ('encrypt_text', 'shift'): (9.2, _FORM_COPIES),
+    ('encrypt_text', 'substitution'): (9.2, _FORM_COPIES),
+    ('encrypt_text', 'affine'): (9.2, _FORM_COPIES),
+    ('encrypt_text', 'vigenere'): (9.2, _FORM_COPIES),
+    ('encrypt_text', 'permutation'): (9.2, _FORM_COPIES),
+    ('encrypt_text', 'onetimepad'): (9.2, _FORM_COPIES),
+    ('encrypt_text', 'playfair'): (9.2, _FORM_COPIES),
+    ('encrypt_text', 'hill'): (21.5, _HILL_VECTORS),
+    ('encrypt_file_text', 'hill'): (23.7, _HILL_VECTORS),
+    ('decrypt_text', 'hill'): (20.5, _HILL_VECTORS),
+    ('decrypt_file_text', 'hill'): (21.3, _HILL_VECTORS),
+    ('decrypt_file_binary', 'hill'): (34.0, _HILL_VECTORS),
+    ('encrypt_file_text', 'playfair'): (9.2, 'Playfair copies the text while inserting fillers'),
+    ('decrypt_file_text', 'playfair'): (6.9, _PLAYFAIR_INDEX),
+    ('decrypt_file_binary', 'playfair'): (10.5, _PLAYFAIR_INDEX),
+}
+
+
+def known_overrun(scenario: str, cipher_type: str) -> Optional[Tuple[float, str]]:
+    """(pinned peak bytes per upload byte, reason) of a route known to exceed its budget, or None"""
+    return KNOWN_OVERRUNS.get((scenario, cipher_type))
+
+
+def load_app(workdir: str):
+    """Import the Flask app with its working folders inside workdir and every cipher call inline"""
+    # The app creates its upload/output folders relative to the working directory on import,
+    # so keep the repository importable once the working directory changes
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    os.chdir(workdir)
+    import app as app_module
+    from utils.cipher_executor import CipherExecutor
+
+    # Offloaded calls would run in worker processes that tracemalloc cannot see
+    app_module.cipher_executor = CipherExecutor(app_module.cipher_executor.registry, max_workers=0)
+    app_module.app.config['TESTING'] = True
+    return app_module
+
+
+def build_form(app_module, scenario: str, cipher_type: str, corpus: bytes, key: str) -> Dict[str, Any]:
+    """Return the form data that sends corpus through a scenario's route"""
+    form = {'cipher_type': cipher_type, 'key': key}
+    filename = 'payload.txt' if SCENARIOS[scenario][1] == 'text' else 'payload.bin'
+
+    if scenario == 'encrypt_text':
+        form['text_input'] = corpus.decode('ascii')
+    elif scenario.startswith('encrypt_file'):
+        form['file'] = (io.BytesIO(corpus), filename)
+    elif scenario == 'decrypt_text':
+        form['encrypted_input'] = app_module.ciphers[cipher_type].encrypt(corpus.decode('ascii'), key)
+    else:
+        # File decryption needs the .dat the app itself produces for this upload
+        response = app_module.app.test_client().post('/encrypt', data=dict(form, file=(io.BytesIO(corpus), filename)))
+        if response.status_code != 200:
+            raise RuntimeError(f"could not prepare {scenario}: {response.get_json()}")
+        encrypted_path = os.path.join(app_module.app.config['ENCRYPTED_FOLDER'],
+                                      os.path.basename(response.get_json()['download_url']))
+        with open(encrypted_path, 'rb') as f:
+            form['encrypted_file'] = (io.BytesIO(f.read()), 'payload.dat')
+    return form
+
+
+def measure_request(app_module, route: str, data: Dict[str, Any]) -> Tuple[int, int]:
+    """Send one request and return (status code, peak traced bytes while it was handled)"""
+    from werkzeug.test import EnvironBuilder
+
+    # Encode the multipart body before tracing starts so only the server side is counted
+    builder = EnvironBuilder(path=route, method='POST', data=data)
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+    client = app_module.app.test_client()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        response = client.open(environ)
+        # Reading the body runs streamed responses to completion
+        for _ in response.response:
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    response.close()
+    return response.status_code, peak
+
+
+def measure_scenario(app_module, scenario: str, cipher_type: str, size: int, seed: int,
+                     workdir: str) -> Dict[str, Any]:
+    """Measure one scenario for one cipher and size against its budget"""
+    route, kind, factor = SCENARIOS[scenario]
+    # Escaped binary text is at most four characters per byte. The app only accepts one-time pad
+    # key files by name from its keys folder
+    keys_folder = os.path.join(workdir, 'keys')
+    os.makedirs(keys_folder, exist_ok=True)
+    key = prepare_key(cipher_type, 4 * size + 1, keys_folder, seed)
+    if key.startswith('file:'):
+        key = 'file:' + os.path.basename(key[5:])
+
+    # A first request with other content warms up imports and key caches; the measured one uses
+    # fresh content so the result cache cannot answer it
+    for offset in (1, 0):
+        form = build_form(app_module, scenario, cipher_type, generate_corpus(size, kind, seed + offset), key)
+        status, peak = measure_request(app_module, route, form)
+        del form
+        if status != 200:
+            raise RuntimeError(f"{scenario}/{cipher_type}/{format_size(size)} answered {status}")
+
+    budget = int(factor * size + BASE_ALLOWANCE)
+    known = known_overrun(scenario, cipher_type)
+    # A pinned route is allowed its measured peak, never less than the scenario budget
+    allowed = max(budget, int(known[0] * size + BASE_ALLOWANCE)) if known else budget
+    return {
+        'scenario': scenario,
+        'route': route,
+        'cipher': cipher_type,
+        'size_bytes': size,
+        'size_label': format_size(size),
+        'peak_bytes': peak,
+        'budget_bytes': budget,
+        'peak_per_byte': peak / size if size else None,
+        'allowed_bytes': allowed,
+        'over_budget': peak > budget,
+        'over_allowed': peak > allowed,
+        'known_overrun': known[1] if known else None,
+    }
+
+
+def run(sizes: List[int], cipher_types: List[str], scenarios: List[str], seed: int) -> Dict[str, Any]:
+    """Run every scenario and return the JSON report"""
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='memory_bench_') as workdir:
+        try:
+            app_module = load_app(workdir)
+            for scenario in scenarios:
+                for cipher_type in cipher_types:
+                    for size in sizes:
+                        result = measure_scenario(app_module, scenario, cipher_type, size, seed, workdir)
+                        results.append(result)
+                        print(f"{scenario:<22} {cipher_type:<13} {format_size(size):>6} "
+                              f"{result['peak_bytes'] / 1024 / 1024:8.1f} MB", file=sys.stderr)
+        finally:
+            os.chdir(cwd)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'created': time.time(),
+        },
+        'results': results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Peak-memory regression suite for the upload routes')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Comma separated upload sizes, e.g. 64KB,1MB')
+    parser.add_argument('--ciphers', default=','.join(DEFAULT_CIPHERS), help='Comma separated cipher types')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma separated scenarios')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus and key seed')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    cipher_types = [c.strip() for c in args.ciphers.split(',') if c.strip()]
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+
+    for cipher_type in cipher_types:
+        if cipher_type not in CIPHER_CLASSES:
+            parser.error(f'Unknown cipher type: {cipher_type}')
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            parser.error(f'Unknown scenario: {scenario}')
+
+    report = run(sizes, cipher_types, scenarios, args.seed)
+    overruns = [result for result in report['results'] if result['over_allowed']]
+    known = [result for result in report['results'] if result['over_budget'] and not result['over_allowed']]
+    # A pin is stale once its route fits the scenario budget at every size of at least STALE_PIN_MIN_BYTES
+    large = [result for result in report['results']
+             if result['known_overrun'] and result['size_bytes'] >= STALE_PIN_MIN_BYTES]
+    fixed = ({(result['scenario'], result['cipher']) for result in large}
+             - {(result['scenario'], result['cipher']) for result in large if result['over_budget']})
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    for result in known:
+        print(f"KNOWN OVERRUN {result['scenario']}/{result['cipher']}/{result['size_label']}: "
+              f"{result['peak_bytes']} > {result['budget_bytes']} bytes, pinned at {result['allowed_bytes']} "
+              f"({result['known_overrun']})", file=sys.stderr)
+    for scenario, cipher_type in sorted(fixed):
+        print(f"WITHIN BUDGET {scenario}/{cipher_type} fits its scenario budget; remove it from KNOWN_OVERRUNS",
+              file=sys.stderr)
+    for result in overruns:
+        print(f"OVER BUDGET {result['scenario']}/{result['cipher']}/{result['size_label']}: "
+              f"{result['peak_bytes']} > {result['allowed_bytes']} bytes", file=sys.stderr)
+
+    return 1 if overruns else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Regression check for cipher calls offloaded to the worker pool.
+
+Buffers larger than INLINE_CIPHER_BYTES skip the request thread: the
+executor validates the key with compile_key and hands the call to a worker
+process. This sends text over that threshold through /encrypt and /decrypt
+for every cipher, with a real pool, and fails unless both requests succeed,
+both were offloaded, and the round trip gives the plaintext back.
+
+Usage:
+    python -m benchmarks.offload_roundtrip
+    python -m benchmarks.offload_roundtrip --ciphers onetimepad,hill --size 256KB
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from ciphers.registry import CIPHER_CLASSES
+from benchmarks.cipher_throughput import prepare_key
+from benchmarks.corpus import generate_corpus, parse_size, format_size
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Comfortably above the app's 64KB INLINE_CIPHER_BYTES
+DEFAULT_SIZE = '96KB'
+
+
+def load_app(workdir: str):
+    """Import the Flask app with its working folders inside workdir and at least one cipher worker"""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    os.chdir(workdir)
+    import app as app_module
+    from utils.cipher_executor import CipherExecutor
+
+    executor = app_module.cipher_executor
+    app_module.cipher_executor = CipherExecutor(executor.registry, max(executor.max_workers, 1), executor.max_queue,
+                                                executor.inline_threshold)
+    app_module.app.config['TESTING'] = True
+    return app_module
+
+
+def check_cipher(app_module, cipher_type: str, size: int, workdir: str, seed: int) -> Dict[str, Any]:
+    """Encrypt and decrypt size bytes of text with one cipher; returns the outcome"""
+    cipher = app_module.ciphers[cipher_type]
+    plaintext = generate_corpus(size, 'text', seed).decode('ascii')
+    keys_folder = os.path.join(workdir, 'keys')
+    os.makedirs(keys_folder, exist_ok=True)
+    key = prepare_key(cipher_type, size + 1, keys_folder, seed)
+    if key.startswith('file:'):
+        # The app only accepts one-time pad key files by name from its keys folder
+        key = 'file:' + os.path.basename(key[5:])
+
+    client = app_module.app.test_client()
+    executor = app_module.cipher_executor
+    offloaded = executor.offloaded_calls
+    result = {'cipher': cipher_type, 'size_bytes': size, 'ok': False}
+
+    response = client.post('/encrypt', data={'cipher_type': cipher_type, 'key': key, 'text_input': plaintext})
+    if response.status_code != 200:
+        result['error'] = f"/encrypt answered {response.status_code}: {response.get_json()}"
+        return result
+    encrypted = response.get_json()['encrypted_text']
+
+    response = client.post('/decrypt', data={'cipher_type': cipher_type, 'key': key, 'encrypted_input': encrypted})
+    if response.status_code != 200:
+        result['error'] = f"/decrypt answered {response.status_code}: {response.get_json()}"
+        return result
+    decrypted = response.get_json()['decrypted_text']
+
+    if executor.offloaded_calls - offloaded < 2:
+        result['error'] = 'calls were not offloaded; raise --size above INLINE_CIPHER_BYTES'
+    elif decrypted != cipher.decrypt(cipher.encrypt(plaintext, key), key):
+        result['error'] = 'decrypted text differs from an inline round trip'
+    elif cipher_type != 'playfair' and decrypted[:1000] != cipher.from_buffer(cipher.to_buffer(plaintext[:2000]))[:1000]:
+        # Playfair inserts filler letters, so only the other ciphers give the plaintext back verbatim
+        result['error'] = 'decrypted text differs from the plaintext'
+    else:
+        result['ok'] = True
+    return result
+
+
+def run(cipher_types: List[str], size: int, seed: int) -> List[Dict[str, Any]]:
+    """Check every cipher and return the outcomes"""
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='offload_check_') as workdir:
+        try:
+            app_module = load_app(workdir)
+            for cipher_type in cipher_types:
+                result = check_cipher(app_module, cipher_type, size, workdir, seed)
+                results.append(result)
+                status = 'ok' if result['ok'] else f"FAILED {result['error']}"
+                print(f"{cipher_type:<13} {format_size(size):>6} {status}", file=sys.stderr)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Round trip offloaded cipher calls for every cipher')
+    parser.add_argument('--ciphers', default=','.join(CIPHER_CLASSES), help='Comma separated cipher types')
+    parser.add_argument('--size', default=DEFAULT_SIZE, help='Text size, above INLINE_CIPHER_BYTES')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus and key seed')
+    args = parser.parse_args(argv)
+
+    cipher_types = [c.strip() for c in args.ciphers.split(',') if c.strip()]
+    for cipher_type in cipher_types:
+        if cipher_type not in CIPHER_CLASSES:
+            parser.error(f'Unknown cipher type: {cipher_type}')
+
+    results = run(cipher_types, parse_size(args.size), args.seed)
+    return 0 if all(result['ok'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
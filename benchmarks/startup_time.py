@@ -0,0 +1,174 @@
+"""Startup-time benchmark for the app, the CLI and the cipher registry.
+
+Every measurement runs in a fresh interpreter so import caches do not leak
+between runs. Targets that must stay light also fail when they pull in a
+forbidden module (NumPy, Flask).
+
+Usage:
+    python -m benchmarks.startup_time --output result.json
+    python -m benchmarks.startup_time --threshold 0.25
+    python -m benchmarks.startup_time --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from ciphers.registry import CIPHER_CLASSES
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Report that runs are compared against unless --no-baseline is given
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_baseline.json')
+
+# Code run in the child interpreter; prints the timed section and loaded modules as JSON
+CHILD_TEMPLATE = """
+import json, sys, time
+start = time.perf_counter()
+{code}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'modules': sorted(sys.modules)}}))
+"""
+
+# name -> (code, modules that must not be imported)
+TARGETS = {
+    'registry': ('import ciphers.registry', ['numpy', 'flask']),
+    'cli': ('import cli', ['numpy', 'flask']),
+    'app': ('import app', ['numpy']),
+}
+for _cipher_type in CIPHER_CLASSES:
+    TARGETS[f'cipher:{_cipher_type}'] = (
+        f"from ciphers.registry import CipherRegistry\nCipherRegistry()['{_cipher_type}']", ['flask'])
+
+# Differences below this many seconds are treated as noise
+NOISE_FLOOR = 0.005
+
+
+def run_child(code: str, workdir: str) -> Dict[str, Any]:
+    """Run code in a fresh interpreter and return its timing and loaded modules"""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', CHILD_TEMPLATE.format(code=code)], cwd=workdir,
+                               env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['wall_seconds'] = wall
+    return result
+
+
+def benchmark_target(name: str, repeat: int, workdir: str) -> Dict[str, Any]:
+    """Best-of-repeat import time of one target"""
+    code, forbidden = TARGETS[name]
+    runs = [run_child(code, workdir) for _ in range(repeat)]
+    loaded = set(runs[0]['modules'])
+
+    return {
+        'target': name,
+        'seconds': min(run['seconds'] for run in runs),
+        'wall_seconds': min(run['wall_seconds'] for run in runs),
+        'modules': len(loaded),
+        'forbidden_imports': sorted(module for module in forbidden if module in loaded),
+    }
+
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Any],
+                        threshold: float) -> List[Dict[str, Any]]:
+    """Return the targets whose import time grew more than threshold over the baseline"""
+    baseline_results = {r['target']: r for r in baseline.get('results', [])}
+    regressions = []
+
+    for result in results:
+        previous = baseline_results.get(result['target'])
+        if not previous or not previous.get('seconds'):
+            continue
+
+        change = (result['seconds'] - previous['seconds']) / previous['seconds']
+        result['baseline_seconds'] = previous['seconds']
+        result['change'] = change
+        if change > threshold and result['seconds'] - previous['seconds'] > NOISE_FLOOR:
+            regressions.append({
+                'target': result['target'],
+                'baseline_seconds': previous['seconds'],
+                'seconds': result['seconds'],
+                'change': change,
+            })
+
+    return regressions
+
+
+def run(targets: List[str], repeat: int) -> Dict[str, Any]:
+    """Measure every target and return the JSON report"""
+    results = []
+    # Importing app creates its working folders, so run children in a scratch directory
+    with tempfile.TemporaryDirectory(prefix='startup_bench_') as workdir:
+        for name in targets:
+            results.append(benchmark_target(name, repeat, workdir))
+            print(f"{name:<20} done", file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'created': time.time(),
+        },
+        'results': results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Startup-time benchmark')
+    parser.add_argument('--targets', default=','.join(TARGETS), help='Comma separated targets')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per target (best is kept)')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Baseline JSON report to compare against (default benchmarks/startup_baseline.json)')
+    parser.add_argument('--no-baseline', action='store_true', help='Skip the comparison against --baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='Write the report to --baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed relative import time growth before failing (default 0.25)')
+    args = parser.parse_args(argv)
+
+    targets = [t.strip() for t in args.targets.split(',') if t.strip()]
+    for name in targets:
+        if name not in TARGETS:
+            parser.error(f'Unknown target: {name}')
+
+    report = run(targets, args.repeat)
+
+    regressions = []
+    if not args.no_baseline and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report['results'], baseline, args.threshold)
+        report['threshold'] = args.threshold
+        report['regressions'] = regressions
+        if not any('baseline_seconds' in result for result in report['results']):
+            print(f"WARNING {args.baseline} has no results for these targets; nothing was compared", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    heavy = [r for r in report['results'] if r['forbidden_imports']]
+    for result in heavy:
+        print(f"HEAVY IMPORT {result['target']}: {', '.join(result['forbidden_imports'])}", file=sys.stderr)
+    for regression in regressions:
+        print(f"REGRESSION {regression['target']}: {regression['baseline_seconds'] * 1000:.1f} -> "
+              f"{regression['seconds'] * 1000:.1f} ms ({regression['change']:+.1%})", file=sys.stderr)
+
+    return 1 if regressions or heavy else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,7 @@
-from .base_cipher import BaseCipher
+from .base_cipher import MonoalphabeticCipher
 import math
 
-class AffineCipher(BaseCipher):
+class AffineCipher(MonoalphabeticCipher):
     """Implementation of Affine Cipher"""
     
     def _parse_key(self, key: str) -> tuple:
@@ -23,29 +23,6 @@ class AffineCipher(BaseCipher):
                 raise ValueError("Affine cipher key must contain two integers separated by comma")
             raise e
     
-    def encrypt(self, plaintext: str, key: str) -> str:
+    def _letter_mapping(self, key: str) -> list:
         a, b = self._parse_key(key)
-        cleaned_text = self.clean_text(plaintext)
-        encrypted = ""
-        
-        for char in cleaned_text:
-            if char in self.alphabet:
-                x = self.alphabet.index(char)
-                encrypted_index = (a * x + b) % self.alphabet_size
-                encrypted += self.alphabet[encrypted_index]
-        
-        return encrypted
-    
-    def decrypt(self, ciphertext: str, key: str) -> str:
-        a, b = self._parse_key(key)
-        a_inv = self.mod_inverse(a, self.alphabet_size)
-        cleaned_text = self.clean_text(ciphertext)
-        decrypted = ""
-        
-        for char in cleaned_text:
-            if char in self.alphabet:
-                y = self.alphabet.index(char)
-                decrypted_index = (a_inv * (y - b)) % self.alphabet_size
-                decrypted += self.alphabet[decrypted_index]
-        
-        return decrypted
+        return [(a * x + b) % self.alphabet_size for x in range(self.alphabet_size)]
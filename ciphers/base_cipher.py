@@ -1,22 +1,144 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
 import string
+import threading
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Canonical letter buffer: a bytes object holding one letter index per byte
+# (0..25, or 0..24 for Playfair). Text is normalized into this form once by
+# BaseCipher.to_buffer and only turned back into a string by from_buffer.
+_ASCII_LETTERS = set(string.ascii_letters)
+
+
+@lru_cache(maxsize=None)
+def _buffer_tables(alphabet: str, aliases: tuple) -> tuple:
+    """Build (encode, delete, decode) translation tables for an alphabet"""
+    alias_map = dict(aliases)
+    encode = bytearray(range(256))
+    delete = bytearray()
+    for code in range(256):
+        char = chr(code).upper()
+        if chr(code) in _ASCII_LETTERS:
+            char = alias_map.get(char, char)
+            if char in alphabet:
+                encode[code] = alphabet.index(char)
+                continue
+        delete.append(code)
+    
+    decode = bytearray(b'?' * 256)
+    for index, char in enumerate(alphabet):
+        decode[index] = ord(char)
+    
+    return bytes(encode), bytes(delete), bytes(decode)
+
+
+@lru_cache(maxsize=None)
+def shift_table(shift: int, size: int = 26) -> bytes:
+    """Translation table adding shift (mod size) to every letter index"""
+    table = bytearray(range(256))
+    for index in range(size):
+        table[index] = (index + shift) % size
+    return bytes(table)
+
 
 class BaseCipher(ABC):
     """Base class for all cipher implementations"""
     
+    # Letters folded onto another letter of the alphabet when normalizing
+    letter_aliases = {}
+    # Number of compiled keys kept per cipher instance
+    key_cache_size = 128
+    
     def __init__(self):
         self.alphabet = string.ascii_uppercase
         self.alphabet_size = 26
+        self._key_cache = OrderedDict()
+        self._key_cache_lock = threading.Lock()
+        self.key_cache_hits = 0
+        self.key_cache_misses = 0
     
     @abstractmethod
-    def encrypt(self, plaintext: str, key: str) -> str:
-        """Encrypt plaintext using the given key"""
+    def encrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        """Encrypt a letter buffer using the given key"""
         pass
     
     @abstractmethod
+    def decrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        """Decrypt a letter buffer using the given key"""
+        pass
+    
+    def encrypt(self, plaintext: str, key: str) -> str:
+        """Encrypt plaintext using the given key"""
+        return self.from_buffer(self.encrypt_buffer(self.to_buffer(plaintext), key))
+    
     def decrypt(self, ciphertext: str, key: str) -> str:
         """Decrypt ciphertext using the given key"""
-        pass
+        return self.from_buffer(self.decrypt_buffer(self.to_buffer(ciphertext), key))
+    
+    def stream_block_size(self, key: str) -> Optional[int]:
+        """Letters per independently decryptable block, or None if decryption needs the whole text"""
+        return None
+    
+    def decrypt_stream(self, chunks: Iterable[bytes], key: str) -> Iterator[bytes]:
+        """Decrypt a letter buffer that arrives in chunks, yielding plaintext as soon as possible"""
+        block_size = self.stream_block_size(key)
+        if block_size is None:
+            # Position-dependent cipher: collect everything first
+            yield self.decrypt_buffer(b"".join(bytes(chunk) for chunk in chunks), key)
+            return
+        
+        # Carry the letters of an incomplete block over to the next chunk
+        carry = b""
+        for chunk in chunks:
+            data = carry + bytes(chunk)
+            cut = len(data) - len(data) % block_size
+            carry = data[cut:]
+            if cut:
+                yield self.decrypt_buffer(data[:cut], key)
+        if carry:
+            yield self.decrypt_buffer(carry, key)
+    
+    def random_access_block_size(self, key: str) -> Optional[int]:
+        """Alignment a slice passed to decrypt_at must start on, or None if slices cannot be decrypted alone"""
+        return self.stream_block_size(key)
+    
+    def decrypt_at(self, buffer: bytes, start: int, key: str) -> bytes:
+        """Decrypt a slice of ciphertext letters that begins at letter position start"""
+        block_size = self.random_access_block_size(key)
+        if block_size is None:
+            raise ValueError(f"{type(self).__name__} does not support random access decryption")
+        if start % block_size:
+            raise ValueError(f"Slice start must be a multiple of {block_size}")
+        return self.decrypt_buffer(buffer, key)
+    
+    def segment_block_size(self, key: str, operation: str) -> Optional[int]:
+        """Alignment of segments that can be encrypted or decrypted independently, or None if the text cannot be split"""
+        return self.random_access_block_size(key)
+    
+    def encrypt_at(self, buffer: bytes, start: int, key: str) -> bytes:
+        """Encrypt a slice of plaintext letters that begins at letter position start"""
+        block_size = self.segment_block_size(key, 'encrypt')
+        if block_size is None:
+            raise ValueError(f"{type(self).__name__} does not support segmented encryption")
+        if start % block_size:
+            raise ValueError(f"Slice start must be a multiple of {block_size}")
+        return self.encrypt_buffer(buffer, key)
+    
+    def transform_into(self, letters: 'np.ndarray', out: 'np.ndarray', start: int, key: str, operation: str) -> None:
+        """Encrypt or decrypt an aligned segment of whole blocks into out, an array of the same length"""
+        import numpy as np  # imported on first use to keep module import cheap
+        
+        # Generic path; ciphers override this with NumPy kernels that release the GIL
+        if operation == 'encrypt':
+            result = self.encrypt_at(letters.tobytes(), start, key)
+        else:
+            result = self.decrypt_at(letters.tobytes(), start, key)
+        out[:] = np.frombuffer(result, dtype=np.uint8)
     
     def encrypt_bytes(self, data: bytes, key: str) -> bytes:
         """Encrypt binary data - default implementation"""
@@ -25,6 +147,61 @@ class BaseCipher(ABC):
         encrypted_text = self.encrypt(text, key)
         return encrypted_text.encode('utf-8', errors='ignore')
     
+    def to_buffer(self, text: str) -> bytes:
+        """Normalize text into a letter buffer, dropping every non-letter"""
+        encode, delete, _ = _buffer_tables(self.alphabet, tuple(sorted(self.letter_aliases.items())))
+        if not text.isascii():
+            # Rare path: let str.upper() handle letters such as 'ß' exactly as clean_text does
+            text = self.clean_text(text)
+        return text.encode('ascii', 'ignore').translate(encode, delete)
+    
+    def from_buffer(self, buffer: bytes) -> str:
+        """Convert a letter buffer back into uppercase text"""
+        _, _, decode = _buffer_tables(self.alphabet, tuple(sorted(self.letter_aliases.items())))
+        return bytes(buffer).translate(decode).decode('ascii')
+    
+    def compile_key(self, key: str):
+        """Parse and validate a key into its internal form, keeping the most recently used keys"""
+        with self._key_cache_lock:
+            compiled = self._key_cache.get(key)
+            if compiled is not None:
+                self._key_cache.move_to_end(key)
+                self.key_cache_hits += 1
+                return compiled
+        
+        compiled = self._compile_key(key)
+        with self._key_cache_lock:
+            self.key_cache_misses += 1
+            self._key_cache[key] = compiled
+            if len(self._key_cache) > self.key_cache_size:
+                self._key_cache.popitem(last=False)
+        return compiled
+    
+    @abstractmethod
+    def _compile_key(self, key: str):
+        """Parse and validate a key into the internal form the cipher works with; raises ValueError"""
+        pass
+    
+    def key_fingerprint(self, key: str) -> str:
+        """Digest of the compiled key; keys that encrypt identically share a fingerprint"""
+        digest = hashlib.sha256(type(self).__name__.encode())
+        
+        def feed(part):
+            if isinstance(part, (tuple, list)):
+                digest.update(b'(')
+                for item in part:
+                    feed(item)
+                digest.update(b')')
+            elif isinstance(part, (bytes, bytearray)):
+                digest.update(b'b%d:' % len(part) + bytes(part))
+            elif hasattr(part, 'tobytes'):
+                digest.update(f'a{part.shape}:'.encode() + part.tobytes())
+            else:
+                digest.update(repr(part).encode() + b';')
+        
+        feed(self.compile_key(key))
+        return digest.hexdigest()
+    
     def clean_text(self, text: str, keep_spaces: bool = False) -> str:
         """Clean text to contain only alphabetic characters"""
         if keep_spaces:
@@ -52,3 +229,46 @@ class BaseCipher(ABC):
         if gcd != 1:
             raise ValueError(f"Modular inverse does not exist for {a} mod {m}")
         return (x % m + m) % m
+
+
+class MonoalphabeticCipher(BaseCipher):
+    """Base class for ciphers that replace every letter by a fixed letter"""
+    
+    @abstractmethod
+    def _letter_mapping(self, key: str) -> list:
+        """Return the encryption mapping as a list of letter indices"""
+        pass
+    
+    def _compile_key(self, key: str) -> tuple:
+        mapping = self._letter_mapping(key)
+        inverse = [0] * self.alphabet_size
+        for index, value in enumerate(mapping):
+            inverse[value] = index
+        
+        encrypt_table = bytearray(range(256))
+        decrypt_table = bytearray(range(256))
+        encrypt_table[:self.alphabet_size] = bytes(mapping)
+        decrypt_table[:self.alphabet_size] = bytes(inverse)
+        return bytes(encrypt_table), bytes(decrypt_table)
+    
+    def letter_table(self, key: str, decrypt: bool = False) -> bytes:
+        """Return the index -> index substitution table for key"""
+        encrypt_table, decrypt_table = self.compile_key(key)
+        return (decrypt_table if decrypt else encrypt_table)[:self.alphabet_size]
+    
+    def stream_block_size(self, key: str) -> int:
+        self.compile_key(key)
+        return 1
+    
+    def transform_into(self, letters: 'np.ndarray', out: 'np.ndarray', start: int, key: str, operation: str) -> None:
+        import numpy as np
+        
+        # Fancy indexing releases the GIL, unlike bytes.translate
+        table = np.frombuffer(self.compile_key(key)[0 if operation == 'encrypt' else 1], dtype=np.uint8)
+        out[:] = table[letters]
+    
+    def encrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        return bytes(buffer).translate(self.compile_key(key)[0])
+    
+    def decrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        return bytes(buffer).translate(self.compile_key(key)[1])
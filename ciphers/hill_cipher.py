@@ -41,62 +41,46 @@ class HillCipher(BaseCipher):
         inv_matrix = (det_inv * adj) % self.alphabet_size
         return inv_matrix
     
-    def _text_to_vectors(self, text: str, size: int) -> list:
-        """Convert text to numerical vectors"""
-        # Pad text if necessary
-        while len(text) % size != 0:
-            text += 'X'
+    def _compile_key(self, key: str) -> tuple:
+        # Default to 2x2 matrix for simplicity
+        key_matrix = self._parse_key_matrix(key, 2)
+        inv_matrix = self._matrix_mod_inverse(key_matrix)
+        return key_matrix.astype(np.int64), inv_matrix.astype(np.int64)
+    
+    def _apply_matrix(self, buffer: bytes, matrix: np.ndarray) -> bytes:
+        """Multiply every block of the buffer by the matrix modulo 26"""
+        size = matrix.shape[0]
         
-        vectors = []
-        for i in range(0, len(text), size):
-            vector = []
-            for j in range(size):
-                char = text[i + j]
-                vector.append(self.alphabet.index(char))
-            vectors.append(np.array(vector))
+        # Pad text if necessary
+        if len(buffer) % size != 0:
+            buffer = bytes(buffer) + bytes([self.alphabet.index('X')]) * (size - len(buffer) % size)
         
-        return vectors
+        vectors = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, size).astype(np.int64)
+        return ((vectors @ matrix.T) % self.alphabet_size).astype(np.uint8).tobytes()
     
-    def _vectors_to_text(self, vectors: list) -> str:
-        """Convert numerical vectors back to text"""
-        text = ""
-        for vector in vectors:
-            for num in vector:
-                text += self.alphabet[num % self.alphabet_size]
-        return text
+    def stream_block_size(self, key: str) -> int:
+        return self.compile_key(key)[0].shape[0]
     
-    def encrypt(self, plaintext: str, key: str) -> str:
-        # Default to 2x2 matrix for simplicity
-        matrix_size = 2
-        key_matrix = self._parse_key_matrix(key, matrix_size)
-        cleaned_text = self.clean_text(plaintext)
+    def transform_into(self, letters: np.ndarray, out: np.ndarray, start: int, key: str, operation: str) -> None:
+        matrix = self.compile_key(key)[0 if operation == 'encrypt' else 1]
+        size = matrix.shape[0]
         
-        if not cleaned_text:
-            return ""
-        
-        vectors = self._text_to_vectors(cleaned_text, matrix_size)
-        encrypted_vectors = []
-        
-        for vector in vectors:
-            encrypted_vector = np.dot(key_matrix, vector) % self.alphabet_size
-            encrypted_vectors.append(encrypted_vector)
-        
-        return self._vectors_to_text(encrypted_vectors)
+        products = letters.reshape(-1, size).astype(np.int64) @ matrix.T
+        np.remainder(products, self.alphabet_size, out=products)
+        out.reshape(-1, size)[:] = products
     
-    def decrypt(self, ciphertext: str, key: str) -> str:
-        matrix_size = 2
-        key_matrix = self._parse_key_matrix(key, matrix_size)
-        inv_matrix = self._matrix_mod_inverse(key_matrix)
-        cleaned_text = self.clean_text(ciphertext)
+    def encrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        key_matrix, _ = self.compile_key(key)
         
-        if not cleaned_text:
-            return ""
+        if not buffer:
+            return b""
         
-        vectors = self._text_to_vectors(cleaned_text, matrix_size)
-        decrypted_vectors = []
+        return self._apply_matrix(buffer, key_matrix)
+    
+    def decrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        _, inv_matrix = self.compile_key(key)
         
-        for vector in vectors:
-            decrypted_vector = np.dot(inv_matrix, vector) % self.alphabet_size
-            decrypted_vectors.append(decrypted_vector)
+        if not buffer:
+            return b""
         
-        return self._vectors_to_text(decrypted_vectors)
+        return self._apply_matrix(buffer, inv_matrix)
@@ -1,18 +1,24 @@
 from .base_cipher import BaseCipher
+import numpy as np
+import hashlib
 import random
 import os
+from typing import Iterable, Iterator
 
 class OneTimePadCipher(BaseCipher):
     """Implementation of One-Time Pad Cipher"""
     
+    # Direct keys compile to pads as long as the text, so keep only a few
+    key_cache_size = 8
+    
     def __init__(self):
         super().__init__()
         self.key_file_path = "keys"
-        os.makedirs(self.key_file_path, exist_ok=True)
     
     def generate_key_file(self, length=10000, filename="otp_key.txt"):
         """Generate a random key file for One-Time Pad"""
         key = ''.join(random.choice(self.alphabet) for _ in range(length))
+        os.makedirs(self.key_file_path, exist_ok=True)
         filepath = os.path.join(self.key_file_path, filename)
         
         with open(filepath, 'w') as f:
@@ -30,54 +36,134 @@ class OneTimePadCipher(BaseCipher):
         except Exception as e:
             raise ValueError(f"Error reading key file: {str(e)}")
     
-    def _prepare_key(self, key_source: str, text_length: int) -> str:
-        """Prepare key from file or direct input"""
-        if key_source.startswith('file:'):
-            # Key from file
-            filepath = key_source[5:]  # Remove 'file:' prefix
-            if not os.path.isabs(filepath):
-                filepath = os.path.join(self.key_file_path, filepath)
-            
-            key = self.read_key_from_file(filepath)
-        else:
-            # Direct key input
-            key = self.clean_text(key_source)
+    def _key_path(self, key_source: str) -> str:
+        """Resolve the path of a 'file:' key"""
+        filepath = key_source[5:]  # Remove 'file:' prefix
+        if not os.path.isabs(filepath):
+            filepath = os.path.join(self.key_file_path, filepath)
+        return filepath
+    
+    def _read_key_segment(self, filepath: str, start: int, length: int) -> str:
+        """Read key letters [start, start + length) of a key file without loading the rest"""
+        try:
+            with open(filepath, 'rb') as f:
+                f.seek(start)
+                return f.read(length).decode('ascii').upper()
+        except FileNotFoundError:
+            raise ValueError(f"Key file not found: {filepath}")
+        except UnicodeDecodeError:
+            raise ValueError("Key file must contain only letters")
+    
+    def _compile_key(self, key: str):
+        """A 'file:' key compiles to the path of its key file, a direct key to its pad letters"""
+        if key.startswith('file:'):
+            filepath = self._key_path(key)
+            if not os.path.isfile(filepath):
+                raise ValueError(f"Key file not found: {filepath}")
+            return filepath
         
-        if len(key) < text_length:
-            raise ValueError(f"Key length ({len(key)}) is shorter than text length ({text_length})")
+        pad = self.to_buffer(key)
+        if not pad:
+            raise ValueError("One-time pad key must contain letters")
+        return pad
+    
+    def _pad_segment(self, key, from_file: bool, start: int, length: int) -> bytes:
+        """Pad letters for the text positions [start, start + length)"""
+        end = start + length
+        if len(key) < end:
+            raise ValueError(f"Key length ({len(key)}) is shorter than text length ({end})")
         
-        return key[:text_length]  # Use only the required length
+        segment = key[start:end]  # Use only the required part
+        if from_file:
+            pad = self.to_buffer(segment)
+            if len(pad) != len(segment):
+                raise ValueError("Key file must contain only letters")
+            return pad
+        return segment
+    
+    def _prepare_key(self, key_source: str, text_length: int) -> bytes:
+        """Prepare key buffer from file or direct input, reading only the pad letters the text needs"""
+        return self._pad_at(key_source, 0, text_length)
     
-    def encrypt(self, plaintext: str, key: str) -> str:
-        cleaned_text = self.clean_text(plaintext)
-        if not cleaned_text:
-            return ""
+    def key_fingerprint(self, key: str) -> str:
+        """Digest of the pad itself, so edits to a key file change the fingerprint"""
+        digest = hashlib.sha256(b'OneTimePadCipher')
+        if not key.startswith('file:'):
+            digest.update(self.to_buffer(key))
+            return digest.hexdigest()
         
-        prepared_key = self._prepare_key(key, len(cleaned_text))
-        encrypted = ""
+        # Hash the key file in pieces so a long pad is never held in memory
+        filepath = self._key_path(key)
+        try:
+            with open(filepath, 'rb') as f:
+                for piece in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(piece.upper())
+        except FileNotFoundError:
+            raise ValueError(f"Key file not found: {filepath}")
+        return digest.hexdigest()
+    
+    def encrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        if not buffer:
+            return b""
         
-        for i, char in enumerate(cleaned_text):
-            if char in self.alphabet:
-                text_index = self.alphabet.index(char)
-                key_index = self.alphabet.index(prepared_key[i])
-                encrypted_index = (text_index + key_index) % self.alphabet_size
-                encrypted += self.alphabet[encrypted_index]
+        pad = self._prepare_key(key, len(buffer))
+        text = np.frombuffer(buffer, dtype=np.uint8)
+        return ((text + np.frombuffer(pad, dtype=np.uint8)) % self.alphabet_size).astype(np.uint8).tobytes()
+    
+    def decrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        if not buffer:
+            return b""
         
-        return encrypted
+        pad = self._prepare_key(key, len(buffer))
+        return self._subtract_pad(buffer, pad)
+    
+    def _subtract_pad(self, buffer: bytes, pad: bytes) -> bytes:
+        """Subtract pad letters from buffer letters modulo 26"""
+        text = np.frombuffer(buffer, dtype=np.uint8)
+        return ((text + (self.alphabet_size - np.frombuffer(pad, dtype=np.uint8))) % self.alphabet_size).astype(np.uint8).tobytes()
     
-    def decrypt(self, ciphertext: str, key: str) -> str:
-        cleaned_text = self.clean_text(ciphertext)
-        if not cleaned_text:
-            return ""
+    def random_access_block_size(self, key: str) -> int:
+        return 1
+    
+    def _pad_at(self, key: str, start: int, length: int) -> bytes:
+        """Pad letters for the text positions [start, start + length)"""
+        if key.startswith('file:'):
+            # Read only the matching part of the key file
+            segment = self._read_key_segment(self._key_path(key), start, length)
+            if len(segment) < length:
+                raise ValueError(f"Key length ({start + len(segment)}) is shorter than text length ({start + length})")
+            return self._pad_segment(segment, True, 0, length)
         
-        prepared_key = self._prepare_key(key, len(cleaned_text))
-        decrypted = ""
+        return self._pad_segment(self.compile_key(key), False, start, length)
+    
+    def encrypt_at(self, buffer: bytes, start: int, key: str) -> bytes:
+        """Encrypt a slice of plaintext with the pad letters at the same positions"""
+        if not buffer:
+            return b""
         
-        for i, char in enumerate(cleaned_text):
-            if char in self.alphabet:
-                text_index = self.alphabet.index(char)
-                key_index = self.alphabet.index(prepared_key[i])
-                decrypted_index = (text_index - key_index) % self.alphabet_size
-                decrypted += self.alphabet[decrypted_index]
+        pad = np.frombuffer(self._pad_at(key, start, len(buffer)), dtype=np.uint8)
+        return ((np.frombuffer(bytes(buffer), dtype=np.uint8) + pad) % self.alphabet_size).astype(np.uint8).tobytes()
+    
+    def transform_into(self, letters: np.ndarray, out: np.ndarray, start: int, key: str, operation: str) -> None:
+        pad = np.frombuffer(self._pad_at(key, start, len(letters)), dtype=np.uint8)
+        if operation != 'encrypt':
+            pad = self.alphabet_size - pad
+        np.add(letters, pad, out=out)
+        np.remainder(out, self.alphabet_size, out=out)
+    
+    def decrypt_at(self, buffer: bytes, start: int, key: str) -> bytes:
+        """Decrypt a slice of ciphertext with the pad letters at the same positions"""
+        if not buffer:
+            return b""
         
-        return decrypted
+        pad = self._pad_at(key, start, len(buffer))
+        return self._subtract_pad(bytes(buffer), pad)
+    
+    def decrypt_stream(self, chunks: Iterable[bytes], key: str) -> Iterator[bytes]:
+        """Decrypt chunk by chunk, carrying the position in the pad"""
+        offset = 0
+        for chunk in chunks:
+            if chunk:
+                pad = self._pad_at(key, offset, len(chunk))
+                offset += len(chunk)
+                yield self._subtract_pad(bytes(chunk), pad)
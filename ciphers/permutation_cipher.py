@@ -9,64 +9,38 @@ class PermutationCipher(BaseCipher):
         sorted_key = sorted(enumerate(key), key=lambda x: x[1])
         return [x[0] for x in sorted_key]
     
-    def _create_grid(self, text: str, key_length: int) -> list:
-        """Create grid for transposition"""
-        # Pad text if necessary
-        while len(text) % key_length != 0:
-            text += 'X'
-        
-        grid = []
-        for i in range(0, len(text), key_length):
-            grid.append(list(text[i:i + key_length]))
-        
-        return grid
-    
-    def encrypt(self, plaintext: str, key: str) -> str:
+    def _compile_key(self, key: str) -> tuple:
         if not key:
             raise ValueError("Permutation cipher key cannot be empty")
+        return tuple(self._get_key_order(key))
+    
+    def encrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        key_order = self.compile_key(key)
+        key_length = len(key_order)
         
-        cleaned_text = self.clean_text(plaintext)
-        if not cleaned_text:
-            return ""
-        
-        key_order = self._get_key_order(key)
-        grid = self._create_grid(cleaned_text, len(key))
+        if not buffer:
+            return b""
         
-        encrypted = ""
-        # Read columns in key order
-        for col_index in key_order:
-            for row in grid:
-                if col_index < len(row):
-                    encrypted += row[col_index]
+        # Pad text if necessary
+        padding = -len(buffer) % key_length
+        grid = bytes(buffer) + bytes([self.alphabet.index('X')]) * padding
         
-        return encrypted
+        # Column i of the row-major grid is the strided slice grid[i::key_length];
+        # read columns in key order
+        return b"".join(grid[col_index::key_length] for col_index in key_order)
     
-    def decrypt(self, ciphertext: str, key: str) -> str:
-        if not key:
-            raise ValueError("Permutation cipher key cannot be empty")
+    def decrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        key_order = self.compile_key(key)
+        key_length = len(key_order)
         
-        cleaned_text = self.clean_text(ciphertext)
-        if not cleaned_text:
-            return ""
+        if not buffer:
+            return b""
         
-        key_order = self._get_key_order(key)
-        key_length = len(key)
-        num_rows = len(cleaned_text) // key_length
-        
-        # Create empty grid
-        grid = [[''] * key_length for _ in range(num_rows)]
+        num_rows = len(buffer) // key_length
+        grid = bytearray(num_rows * key_length)
         
         # Fill grid column by column in key order
-        text_index = 0
-        for col_index in key_order:
-            for row in range(num_rows):
-                if text_index < len(cleaned_text):
-                    grid[row][col_index] = cleaned_text[text_index]
-                    text_index += 1
-        
-        # Read grid row by row
-        decrypted = ""
-        for row in grid:
-            decrypted += ''.join(row)
+        for rank, col_index in enumerate(key_order):
+            grid[col_index::key_length] = buffer[rank * num_rows:(rank + 1) * num_rows]
         
-        return decrypted
+        return bytes(grid)
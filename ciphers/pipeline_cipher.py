@@ -0,0 +1,149 @@
+from .base_cipher import BaseCipher, MonoalphabeticCipher
+from .permutation_cipher import PermutationCipher
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+class PipelineCipher(BaseCipher):
+    """Product cipher applying an ordered list of (cipher_type, key) stages in one pass
+    
+    The key of a pipeline is the list of stages. Adjacent stages are fused when
+    the key is compiled: shift, affine and substitution stages collapse into a
+    single translation table and consecutive permutation stages into a single
+    index array, so the remaining stages run over one shared letter buffer.
+    """
+    
+    def __init__(self, registry: dict):
+        super().__init__()
+        self.registry = registry
+        self.pad_index = self.alphabet.index('X')
+    
+    def normalize_stages(self, stages) -> tuple:
+        """Convert a stage list (pairs or dicts) into a hashable tuple of (cipher_type, key)"""
+        if not stages:
+            raise ValueError("Pipeline must contain at least one stage")
+        
+        normalized = []
+        for position, stage in enumerate(stages, 1):
+            if isinstance(stage, dict):
+                cipher_type, key = stage.get('cipher_type'), stage.get('key', '')
+            else:
+                cipher_type, key = stage
+            
+            if cipher_type not in self.registry:
+                raise ValueError(f"Stage {position}: invalid cipher type '{cipher_type}'")
+            normalized.append((cipher_type, str(key)))
+        
+        return tuple(normalized)
+    
+    def _compile_key(self, stages: tuple) -> tuple:
+        resolved = [(self.registry[cipher_type], key) for cipher_type, key in stages]
+        return self._fuse(resolved, decrypt=False), self._fuse(resolved[::-1], decrypt=True)
+    
+    def _fuse(self, stages: list, decrypt: bool) -> tuple:
+        """Fold adjacent compatible stages into single operations"""
+        ops = []
+        
+        for cipher, key in stages:
+            if isinstance(cipher, MonoalphabeticCipher) and cipher.alphabet == self.alphabet:
+                table = cipher.compile_key(key)[1 if decrypt else 0]
+                if ops and ops[-1][0] == 'table':
+                    # Applying T1 then T2 is the single table T2[T1[x]]
+                    ops[-1] = ('table', ops[-1][1].translate(table))
+                else:
+                    ops.append(('table', table))
+            
+            elif isinstance(cipher, PermutationCipher):
+                key_order = cipher.compile_key(key)
+                if ops and ops[-1][0] == 'permute':
+                    ops[-1] = ('permute', ops[-1][1] + (key_order,))
+                else:
+                    ops.append(('permute', (key_order,)))
+            
+            else:
+                ops.append(('cipher', cipher, key) + self._alphabet_tables(cipher))
+        
+        return tuple(ops)
+    
+    def _alphabet_tables(self, cipher: BaseCipher) -> tuple:
+        """Translation tables between the pipeline alphabet and a stage's own alphabet"""
+        if cipher.alphabet == self.alphabet:
+            return None, None
+        
+        to_stage = bytearray(range(256))
+        from_stage = bytearray(range(256))
+        for index, char in enumerate(self.alphabet):
+            to_stage[index] = cipher.alphabet.index(cipher.letter_aliases.get(char, char))
+        for index, char in enumerate(cipher.alphabet):
+            from_stage[index] = self.alphabet.index(char)
+        
+        return bytes(to_stage), bytes(from_stage)
+    
+    def _permutation_index(self, length: int, key_order: tuple, decrypt: bool) -> 'np.ndarray':
+        """Gather indices of one columnar transposition; index length marks an X pad"""
+        import numpy as np  # only pipelines with permutation stages need NumPy
+        
+        key_length = len(key_order)
+        if length == 0:
+            return np.empty(0, dtype=np.intp)
+        
+        if not decrypt:
+            padded_length = -(-length // key_length) * key_length
+            grid = np.minimum(np.arange(padded_length), length)
+            return np.concatenate([grid[col_index::key_length] for col_index in key_order])
+        
+        num_rows = length // key_length
+        index = np.empty(num_rows * key_length, dtype=np.intp)
+        for rank, col_index in enumerate(key_order):
+            index[col_index::key_length] = np.arange(rank * num_rows, (rank + 1) * num_rows)
+        return index
+    
+    def _permute(self, buffer: bytes, key_orders: tuple, decrypt: bool) -> bytes:
+        """Apply consecutive transpositions as one composed gather"""
+        import numpy as np
+        
+        length = len(buffer)
+        index = np.arange(length)
+        
+        for key_order in key_orders:
+            # Position len(index) is the pad sentinel, which stays a pad sentinel
+            extended = np.append(index, length)
+            index = extended[self._permutation_index(len(index), key_order, decrypt)]
+        
+        source = np.append(np.frombuffer(buffer, dtype=np.uint8), np.uint8(self.pad_index))
+        return source[index].tobytes()
+    
+    def _run(self, buffer: bytes, ops: tuple, decrypt: bool) -> bytes:
+        buffer = bytes(buffer)
+        
+        for op in ops:
+            if op[0] == 'table':
+                buffer = buffer.translate(op[1])
+            elif op[0] == 'permute':
+                buffer = self._permute(buffer, op[1], decrypt)
+            else:
+                _, cipher, key, to_stage, from_stage = op
+                if to_stage is not None:
+                    buffer = buffer.translate(to_stage)
+                if decrypt:
+                    buffer = cipher.decrypt_buffer(buffer, key)
+                else:
+                    buffer = cipher.encrypt_buffer(buffer, key)
+                if from_stage is not None:
+                    buffer = buffer.translate(from_stage)
+        
+        return buffer
+    
+    def encrypt_buffer(self, buffer: bytes, stages) -> bytes:
+        encrypt_ops, _ = self.compile_key(self.normalize_stages(stages))
+        return self._run(buffer, encrypt_ops, decrypt=False)
+    
+    def decrypt_buffer(self, buffer: bytes, stages) -> bytes:
+        _, decrypt_ops = self.compile_key(self.normalize_stages(stages))
+        return self._run(buffer, decrypt_ops, decrypt=True)
+    
+    def fused_length(self, stages) -> int:
+        """Number of operations left after fusing the stages"""
+        encrypt_ops, _ = self.compile_key(self.normalize_stages(stages))
+        return len(encrypt_ops)
@@ -1,8 +1,12 @@
 from .base_cipher import BaseCipher
+import numpy as np
+from typing import Optional
 
 class PlayfairCipher(BaseCipher):
     """Implementation of Playfair Cipher"""
     
+    letter_aliases = {'J': 'I'}
+    
     def __init__(self):
         super().__init__()
         self.alphabet = "ABCDEFGHIKLMNOPQRSTUVWXYZ"  # J is omitted, I/J treated as same
@@ -41,83 +45,83 @@ class PlayfairCipher(BaseCipher):
                     return (i, j)
         return None
     
-    def _prepare_text(self, text: str) -> str:
-        """Prepare text for Playfair encryption"""
-        text = self.clean_text(text).replace('J', 'I')
-        prepared = ""
-        
-        i = 0
-        while i < len(text):
-            if i == len(text) - 1:
-                # Last character, add X
-                prepared += text[i] + 'X'
-                i += 1
-            elif text[i] == text[i + 1]:
-                # Same characters, insert X
-                prepared += text[i] + 'X'
-                i += 1
-            else:
-                # Different characters
-                prepared += text[i] + text[i + 1]
-                i += 2
-        
-        return prepared
-    
-    def encrypt(self, plaintext: str, key: str) -> str:
+    def _compile_key(self, key: str) -> tuple:
+        """Build digraph lookup tables for every pair of letters in the key square"""
         if not key:
             raise ValueError("Playfair cipher key cannot be empty")
         
         square = self._create_key_square(key)
-        prepared_text = self._prepare_text(plaintext)
-        encrypted = ""
+        positions = [self._find_position(char, square) for char in self.alphabet]
+        encrypt_table = np.zeros((self.alphabet_size ** 2, 2), dtype=np.uint8)
+        decrypt_table = np.zeros((self.alphabet_size ** 2, 2), dtype=np.uint8)
         
-        for i in range(0, len(prepared_text), 2):
-            char1, char2 = prepared_text[i], prepared_text[i + 1]
-            pos1 = self._find_position(char1, square)
-            pos2 = self._find_position(char2, square)
-            
-            if pos1[0] == pos2[0]:  # Same row
-                new_pos1 = (pos1[0], (pos1[1] + 1) % 5)
-                new_pos2 = (pos2[0], (pos2[1] + 1) % 5)
-            elif pos1[1] == pos2[1]:  # Same column
-                new_pos1 = ((pos1[0] + 1) % 5, pos1[1])
-                new_pos2 = ((pos2[0] + 1) % 5, pos2[1])
-            else:  # Rectangle
-                new_pos1 = (pos1[0], pos2[1])
-                new_pos2 = (pos2[0], pos1[1])
-            
-            encrypted += square[new_pos1[0]][new_pos1[1]]
-            encrypted += square[new_pos2[0]][new_pos2[1]]
+        for first, pos1 in enumerate(positions):
+            for second, pos2 in enumerate(positions):
+                code = first * self.alphabet_size + second
+                for table, step in ((encrypt_table, 1), (decrypt_table, -1)):
+                    if pos1[0] == pos2[0]:  # Same row
+                        new_pos1 = (pos1[0], (pos1[1] + step) % 5)
+                        new_pos2 = (pos2[0], (pos2[1] + step) % 5)
+                    elif pos1[1] == pos2[1]:  # Same column
+                        new_pos1 = ((pos1[0] + step) % 5, pos1[1])
+                        new_pos2 = ((pos2[0] + step) % 5, pos2[1])
+                    else:  # Rectangle
+                        new_pos1 = (pos1[0], pos2[1])
+                        new_pos2 = (pos2[0], pos1[1])
+                    
+                    table[code, 0] = self.alphabet.index(square[new_pos1[0]][new_pos1[1]])
+                    table[code, 1] = self.alphabet.index(square[new_pos2[0]][new_pos2[1]])
         
-        return encrypted
+        return encrypt_table, decrypt_table
     
-    def decrypt(self, ciphertext: str, key: str) -> str:
-        if not key:
-            raise ValueError("Playfair cipher key cannot be empty")
+    def _prepare_buffer(self, buffer: bytes) -> bytes:
+        """Split a letter buffer into digraphs, inserting X after doubled letters"""
+        filler = bytes([self.alphabet.index('X')])
+        letters = np.frombuffer(buffer, dtype=np.uint8)
+        doubles = np.flatnonzero(letters[:-1] == letters[1:])
         
-        square = self._create_key_square(key)
-        cleaned_text = self.clean_text(ciphertext).replace('J', 'I')
-        decrypted = ""
+        # Only a doubled letter that starts a digraph needs an X; inserting one
+        # shifts the digraph alignment for the rest of the text
+        parts = []
+        start = 0
+        for index in doubles.tolist():
+            if (index - start) % 2 == 0:
+                parts.append(buffer[start:index + 1])
+                parts.append(filler)
+                start = index + 1
+        parts.append(buffer[start:])
         
-        for i in range(0, len(cleaned_text), 2):
-            if i + 1 >= len(cleaned_text):
-                break
-                
-            char1, char2 = cleaned_text[i], cleaned_text[i + 1]
-            pos1 = self._find_position(char1, square)
-            pos2 = self._find_position(char2, square)
-            
-            if pos1[0] == pos2[0]:  # Same row
-                new_pos1 = (pos1[0], (pos1[1] - 1) % 5)
-                new_pos2 = (pos2[0], (pos2[1] - 1) % 5)
-            elif pos1[1] == pos2[1]:  # Same column
-                new_pos1 = ((pos1[0] - 1) % 5, pos1[1])
-                new_pos2 = ((pos2[0] - 1) % 5, pos2[1])
-            else:  # Rectangle
-                new_pos1 = (pos1[0], pos2[1])
-                new_pos2 = (pos2[0], pos1[1])
-            
-            decrypted += square[new_pos1[0]][new_pos1[1]]
-            decrypted += square[new_pos2[0]][new_pos2[1]]
+        if (len(buffer) - start) % 2:
+            # Last character, add X
+            parts.append(filler)
+        
+        return b"".join(parts)
+    
+    def _apply_table(self, buffer: bytes, table: np.ndarray) -> bytes:
+        """Substitute every digraph of an even-length buffer through a lookup table"""
+        pairs = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, 2)
+        codes = pairs[:, 0].astype(np.intp) * self.alphabet_size + pairs[:, 1]
+        return table[codes].tobytes()
+    
+    def stream_block_size(self, key: str) -> int:
+        self.compile_key(key)
+        return 2
+    
+    def segment_block_size(self, key: str, operation: str) -> Optional[int]:
+        # Encryption inserts X fillers, so plaintext positions do not map onto ciphertext positions
+        if operation == 'encrypt':
+            return None
+        return self.stream_block_size(key)
+    
+    def encrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        encrypt_table, _ = self.compile_key(key)
+        
+        prepared = self._prepare_buffer(bytes(buffer))
+        return self._apply_table(prepared, encrypt_table)
+    
+    def decrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        _, decrypt_table = self.compile_key(key)
         
-        return decrypted
+        # A trailing unpaired letter is ignored
+        buffer = bytes(buffer[:len(buffer) - len(buffer) % 2])
+        return self._apply_table(buffer, decrypt_table)
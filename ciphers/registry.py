@@ -0,0 +1,56 @@
+from collections.abc import Mapping
+from importlib import import_module
+import threading
+
+# Cipher name -> "module:Class"; modules are imported on first use so that heavy
+# dependencies such as NumPy load only with the ciphers that need them
+CIPHER_CLASSES = {
+    'shift': 'ciphers.shift_cipher:ShiftCipher',
+    'substitution': 'ciphers.substitution_cipher:SubstitutionCipher',
+    'affine': 'ciphers.affine_cipher:AffineCipher',
+    'vigenere': 'ciphers.vigenere_cipher:VigenereCipher',
+    'hill': 'ciphers.hill_cipher:HillCipher',
+    'permutation': 'ciphers.permutation_cipher:PermutationCipher',
+    'onetimepad': 'ciphers.onetimepad_cipher:OneTimePadCipher',
+    'playfair': 'ciphers.playfair_cipher:PlayfairCipher',
+}
+
+
+def load_cipher_class(cipher_type: str) -> type:
+    """Import and return the class implementing a cipher type"""
+    module_name, class_name = CIPHER_CLASSES[cipher_type].split(':')
+    return getattr(import_module(module_name), class_name)
+
+
+class CipherRegistry(Mapping):
+    """Mapping of cipher names to instances that are imported and created on first access"""
+    
+    def __init__(self, names=None):
+        self.names = tuple(CIPHER_CLASSES if names is None else names)
+        self._instances = {}
+        self._lock = threading.Lock()
+    
+    def __getitem__(self, cipher_type: str):
+        cipher = self._instances.get(cipher_type)
+        if cipher is not None:
+            return cipher
+        if cipher_type not in self.names:
+            raise KeyError(cipher_type)
+        
+        with self._lock:
+            if cipher_type not in self._instances:
+                self._instances[cipher_type] = load_cipher_class(cipher_type)()
+            return self._instances[cipher_type]
+    
+    def __contains__(self, cipher_type) -> bool:
+        return cipher_type in self.names
+    
+    def __iter__(self):
+        return iter(self.names)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def loaded(self) -> dict:
+        """Return the instances created so far, without creating any others"""
+        return dict(self._instances)
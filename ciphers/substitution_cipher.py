@@ -1,7 +1,7 @@
-from .base_cipher import BaseCipher
+from .base_cipher import MonoalphabeticCipher
 import string
 
-class SubstitutionCipher(BaseCipher):
+class SubstitutionCipher(MonoalphabeticCipher):
     """Implementation of Substitution Cipher"""
     
     def _validate_key(self, key: str) -> str:
@@ -20,26 +20,6 @@ class SubstitutionCipher(BaseCipher):
         
         return key
     
-    def encrypt(self, plaintext: str, key: str) -> str:
+    def _letter_mapping(self, key: str) -> list:
         key = self._validate_key(key)
-        cleaned_text = self.clean_text(plaintext)
-        encrypted = ""
-        
-        for char in cleaned_text:
-            if char in self.alphabet:
-                old_index = self.alphabet.index(char)
-                encrypted += key[old_index]
-        
-        return encrypted
-    
-    def decrypt(self, ciphertext: str, key: str) -> str:
-        key = self._validate_key(key)
-        cleaned_text = self.clean_text(ciphertext)
-        decrypted = ""
-        
-        for char in cleaned_text:
-            if char in key:
-                old_index = key.index(char)
-                decrypted += self.alphabet[old_index]
-        
-        return decrypted
+        return [self.alphabet.index(char) for char in key]
@@ -1,51 +1,58 @@
-from .base_cipher import BaseCipher
+from .base_cipher import BaseCipher, shift_table
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
 
 class VigenereCipher(BaseCipher):
     """Implementation of Vigenere Cipher"""
     
-    def _prepare_key(self, key: str, text_length: int) -> str:
-        """Prepare key to match text length"""
-        key = self.clean_text(key)
-        if not key:
+    def _compile_key(self, key: str) -> bytes:
+        """Convert key into its sequence of shifts"""
+        shifts = self.to_buffer(key)
+        if not shifts:
             raise ValueError("Vigenere cipher key cannot be empty")
-        
-        # Repeat key to match text length
-        repeated_key = ""
-        for i in range(text_length):
-            repeated_key += key[i % len(key)]
-        
-        return repeated_key
+        return shifts
     
-    def encrypt(self, plaintext: str, key: str) -> str:
-        cleaned_text = self.clean_text(plaintext)
-        if not cleaned_text:
-            return ""
-        
-        prepared_key = self._prepare_key(key, len(cleaned_text))
-        encrypted = ""
-        
-        for i, char in enumerate(cleaned_text):
-            if char in self.alphabet:
-                text_index = self.alphabet.index(char)
-                key_index = self.alphabet.index(prepared_key[i])
-                encrypted_index = (text_index + key_index) % self.alphabet_size
-                encrypted += self.alphabet[encrypted_index]
-        
-        return encrypted
+    def _apply_shifts(self, buffer: bytes, shifts: bytes, direction: int) -> bytes:
+        """Shift each column of the buffer (one column per key letter) by its key shift"""
+        period = len(shifts)
+        result = bytearray(len(buffer))
+        
+        # Every key position shifts a strided column by the same amount, so each
+        # column is a single translate call instead of a per-letter loop
+        for offset in range(min(period, len(buffer))):
+            shift = (direction * shifts[offset]) % self.alphabet_size
+            result[offset::period] = buffer[offset::period].translate(shift_table(shift, self.alphabet_size))
+        
+        return bytes(result)
     
-    def decrypt(self, ciphertext: str, key: str) -> str:
-        cleaned_text = self.clean_text(ciphertext)
-        if not cleaned_text:
-            return ""
-        
-        prepared_key = self._prepare_key(key, len(cleaned_text))
-        decrypted = ""
+    def stream_block_size(self, key: str) -> int:
+        # Segments that start on a key period boundary decrypt independently
+        return len(self.compile_key(key))
+    
+    def transform_into(self, letters: 'np.ndarray', out: 'np.ndarray', start: int, key: str, operation: str) -> None:
+        import numpy as np  # imported on first use to keep module import cheap
+        
+        # Segments start on a period boundary, so row r of the reshaped segment lines up with the key
+        shifts = np.frombuffer(self.compile_key(key), dtype=np.uint8)
+        if operation != 'encrypt':
+            shifts = (self.alphabet_size - shifts) % self.alphabet_size
+        period = len(shifts)
+        full = len(letters) - len(letters) % period
+        
+        np.add(letters[:full].reshape(-1, period), shifts, out=out[:full].reshape(-1, period))
+        np.add(letters[full:], shifts[:len(letters) - full], out=out[full:])
+        np.remainder(out, self.alphabet_size, out=out)
+    
+    def encrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        if not buffer:
+            return b""
         
-        for i, char in enumerate(cleaned_text):
-            if char in self.alphabet:
-                text_index = self.alphabet.index(char)
-                key_index = self.alphabet.index(prepared_key[i])
-                decrypted_index = (text_index - key_index) % self.alphabet_size
-                decrypted += self.alphabet[decrypted_index]
+        return self._apply_shifts(bytes(buffer), self.compile_key(key), 1)
+    
+    def decrypt_buffer(self, buffer: bytes, key: str) -> bytes:
+        if not buffer:
+            return b""
         
-        return decrypted
+        return self._apply_shifts(bytes(buffer), self.compile_key(key), -1)
@@ -0,0 +1,263 @@
+"""Bulk encrypt or decrypt a directory tree without the web app.
+
+Usage:
+    python cli.py encrypt SOURCE_DIR OUTPUT_DIR --cipher vigenere --key LEMON
+    python cli.py decrypt OUTPUT_DIR RESTORED_DIR --cipher vigenere --key LEMON --jobs 4
+
+Encrypted files use the same metadata format as the web app and are written as
+<name>.dat next to their mirrored directory path. Files whose output is newer
+than the input are skipped unless --force is given. --compress zlib|lzma stores
+the encrypted payload compressed; decrypt detects it from the file header.
+--threads N splits each large file into segments encrypted on N threads.
+
+Files are read, transformed and written chunk by chunk; only ciphers whose
+output depends on the whole text (permutation, Playfair encryption) hold a
+file in memory. Decrypting X.dat always restores X, whatever name the header
+records, so .dat files sharing an original name never overwrite each other.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ciphers.registry import CIPHER_CLASSES, load_cipher_class
+from utils.file_processor import COMPRESSORS, CONTENT_BLOCK_SIZE, FileProcessor
+from utils.segment_runner import SegmentRunner
+
+CHUNK_SIZE = 1024 * 1024
+ENCRYPTED_SUFFIX = '.dat'
+
+# Per-process state set up by _init_worker
+_cipher = None
+_file_processor = None
+_segment_runner = None
+
+
+def _init_worker(cipher_type: str, threads: int = 1) -> None:
+    global _cipher, _file_processor, _segment_runner
+    _cipher = load_cipher_class(cipher_type)()
+    _file_processor = FileProcessor('.')
+    _segment_runner = SegmentRunner(threads)
+
+
+def _letter_blocks(cipher, chunks: Iterable[bytes]) -> Iterator[str]:
+    """Regroup letter buffers into index blocks of CONTENT_BLOCK_SIZE letters, as text"""
+    carry = b''
+    for chunk in chunks:
+        carry += chunk
+        while len(carry) >= CONTENT_BLOCK_SIZE:
+            yield cipher.from_buffer(carry[:CONTENT_BLOCK_SIZE])
+            carry = carry[CONTENT_BLOCK_SIZE:]
+    if carry:
+        yield cipher.from_buffer(carry)
+
+
+def _transform(operation: str, chunks: Iterable[bytes], key: str) -> Iterator[bytes]:
+    """Encrypt or decrypt letter buffers as they arrive, one aligned step at a time"""
+    block_size = _cipher.segment_block_size(key, operation)
+    if block_size is None:
+        # Position-dependent cipher (or Playfair encryption): the whole text is needed at once
+        yield _segment_runner.run(_cipher, operation, b''.join(chunks), key)
+        return
+
+    # Steps large enough for the segment runner to split them across its threads
+    step = max(CHUNK_SIZE, _segment_runner.min_parallel_bytes if _segment_runner.threads > 1 else 0)
+    carry = b''
+    position = 0
+    for chunk in chunks:
+        carry += chunk
+        if len(carry) < step:
+            continue
+        cut = len(carry) - len(carry) % block_size
+        yield _segment_runner.run(_cipher, operation, carry[:cut], key, position)
+        position += cut
+        carry = carry[cut:]
+    if carry:
+        yield _segment_runner.run(_cipher, operation, carry, key, position)
+
+
+def _read_letters(source: str, is_binary: bool) -> Iterator[bytes]:
+    """Normalize a file chunk by chunk into letter buffers"""
+    if is_binary:
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                yield _cipher.to_buffer(_file_processor.encode_binary_content(chunk))
+    else:
+        with open(source, 'r', encoding='utf-8', newline='') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+                yield _cipher.to_buffer(chunk)
+
+
+def encrypt_file(source: str, output: str, cipher_type: str, key: str, compression: Optional[str] = None) -> int:
+    """Encrypt one file into the web app's .dat format; returns the bytes written"""
+    source_size = os.path.getsize(source)
+    metadata = _file_processor.build_metadata(os.path.basename(source), source_size, cipher_type)
+
+    # Binary bytes expand to at most 4 escaped characters; Playfair fillers at most double the letters
+    max_letters = 2 * source_size * (4 if metadata['is_binary'] else 1) + 64
+    header_size = _file_processor.header_capacity(metadata, max_letters, compression)
+
+    with open(output, 'wb') as f:
+        # Blocks are written as they are produced; the header is filled in once the index is known
+        f.seek(header_size)
+        letters = _transform('encrypt', _read_letters(source, metadata['is_binary']), key)
+        content_length, offsets = _file_processor.write_blocks(f, _letter_blocks(_cipher, letters), compression)
+        header = _file_processor.format_header(
+            _file_processor.index_metadata(metadata, content_length, compression=compression, offsets=offsets),
+            header_size)
+        f.seek(0)
+        f.write(header.encode('utf-8'))
+    return os.path.getsize(output)
+
+
+def decrypt_file(source: str, output: str, cipher_type: str, key: str) -> int:
+    """Decrypt one .dat file and restore the original file; returns the bytes written"""
+    with open(source, 'rb') as f:
+        metadata = _file_processor.read_header(f)
+        letters = (_cipher.to_buffer(chunk) for chunk in _file_processor.iter_content(f, metadata, CHUNK_SIZE))
+        decrypted = (_cipher.from_buffer(buffer) for buffer in _transform('decrypt', letters, key))
+
+        if metadata.get('is_binary'):
+            with open(output, 'wb') as out:
+                for data in _file_processor.restore_binary_chunks(decrypted):
+                    out.write(data)
+        else:
+            with open(output, 'w', encoding='utf-8') as out:
+                for text in decrypted:
+                    out.write(text)
+    return os.path.getsize(output)
+
+
+def _run_task(mode: str, cipher_type: str, key: str, source: str, output: str,
+              compression: Optional[str] = None) -> Tuple[int, int]:
+    """Process one file in a worker; writes to a temp name so partial outputs never look up to date"""
+    temp_path = f"{output}.{os.getpid()}.tmp"
+    try:
+        if mode == 'encrypt':
+            written = encrypt_file(source, temp_path, cipher_type, key, compression)
+        else:
+            written = decrypt_file(source, temp_path, cipher_type, key)
+        os.replace(temp_path, output)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return os.path.getsize(source), written
+
+
+def output_path_for(mode: str, source: str, source_root: str, output_root: str) -> Optional[str]:
+    """Mirror a source path under the output root; None means the file is not an input"""
+    relative_dir = os.path.relpath(os.path.dirname(source), source_root)
+    name = os.path.basename(source)
+
+    if mode == 'encrypt':
+        name += ENCRYPTED_SUFFIX
+    else:
+        # Strip the suffix instead of trusting ORIGINAL_FILENAME, which several .dat files may share
+        if not name.endswith(ENCRYPTED_SUFFIX) or name == ENCRYPTED_SUFFIX:
+            return None
+        name = name[:-len(ENCRYPTED_SUFFIX)]
+
+    return os.path.normpath(os.path.join(output_root, relative_dir, name))
+
+
+def plan_tasks(mode: str, source_root: str, output_root: str, force: bool) -> Tuple[List[Tuple[str, str]], int]:
+    """Walk the source tree and return (tasks, skipped) where tasks are (source, output) pairs"""
+    output_abs = os.path.abspath(output_root)
+    tasks = []
+    skipped = 0
+
+    for dirpath, dirnames, filenames in os.walk(source_root):
+        # Never descend into the output tree when it lives inside the source tree
+        dirnames[:] = sorted(d for d in dirnames if os.path.abspath(os.path.join(dirpath, d)) != output_abs)
+        for filename in sorted(filenames):
+            source = os.path.join(dirpath, filename)
+            output = output_path_for(mode, source, source_root, output_root)
+            if output is None:
+                continue
+            if not force and os.path.exists(output) and os.path.getmtime(output) >= os.path.getmtime(source):
+                skipped += 1
+                continue
+            tasks.append((source, output))
+
+    return tasks, skipped
+
+
+def run(mode: str, source_root: str, output_root: str, cipher_type: str, key: str,
+        jobs: int = 1, force: bool = False, verbose: bool = False,
+        compression: Optional[str] = None, threads: int = 1) -> Dict[str, Any]:
+    """Process a whole tree and return aggregate counts and throughput"""
+    # Compile the key once up front so an invalid key fails before any work starts
+    load_cipher_class(cipher_type)().compile_key(key)
+
+    start = time.perf_counter()
+    tasks, skipped = plan_tasks(mode, source_root, output_root, force)
+    for output_dir in {os.path.dirname(output) for _, output in tasks}:
+        os.makedirs(output_dir, exist_ok=True)
+
+    summary = {'processed': 0, 'skipped': skipped, 'failed': 0, 'bytes_in': 0, 'bytes_out': 0, 'errors': []}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(cipher_type, threads)) as pool:
+        futures = {pool.submit(_run_task, mode, cipher_type, key, source, output, compression): source
+                   for source, output in tasks}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                bytes_in, bytes_out = future.result()
+            except Exception as e:
+                summary['failed'] += 1
+                summary['errors'].append(f"{source}: {e}")
+                continue
+            summary['processed'] += 1
+            summary['bytes_in'] += bytes_in
+            summary['bytes_out'] += bytes_out
+            if verbose:
+                print(f"{mode}ed {source}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    summary['seconds'] = elapsed
+    summary['mb_per_s'] = summary['bytes_in'] / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Bulk encrypt or decrypt a directory tree')
+    parser.add_argument('mode', choices=['encrypt', 'decrypt'])
+    parser.add_argument('source', help='directory to process')
+    parser.add_argument('output', help='directory that mirrors the source tree')
+    parser.add_argument('--cipher', required=True, choices=sorted(CIPHER_CLASSES))
+    parser.add_argument('--key', required=True)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--force', action='store_true', help='process files even if their output is up to date')
+    parser.add_argument('--verbose', action='store_true', help='print every processed file')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='threads per file for ciphers whose text can be split into segments')
+    parser.add_argument('--compress', choices=sorted(COMPRESSORS),
+                        help='compress the encrypted payload (encrypt only)')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.source):
+        parser.error(f'{args.source} is not a directory')
+
+    try:
+        summary = run(args.mode, args.source, args.output, args.cipher, args.key,
+                      jobs=max(args.jobs, 1), force=args.force, verbose=args.verbose,
+                      compression=args.compress, threads=max(args.threads, 1))
+    except ValueError as e:
+        print(f'Invalid key: {e}', file=sys.stderr)
+        return 2
+    except Exception as e:
+        # Anything else that stops the run before a file is processed, e.g. a failed worker pool
+        print(f'error: {type(e).__name__}: {e}', file=sys.stderr)
+        return 2
+
+    for error in summary['errors']:
+        print(f'error: {error}', file=sys.stderr)
+    print(f"{summary['processed']} processed, {summary['skipped']} up to date, {summary['failed']} failed; "
+          f"{summary['bytes_in'] / (1024 * 1024):.2f} MB in {summary['seconds']:.2f}s "
+          f"({summary['mb_per_s']:.2f} MB/s)")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
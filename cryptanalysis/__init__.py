@@ -0,0 +1 @@
+# Empty file to make cryptanalysis a package
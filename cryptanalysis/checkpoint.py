@@ -0,0 +1,85 @@
+"""Checkpoint files that let long key searches resume where they stopped.
+
+A checkpoint is a plain JSON file (indented, so it can be read or diffed by
+hand) holding everything a search needs to carry on: which shards of the
+keyspace are done or where the cursor stands, the RNG state, the best
+candidates so far and the time already spent. Every file records a
+fingerprint of the search it belongs to, so a checkpoint is never applied to
+a different ciphertext, wordlist or set of options.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Bumped when the layout of checkpoint files changes
+CHECKPOINT_VERSION = 1
+
+
+def search_fingerprint(*parts: Any) -> str:
+    """Digest identifying a search from its inputs (ciphertext, wordlist, options...)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        elif not isinstance(part, (bytes, bytearray)):
+            part = json.dumps(part, sort_keys=True).encode('utf-8')
+        # Length prefixes keep ('ab', 'c') and ('a', 'bc') apart
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """Search state stored in one JSON file, rewritten atomically at most every interval seconds"""
+    
+    def __init__(self, path: str, interval: float = 30.0, on_save: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.interval = interval
+        # Called with the path after every save, e.g. to refresh the file's expiry
+        self.on_save = on_save
+        self._last_save = time.monotonic()
+    
+    def load(self, kind: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the saved state of this search, or None when there is no checkpoint yet"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            raise ValueError(f"Checkpoint {os.path.basename(self.path)} is not valid JSON")
+        
+        if state.get('version') != CHECKPOINT_VERSION or state.get('kind') != kind:
+            raise ValueError(f"Checkpoint {os.path.basename(self.path)} was not written by a {kind} search")
+        if state.get('fingerprint') != fingerprint:
+            raise ValueError(f"Checkpoint {os.path.basename(self.path)} belongs to a different search")
+        return state
+    
+    def due(self) -> bool:
+        """Whether interval seconds have passed since the last save"""
+        return time.monotonic() - self._last_save >= self.interval
+    
+    def save(self, kind: str, fingerprint: str, state: Dict[str, Any]) -> None:
+        """Write the state, replacing the previous checkpoint only once the new one is complete"""
+        document = {'version': CHECKPOINT_VERSION, 'kind': kind, 'fingerprint': fingerprint, 'saved_at': time.time(),
+                    **state}
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        
+        fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.checkpoint-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=2)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        self._last_save = time.monotonic()
+        if self.on_save is not None:
+            self.on_save(self.path)
@@ -0,0 +1,187 @@
+import math
+from typing import Any, Dict, List
+
+from cryptanalysis.scoring import english_tables, score_buffer, text_to_buffer
+
+# Index of coincidence of English text and of uniformly random letters
+ENGLISH_IOC = 0.066
+RANDOM_IOC = 1 / 26
+
+# Affine 'a' values coprime with 26 and their inverses
+AFFINE_INVERSES = {1: 1, 3: 9, 5: 21, 7: 15, 9: 3, 11: 19, 15: 7, 17: 23, 19: 11, 21: 5, 23: 17, 25: 25}
+
+# Longest Vigenere period and largest Hill block size looked for
+MAX_PERIOD = 20
+BLOCK_SIZES = (2, 3)
+
+
+def _ioc(counts) -> float:
+    """Index of coincidence of a letter (or block) histogram"""
+    total = counts.sum()
+    if total < 2:
+        return 0.0
+    return float((counts * (counts - 1)).sum() / (total * (total - 1)))
+
+
+def cipher_features(buffer: bytes) -> Dict[str, Any]:
+    """Compute the statistics used to tell the cipher types apart from an A-Z letter buffer"""
+    import numpy as np  # imported on first use to keep module import cheap
+    
+    letters = np.frombuffer(bytes(buffer), dtype=np.uint8).astype(np.intp)
+    length = len(letters)
+    counts = np.bincount(letters, minlength=26)
+    unigram, _ = english_tables()
+    
+    # Letter log-likelihood under English, as is and under the best shift / affine map
+    letter_score = float(counts @ unigram) / max(length, 1)
+    shifts = np.arange(26)
+    shift_maps = (shifts[None, :] - shifts[:, None]) % 26
+    affine_maps = np.array([(inverse * (shifts - b)) % 26
+                            for inverse in AFFINE_INVERSES.values() for b in range(26)])
+    shift_score = float((unigram[shift_maps] @ counts).max()) / max(length, 1)
+    affine_score = float((unigram[affine_maps] @ counts).max()) / max(length, 1)
+    
+    # Best any substitution can do: the most frequent letter decrypted as E, the next as T, and so on
+    observed = np.sort(counts)[::-1] / max(length, 1)
+    substitution_score = float(observed @ np.sort(unigram)[::-1])
+    
+    # Mean column IoC per candidate Vigenere period
+    period_iocs = {}
+    for period in range(2, min(MAX_PERIOD, length // 8) + 1):
+        period_iocs[period] = float(np.mean([_ioc(np.bincount(letters[column::period], minlength=26))
+                                             for column in range(period)]))
+    best_period = max(period_iocs, key=period_iocs.get) if period_iocs else 1
+    # Multiples of the true period score as well as the period itself; report the smallest close one
+    for period in sorted(period_iocs):
+        if period_iocs[period] >= 0.95 * period_iocs[best_period]:
+            best_period = period
+            break
+    
+    # IoC of aligned blocks relative to random text (1.0); block ciphers keep plaintext repetition
+    block_iocs = {}
+    for size in BLOCK_SIZES:
+        usable = length - length % size
+        if usable >= size * 2:
+            blocks = letters[:usable].reshape(-1, size) @ (26 ** np.arange(size)[::-1])
+            block_iocs[size] = _ioc(np.bincount(blocks, minlength=26 ** size)) * 26 ** size
+    
+    pairs = letters[:length - length % 2].reshape(-1, 2)
+    return {
+        'length': length,
+        'ioc': _ioc(counts),
+        'flatness': float(-(observed[observed > 0] * np.log(observed[observed > 0])).sum() / math.log(26)),
+        'letter_score': letter_score,
+        'bigram_score': score_buffer(buffer),
+        'shift_score': shift_score,
+        'affine_score': affine_score,
+        'substitution_score': substitution_score,
+        'period': best_period,
+        'period_ioc': period_iocs.get(best_period, 0.0),
+        'block_ioc': block_iocs,
+        'has_j': bool(counts[9]),
+        'letters_used': int((counts > 0).sum()),
+        'doubled_digraphs': int((pairs[:, 0] == pairs[:, 1]).sum()),
+    }
+
+
+# Expected value and spread of each normalized feature per cipher type (see _normalized_features):
+# ioc -> 1 for English-like letter repetition, 0 for random; period_gain -> extra IoC of the best
+# Vigenere period; block -> log IoC ratio of aligned digraphs; letter / shift / affine -> how much
+# worse the letters fit English as is, under the best shift and under the best affine map than
+# under the best substitution
+PROFILES = {
+    'shift':        {'ioc': (1.13, .14), 'period_gain': (0, .15), 'block': (1.84, .25),
+                     'letter': (1.0, .25), 'shift': (.02, .02), 'affine': (.02, .02)},
+    'affine':       {'ioc': (1.13, .14), 'period_gain': (.05, .17), 'block': (1.85, .25),
+                     'letter': (.95, .25), 'shift': (.54, .12), 'affine': (.02, .02)},
+    'substitution': {'ioc': (1.13, .15), 'period_gain': (.05, .18), 'block': (1.86, .25),
+                     'letter': (.94, .25), 'shift': (.52, .1), 'affine': (.38, .08)},
+    'permutation':  {'ioc': (1.12, .1), 'period_gain': (.03, .15), 'block': (1.23, .19),
+                     'letter': (.02, .02), 'shift': (.02, .02), 'affine': (.02, .02)},
+    'vigenere':     {'ioc': (.22, .18), 'period_gain': (.85, .25), 'block': (.84, .4),
+                     'letter': (.56, .24), 'shift': (.24, .06), 'affine': (.2, .05)},
+    'hill':         {'ioc': (.14, .11), 'period_gain': (.14, .24), 'block': (1.76, .22),
+                     'letter': (.46, .13), 'shift': (.27, .06), 'affine': (.19, .04)},
+    'playfair':     {'ioc': (.51, .13), 'period_gain': (.06, .13), 'block': (1.81, .21),
+                     'letter': (.63, .13), 'shift': (.43, .08), 'affine': (.32, .05)},
+    'onetimepad':   {'ioc': (0, .05), 'period_gain': (-.08, .1), 'block': (0, .25),
+                     'letter': (.36, .12), 'shift': (.19, .04), 'affine': (.13, .04)},
+}
+# Profiles were measured on 300-letter texts; spreads scale with 1/sqrt(length) but never drop below this
+PROFILE_LENGTH = 300
+MIN_SPREAD = 0.03
+# Picking the best of many periods inflates the period IoC of short texts by about this much times 1/length
+PERIOD_GAIN_BIAS = 70
+
+# Cipher types whose ciphertext letters are close to uniform, so J and doubled digraphs are common
+POLYGRAPHIC_TYPES = ('vigenere', 'hill', 'onetimepad')
+# Rate of doubled letters inside aligned digraphs of ordinary ciphertext
+DOUBLED_DIGRAPH_RATE = 0.035
+# Log-likelihood given to a type whose hard constraint the text breaks
+IMPOSSIBLE = -50.0
+
+
+def _normalized_features(features: Dict[str, Any]) -> Dict[str, float]:
+    """Map raw features onto the scales used by PROFILES"""
+    spread = ENGLISH_IOC - RANDOM_IOC
+    return {
+        'ioc': (features['ioc'] - RANDOM_IOC) / spread,
+        'period_gain': ((features['period_ioc'] - features['ioc']) / spread
+                        - PERIOD_GAIN_BIAS / max(features['length'], 1)),
+        'block': math.log(max(features['block_ioc'].get(2, 1.0), 0.1)),
+        'letter': features['substitution_score'] - features['letter_score'],
+        'shift': features['substitution_score'] - features['shift_score'],
+        'affine': features['substitution_score'] - features['affine_score'],
+    }
+
+
+def classify(features: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Rank the cipher types by how well they explain the features, most likely first"""
+    normalized = _normalized_features(features)
+    length = features['length']
+    pairs = length // 2
+    # Short texts give noisy statistics and long ones tight statistics
+    noise = math.sqrt(PROFILE_LENGTH / max(length, 1))
+    
+    scores = {}
+    for cipher_type, profile in PROFILES.items():
+        score = 0.0
+        for name, (mean, sd) in profile.items():
+            sd = max(sd * noise, MIN_SPREAD)
+            score -= 0.5 * ((normalized[name] - mean) / sd) ** 2 + math.log(sd)
+        
+        if cipher_type == 'playfair':
+            if features['has_j'] or features['doubled_digraphs'] or length % 2:
+                score += IMPOSSIBLE
+        elif features['doubled_digraphs'] == 0:
+            # Chance of no doubled digraph at all in ordinary ciphertext
+            score -= pairs * DOUBLED_DIGRAPH_RATE
+        
+        if cipher_type == 'hill' and length % 2:
+            score += IMPOSSIBLE
+        if cipher_type in POLYGRAPHIC_TYPES and not features['has_j']:
+            # Chance of no J in near-uniform ciphertext
+            score -= length / 26
+        scores[cipher_type] = score
+    
+    best = max(scores.values())
+    weights = {cipher_type: math.exp(score - best) for cipher_type, score in scores.items()}
+    total = sum(weights.values())
+    ranking = sorted(scores, key=scores.get, reverse=True)
+    return [{'cipher_type': cipher_type, 'score': round(scores[cipher_type], 3),
+             'probability': round(weights[cipher_type] / total, 4)} for cipher_type in ranking]
+
+
+def identify_cipher(ciphertext: str) -> Dict[str, Any]:
+    """Guess which cipher produced a ciphertext; returns the ranking and the features it was based on"""
+    buffer = text_to_buffer(ciphertext)
+    if not buffer:
+        raise ValueError("Ciphertext contains no letters")
+    
+    features = cipher_features(buffer)
+    ranking = classify(features)
+    return {
+        'best': ranking[0]['cipher_type'],
+        'ranking': ranking,
+        'features': features,
+    }
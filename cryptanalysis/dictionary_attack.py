@@ -0,0 +1,350 @@
+"""Wordlist dictionary attack for keyword ciphers (Vigenere, Playfair, Permutation).
+
+Usage:
+    python -m cryptanalysis.dictionary_attack --cipher vigenere --wordlist words.txt < ciphertext.txt
+    python -m cryptanalysis.dictionary_attack --cipher playfair --wordlist big.txt --checkpoint attack.json --input c.txt
+"""
+import argparse
+import heapq
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ciphers.registry import load_cipher_class
+from cryptanalysis.checkpoint import Checkpoint, search_fingerprint
+from cryptanalysis.scoring import score_buffer, shift_scores
+
+ATTACK_CIPHERS = ('vigenere', 'playfair', 'permutation')
+
+# prefix_letters: short prefix every key is scored on first; sample_letters: longer sample the
+# survivors are ranked on; threshold: minimum English score per letter (see cryptanalysis.scoring);
+# prune_threshold / min_prune_letters: letter score below which a Vigenere key prefix is abandoned
+# once its columns hold that many letters; top: number of candidates returned
+DEFAULT_OPTIONS = {
+    'prefix_letters': 60,
+    'sample_letters': 600,
+    'threshold': -3.0,
+    'prune_threshold': -3.4,
+    'min_prune_letters': 40,
+    'top': 10,
+}
+
+# Checkpoint kind written by DictionaryAttack.run
+CHECKPOINT_KIND = 'dictionary_attack'
+
+
+def parse_wordlist(lines: Iterable[str], min_length: int = 2, max_length: int = 24) -> List[str]:
+    """Turn wordlist lines into sorted, unique, uppercase alphabetic words"""
+    words = set()
+    for line in lines:
+        word = line.strip().upper()
+        if min_length <= len(word) <= max_length and word.isascii() and word.isalpha():
+            words.add(word)
+    return sorted(words)
+
+
+def load_wordlist(path: str, min_length: int = 2, max_length: int = 24) -> List[str]:
+    """Read a wordlist file with one word per line"""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return parse_wordlist(f, min_length, max_length)
+
+
+class _TrieNode:
+    __slots__ = ('children', 'word', 'size')
+    
+    def __init__(self):
+        self.children = {}
+        self.word = None
+        self.size = 0  # words in this subtree
+
+
+def build_trie(words: Iterable[str]) -> _TrieNode:
+    """Build a trie over uppercase words, counting the words below every node"""
+    root = _TrieNode()
+    for word in words:
+        node = root
+        node.size += 1
+        for char in word:
+            node = node.children.setdefault(ord(char) - 65, _TrieNode())
+            node.size += 1
+        node.word = word
+    return root
+
+
+class _Candidates:
+    """Keeps the best scoring keys seen so far"""
+    
+    def __init__(self, top: int):
+        self.top = top
+        self.heap = []
+    
+    def add(self, score: float, key: str, plaintext: bytes) -> None:
+        item = (score, key, plaintext)
+        if len(self.heap) < self.top:
+            heapq.heappush(self.heap, item)
+        elif item > self.heap[0]:
+            heapq.heapreplace(self.heap, item)
+
+
+def _vigenere_search(buffer: bytes, words: List[str], options: Dict[str, Any]) -> Tuple[list, Dict[str, int]]:
+    """Walk a trie of equal-length words, scoring each key column once per shared prefix"""
+    cipher = load_cipher_class('vigenere')()
+    sample = buffer[:options['sample_letters']]
+    candidates = _Candidates(options['top'])
+    stats = {'tested': 0, 'pruned': 0}
+    
+    by_length = {}
+    for word in words:
+        by_length.setdefault(len(word), []).append(word)
+    
+    for period, group in by_length.items():
+        # Column c of the sample decrypted with shift s scores column_scores[c, s]; every key
+        # sharing a prefix reuses the partial sums of that prefix
+        column_scores, column_sizes = shift_scores(sample, period)
+        column_scores, column_sizes = column_scores.tolist(), column_sizes.tolist()
+        stack = [(build_trie(group), 0, 0.0, 0)]
+        
+        while stack:
+            node, depth, total, letters = stack.pop()
+            if node.word is not None:
+                stats['tested'] += 1
+                plaintext = cipher.decrypt_buffer(sample, node.word)
+                score = score_buffer(plaintext)
+                if score < options['threshold']:
+                    stats['pruned'] += 1
+                else:
+                    candidates.add(score, node.word, plaintext)
+                continue
+            
+            for shift, child in node.children.items():
+                child_total = total + column_scores[depth][shift]
+                child_letters = letters + column_sizes[depth]
+                if (child_letters >= options['min_prune_letters']
+                        and child_total / child_letters < options['prune_threshold']):
+                    stats['pruned'] += child.size
+                    continue
+                stack.append((child, depth + 1, child_total, child_letters))
+    
+    return candidates.heap, stats
+
+
+def _permutation_prefix(buffer: bytes, key_order: tuple, letters: int) -> Optional[bytes]:
+    """Decrypt only the first rows of a columnar transposition, or None if the key length cannot fit"""
+    key_length = len(key_order)
+    if len(buffer) % key_length:
+        return None
+    
+    num_rows = len(buffer) // key_length
+    rows = min(-(-letters // key_length), num_rows)
+    grid = bytearray(rows * key_length)
+    for rank, col_index in enumerate(key_order):
+        grid[col_index::key_length] = buffer[rank * num_rows:rank * num_rows + rows]
+    return bytes(grid)
+
+
+def _playfair_prefix(buffer: bytes, key_letters: str, alphabet: str, letters: int) -> bytes:
+    """Decrypt the first digraphs with the key square directly, skipping the full table compile"""
+    square = key_letters + ''.join(char for char in alphabet if char not in key_letters)
+    positions = [divmod(square.index(char), 5) for char in alphabet]
+    cells = [alphabet.index(char) for char in square]
+    plaintext = bytearray()
+    
+    for index in range(0, min(letters, len(buffer)) - 1, 2):
+        (row1, col1), (row2, col2) = positions[buffer[index]], positions[buffer[index + 1]]
+        if row1 == row2:
+            col1, col2 = (col1 - 1) % 5, (col2 - 1) % 5
+        elif col1 == col2:
+            row1, row2 = (row1 - 1) % 5, (row2 - 1) % 5
+        else:
+            col1, col2 = col2, col1
+        plaintext += bytes((cells[row1 * 5 + col1], cells[row2 * 5 + col2]))
+    return bytes(plaintext)
+
+
+def _candidate_search(cipher_type: str, buffer: bytes, words: List[str],
+                      options: Dict[str, Any]) -> Tuple[list, Dict[str, int]]:
+    """Score each distinct key on a short prefix, then survivors on a longer sample"""
+    cipher = load_cipher_class(cipher_type)()
+    candidates = _Candidates(options['top'])
+    stats = {'tested': 0, 'pruned': 0}
+    seen = set()
+    
+    for word in words:
+        # Many words produce the same key square or column order; test each only once
+        if cipher_type == 'permutation':
+            identity = cipher.compile_key(word)
+        else:
+            identity = ''.join(dict.fromkeys(word.replace('J', 'I')))
+        if identity in seen:
+            continue
+        seen.add(identity)
+        stats['tested'] += 1
+        
+        for letters in (options['prefix_letters'], options['sample_letters']):
+            if cipher_type == 'permutation':
+                plaintext = _permutation_prefix(buffer, identity, letters)
+            else:
+                plaintext = _playfair_prefix(buffer, identity, cipher.alphabet, letters + letters % 2)
+            if plaintext is None:
+                break
+            score = score_buffer(plaintext[:letters], cipher.alphabet)
+            if score < options['threshold']:
+                break
+        else:
+            candidates.add(score, word, plaintext[:letters])
+            continue
+        stats['pruned'] += 1
+    
+    return candidates.heap, stats
+
+
+def _search(cipher_type: str, buffer: bytes, words: List[str], options: Dict[str, Any]) -> Tuple[list, Dict[str, int]]:
+    if cipher_type == 'vigenere':
+        return _vigenere_search(buffer, words, options)
+    return _candidate_search(cipher_type, buffer, words, options)
+
+
+class DictionaryAttack:
+    """Tests every word of a wordlist as the key of a ciphertext and ranks the most English-looking results"""
+    
+    def __init__(self, cipher_type: str, words: List[str], jobs: int = 1, chunk_size: int = 20000, **options):
+        if cipher_type not in ATTACK_CIPHERS:
+            raise ValueError(f"Dictionary attack is not supported for {cipher_type}")
+        unknown = set(options) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown options: {', '.join(sorted(unknown))}")
+        
+        self.cipher_type = cipher_type
+        self.words = sorted(set(words))
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        self.options = dict(DEFAULT_OPTIONS, **options)
+        self.cipher = load_cipher_class(cipher_type)()
+    
+    def _chunks(self) -> List[List[str]]:
+        """Split the sorted wordlist so that words sharing a prefix stay in the same chunk"""
+        chunks = []
+        current = []
+        for word in self.words:
+            if len(current) >= self.chunk_size and word[0] != current[-1][0]:
+                chunks.append(current)
+                current = []
+            current.append(word)
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _best(self, items: Iterable[tuple]) -> List[tuple]:
+        """The top (score, key, plaintext) items, keeping one key per distinct plaintext"""
+        # Equivalent keys found in different chunks decrypt to the same text; report the first one
+        best = []
+        plaintexts = set()
+        for score, key, plaintext in sorted(items, reverse=True):
+            if plaintext not in plaintexts and len(best) < self.options['top']:
+                plaintexts.add(plaintext)
+                best.append((score, key, plaintext))
+        return best
+    
+    def run(self, ciphertext: str, checkpoint: Optional[Checkpoint] = None) -> Dict[str, Any]:
+        """Attack a ciphertext and return the best candidates with search counters, resuming a saved checkpoint"""
+        start = time.perf_counter()
+        buffer = self.cipher.to_buffer(ciphertext)
+        if not buffer:
+            raise ValueError("Ciphertext contains no letters")
+        
+        chunks = self._chunks()
+        completed = set()
+        stats = {'tested': 0, 'pruned': 0}
+        best = []
+        elapsed = 0.0
+        
+        # Chunks are the shards of a checkpoint: it lists the finished ones with the counters and
+        # best candidates they produced, so a resumed attack only searches the rest
+        if checkpoint is not None:
+            fingerprint = search_fingerprint(self.cipher_type, buffer, self.words, self.chunk_size, self.options)
+            state = checkpoint.load(CHECKPOINT_KIND, fingerprint)
+            if state is not None:
+                completed = set(state['completed_chunks'])
+                stats = state['stats']
+                elapsed = state['elapsed']
+                best = [(c['score'], c['key'], self.cipher.to_buffer(c['plaintext'])) for c in state['candidates']]
+        
+        def record(index, result):
+            nonlocal best
+            heap, chunk_stats = result
+            for name, value in chunk_stats.items():
+                stats[name] += value
+            best = self._best(best + heap)
+            completed.add(index)
+            
+            if checkpoint is not None and (checkpoint.due() or len(completed) == len(chunks)):
+                checkpoint.save(CHECKPOINT_KIND, fingerprint, {
+                    'cipher_type': self.cipher_type,
+                    'words': len(self.words),
+                    'chunks': len(chunks),
+                    'completed_chunks': sorted(completed),
+                    'stats': stats,
+                    'elapsed': elapsed + time.perf_counter() - start,
+                    'candidates': [
+                        {'key': key, 'score': score, 'plaintext': self.cipher.from_buffer(plaintext)}
+                        for score, key, plaintext in best
+                    ],
+                })
+        
+        pending = [index for index in range(len(chunks)) if index not in completed]
+        if self.jobs <= 1 or len(pending) <= 1:
+            for index in pending:
+                record(index, _search(self.cipher_type, buffer, chunks[index], self.options))
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                futures = {pool.submit(_search, self.cipher_type, buffer, chunks[index], self.options): index
+                           for index in pending}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+        
+        return {
+            'cipher_type': self.cipher_type,
+            'words': len(self.words),
+            'tested': stats['tested'],
+            'pruned': stats['pruned'],
+            'seconds': elapsed + time.perf_counter() - start,
+            'candidates': [
+                {'key': key, 'score': round(score, 4), 'plaintext': self.cipher.from_buffer(plaintext)}
+                for score, key, plaintext in best
+            ],
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Dictionary attack against a keyword cipher')
+    parser.add_argument('--cipher', required=True, choices=ATTACK_CIPHERS)
+    parser.add_argument('--wordlist', required=True, help='file with one candidate key per line')
+    parser.add_argument('--input', help='ciphertext file (default: stdin)')
+    parser.add_argument('--jobs', type=int, default=1, help='worker processes')
+    parser.add_argument('--top', type=int, default=DEFAULT_OPTIONS['top'], help='candidates to report')
+    parser.add_argument('--checkpoint', help='JSON file to save progress to and resume it from')
+    parser.add_argument('--checkpoint-interval', type=float, default=30.0, help='seconds between checkpoint saves')
+    args = parser.parse_args(argv)
+    
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8', errors='ignore') as f:
+            ciphertext = f.read()
+    else:
+        ciphertext = sys.stdin.read()
+    
+    attack = DictionaryAttack(args.cipher, load_wordlist(args.wordlist), jobs=args.jobs, top=args.top)
+    checkpoint = Checkpoint(args.checkpoint, args.checkpoint_interval) if args.checkpoint else None
+    try:
+        report = attack.run(ciphertext, checkpoint)
+    except ValueError as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+    
+    print(json.dumps(report, indent=2))
+    return 0 if report['candidates'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import math
+import os
+import string
+from functools import lru_cache
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Relative frequency (%) of letters in English text
+ENGLISH_FREQUENCIES = {
+    'A': 8.17, 'B': 1.49, 'C': 2.78, 'D': 4.25, 'E': 12.70, 'F': 2.23, 'G': 2.02, 'H': 6.09, 'I': 6.97,
+    'J': 0.15, 'K': 0.77, 'L': 4.03, 'M': 2.41, 'N': 6.75, 'O': 7.51, 'P': 1.93, 'Q': 0.10, 'R': 5.99,
+    'S': 6.33, 'T': 9.06, 'U': 2.76, 'V': 0.98, 'W': 2.36, 'X': 0.15, 'Y': 1.97, 'Z': 0.07,
+}
+
+# Relative frequency (%) of the most common English bigrams; the remaining mass is
+# spread over the other pairs in proportion to their letter frequencies
+COMMON_BIGRAMS = {
+    'TH': 3.56, 'HE': 3.07, 'IN': 2.43, 'ER': 2.05, 'AN': 1.99, 'RE': 1.85, 'ON': 1.76, 'AT': 1.49,
+    'EN': 1.45, 'ND': 1.35, 'TI': 1.34, 'ES': 1.34, 'OR': 1.28, 'TE': 1.20, 'OF': 1.17, 'ED': 1.17,
+    'IS': 1.13, 'IT': 1.12, 'AL': 1.09, 'AR': 1.07, 'ST': 1.05, 'TO': 1.04, 'NT': 1.04, 'NG': 0.95,
+    'SE': 0.93, 'HA': 0.93, 'AS': 0.87, 'OU': 0.87, 'IO': 0.83, 'LE': 0.83, 'VE': 0.83, 'CO': 0.79,
+    'ME': 0.79, 'DE': 0.76, 'HI': 0.76, 'RI': 0.73, 'RO': 0.73, 'IC': 0.70, 'NE': 0.69, 'EA': 0.69,
+    'RA': 0.69, 'CE': 0.65, 'LI': 0.62, 'CH': 0.60, 'LL': 0.58, 'BE': 0.58, 'MA': 0.57, 'SI': 0.55,
+    'OM': 0.55, 'UR': 0.54,
+}
+
+# "QUAD COUNT" lines counted over English prose by cryptanalysis.build_quadgrams
+QUADGRAM_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'english_quadgrams.txt')
+
+# Count given to quadgrams missing from the table
+QUADGRAM_FLOOR = 0.01
+
+# Uppercase ASCII text -> letter buffer
+_TEXT_TABLE = bytes.maketrans(string.ascii_uppercase.encode('ascii'), bytes(range(26)))
+_NON_LETTERS = bytes(c for c in range(256) if not 65 <= c <= 90)
+
+
+@lru_cache(maxsize=None)
+def english_tables() -> Tuple['np.ndarray', 'np.ndarray']:
+    """Return (letter log-probabilities, bigram log-probabilities of the next letter given the previous one)"""
+    import numpy as np  # imported on first use to keep module import cheap
+    
+    letters = np.array([ENGLISH_FREQUENCIES[c] for c in string.ascii_uppercase]) / 100
+    letters /= letters.sum()
+    
+    joint = np.zeros((26, 26))
+    for bigram, percent in COMMON_BIGRAMS.items():
+        joint[ord(bigram[0]) - 65, ord(bigram[1]) - 65] = percent / 100
+    
+    known = joint > 0
+    rest = np.outer(letters, letters) * ~known
+    joint += rest * (1 - joint.sum()) / rest.sum()
+    
+    conditional = joint / joint.sum(axis=1, keepdims=True)
+    return np.log(letters), np.log(conditional)
+
+
+@lru_cache(maxsize=None)
+def quadgram_counts() -> Tuple['np.ndarray', int]:
+    """Return (count of every quadgram indexed ((a * 26 + b) * 26 + c) * 26 + d, number of quadgrams counted)"""
+    import numpy as np
+    
+    counts = np.zeros(26 ** 4)
+    total = 0
+    with open(QUADGRAM_PATH, 'r', encoding='ascii') as f:
+        for line in f:
+            fields = line.split()
+            if fields[0] == '#':
+                if fields[1] == 'total':
+                    total = int(fields[2])
+                continue
+            a, b, c, d = (ord(letter) - 65 for letter in fields[0])
+            counts[((a * 26 + b) * 26 + c) * 26 + d] = int(fields[1])
+    return counts, max(total, int(counts.sum()))
+
+
+@lru_cache(maxsize=None)
+def english_quadgrams() -> 'np.ndarray':
+    """Log-probability of every quadgram, indexed like quadgram_counts"""
+    import numpy as np
+    
+    counts, total = quadgram_counts()
+    return np.log(np.maximum(counts, QUADGRAM_FLOOR) / total)
+
+
+@lru_cache(maxsize=None)
+def english_bigrams() -> 'np.ndarray':
+    """Log-probability of the next letter given the previous one, over all 26x26 pairs of the quadgram counts"""
+    import numpy as np
+    
+    counts, _ = quadgram_counts()
+    joint = counts.reshape(26 ** 2, 26 ** 2).sum(axis=1).reshape(26, 26) + 0.5
+    return np.log(joint / joint.sum(axis=1, keepdims=True))
+
+
+def quadgram_index(letters: 'np.ndarray') -> 'np.ndarray':
+    """Index into english_quadgrams of every run of four A-Z letter indices"""
+    return ((letters[:-3] * 26 + letters[1:-2]) * 26 + letters[2:-1]) * 26 + letters[3:]
+
+
+@lru_cache(maxsize=None)
+def alphabet_translation(alphabet: str) -> bytes:
+    """Translation table from letter indices of alphabet to indices of A-Z"""
+    table = bytearray(range(256))
+    for index, char in enumerate(alphabet):
+        table[index] = ord(char) - 65
+    return bytes(table)
+
+
+def score_buffer(buffer: bytes, alphabet: str = string.ascii_uppercase) -> float:
+    """Mean log-likelihood per letter of a letter buffer under an English bigram model (higher is more English)"""
+    import numpy as np
+    
+    if not buffer:
+        return -math.inf
+    if alphabet != string.ascii_uppercase:
+        buffer = bytes(buffer).translate(alphabet_translation(alphabet))
+    
+    unigram, bigram = english_tables()
+    letters = np.frombuffer(bytes(buffer), dtype=np.uint8).astype(np.intp)
+    total = unigram[letters[0]] + bigram[letters[:-1], letters[1:]].sum()
+    return float(total / len(letters))
+
+
+def text_to_buffer(text: str) -> bytes:
+    """Convert the A-Z letters of a text into a letter buffer, dropping everything else"""
+    return text.upper().encode('ascii', 'ignore').translate(_TEXT_TABLE, _NON_LETTERS)
+
+
+def score_text(text: str) -> float:
+    """Score the letters of a text, ignoring everything else"""
+    return score_buffer(text_to_buffer(text))
+
+
+def shift_scores(buffer: bytes, period: int) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Return (scores, sizes): scores[column, shift] is the letter log-likelihood of that column decrypted with shift"""
+    import numpy as np
+    
+    unigram, _ = english_tables()
+    letters = np.frombuffer(bytes(buffer), dtype=np.uint8).astype(np.intp)
+    counts = np.stack([np.bincount(letters[column::period], minlength=26) for column in range(period)])
+    
+    # shifted[s, b] is the log-probability of ciphertext letter b decrypted with shift s
+    shifted = unigram[(np.arange(26)[None, :] - np.arange(26)[:, None]) % 26]
+    return counts @ shifted.T, counts.sum(axis=1)
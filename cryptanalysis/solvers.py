@@ -0,0 +1,479 @@
+"""Stochastic key search (simulated annealing with restarts) for substitution, Playfair and permutation ciphers.
+
+Usage:
+    python -m cryptanalysis.solvers --cipher substitution --seconds 20 < ciphertext.txt
+    python -m cryptanalysis.solvers --cipher playfair --seconds 600 --checkpoint playfair.json --input ciphertext.txt
+"""
+import argparse
+import json
+import math
+import random
+import string
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from ciphers.registry import load_cipher_class
+from cryptanalysis.checkpoint import Checkpoint, search_fingerprint
+from cryptanalysis.scoring import (alphabet_translation, english_bigrams, english_quadgrams, english_tables,
+                                   quadgram_index)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SOLVER_CIPHERS = ('substitution', 'playfair', 'permutation')
+
+# seconds / max_iterations: search budget; sample_letters: ciphertext letters scored per key;
+# restart_iterations: annealing steps before restarting from a fresh key (None: the solver's
+# own default); progress_interval: minimum seconds between progress reports; preview_letters:
+# plaintext letters in a report
+DEFAULT_OPTIONS = {
+    'seconds': 30.0,
+    'max_iterations': None,
+    'sample_letters': 1000,
+    'restart_iterations': None,
+    'progress_interval': 0.5,
+    'preview_letters': 200,
+    'seed': None,
+}
+
+# Iterations between checks of the clock and the stop callback
+_CHECK_EVERY = 256
+
+# Checkpoint kind written by StochasticSolver.run
+CHECKPOINT_KIND = 'stochastic_solver'
+
+
+class StochasticSolver(ABC):
+    """Anneals a key towards the plaintext that scores most like English, restarting now and then"""
+    
+    cipher_type = None
+    # Starting temperature, in nats of log-likelihood per letter: a key change costs about as much
+    # per letter whatever the sample length, so one temperature suits short and long ciphertexts
+    temperature = 0.1
+    # Annealing steps before a restart
+    restart_iterations = 20000
+    
+    def __init__(self, ciphertext: str, **options):
+        unknown = set(options) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown options: {', '.join(sorted(unknown))}")
+        self.options = dict(DEFAULT_OPTIONS, **options)
+        self.cipher = load_cipher_class(self.cipher_type)()
+        self.buffer = self.cipher.to_buffer(ciphertext)
+        if not self.buffer:
+            raise ValueError("Ciphertext contains no letters")
+        self.sample = self.buffer[:self.options['sample_letters']]
+        if self.options['restart_iterations']:
+            self.restart_iterations = self.options['restart_iterations']
+        self.rng = random.Random(self.options['seed'])
+        self.unigram, _ = english_tables()
+        self.bigram = english_bigrams()
+        self.quadgram = english_quadgrams()
+        self.iterations = 0
+        self.restarts = 0
+        self.best_key = None
+        self.best_score = -math.inf
+        # Seconds spent by earlier runs of a resumed search, and the (key, score, step) of its walk
+        self.elapsed = 0.0
+        self._walk = None
+    
+    @abstractmethod
+    def random_key(self):
+        """A uniformly random key in the solver's internal form"""
+        pass
+    
+    @abstractmethod
+    def neighbour(self, key):
+        """A key one small change away from key"""
+        pass
+    
+    @abstractmethod
+    def score(self, key) -> float:
+        """Mean English log-likelihood per letter of the sample decrypted with key"""
+        pass
+    
+    @abstractmethod
+    def key_string(self, key) -> str:
+        """The key in the format the cipher accepts"""
+        pass
+    
+    def encode_key(self, key) -> list:
+        """JSON form of a key for checkpoints"""
+        return [int(value) for value in key]
+    
+    def decode_key(self, data: list):
+        """Key back from encode_key"""
+        import numpy as np
+        
+        return np.array(data, dtype=np.intp)
+    
+    def _fingerprint(self) -> str:
+        """Identify the search: ciphertext, scoring model and every option that changes the walk"""
+        return search_fingerprint(self.cipher_type, 'quadgrams', self.buffer, self.options['sample_letters'],
+                                  self.restart_iterations, self.temperature, self.options['seed'])
+    
+    def _checkpoint_state(self, key, score: float, step: int, started: float, stopped: bool = False) -> Dict[str, Any]:
+        """Everything needed to continue the walk exactly where it is"""
+        version, internal, gauss = self.rng.getstate()
+        has_best = self.best_key is not None
+        return {
+            'cipher_type': self.cipher_type,
+            'elapsed': self.elapsed + time.perf_counter() - started,
+            'iterations': self.iterations,
+            'restarts': self.restarts,
+            'step': step,
+            'key': self.encode_key(key),
+            'score': score,
+            'best_key': self.encode_key(self.best_key) if has_best else None,
+            'best_score': self.best_score if has_best else None,
+            'best_key_string': self.key_string(self.best_key) if has_best else None,
+            'stopped': stopped,
+            # Last, as it is the long part of the file
+            'rng_state': [version, list(internal), gauss],
+        }
+    
+    def resume(self, checkpoint: Checkpoint) -> bool:
+        """Load the saved state of this search from a checkpoint; False when nothing was saved yet"""
+        state = checkpoint.load(CHECKPOINT_KIND, self._fingerprint())
+        if state is None:
+            return False
+        
+        version, internal, gauss = state['rng_state']
+        self.rng.setstate((version, tuple(internal), gauss))
+        self.elapsed = state['elapsed']
+        self.iterations = state['iterations']
+        self.restarts = state['restarts']
+        if state['best_key'] is not None:
+            self.best_key, self.best_score = self.decode_key(state['best_key']), state['best_score']
+        self._walk = (self.decode_key(state['key']), state['score'], state['step'])
+        return True
+    
+    def _score_letters(self, letters: 'np.ndarray') -> float:
+        """Quadgram log-likelihood of A-Z letter indices, per letter"""
+        return float(self.quadgram[quadgram_index(letters)].sum() / len(letters))
+    
+    def progress(self, started: float) -> Dict[str, Any]:
+        """Snapshot of the search: counters, best score and key, and a plaintext preview"""
+        key = self.key_string(self.best_key)
+        preview = self.cipher.decrypt_buffer(self.buffer[:self.options['preview_letters']], key)
+        return {
+            'cipher_type': self.cipher_type,
+            'iterations': self.iterations,
+            'restarts': self.restarts,
+            'seconds': round(self.elapsed + time.perf_counter() - started, 3),
+            'score': round(self.best_score, 4),
+            'key': key,
+            'preview': self.cipher.from_buffer(preview),
+        }
+    
+    def run(self, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None,
+            checkpoint: Optional[Checkpoint] = None) -> Dict[str, Any]:
+        """Search until the time or iteration budget runs out or should_stop() returns True
+        
+        With a checkpoint, a saved state of the same search is picked up where it was left
+        (the time budget counts the seconds already spent) and the state is saved every
+        checkpoint.interval seconds and when the run ends.
+        """
+        max_iterations = self.options['max_iterations']
+        restart_iterations = self.restart_iterations
+        scale = 1 / self.temperature
+        stopped = False
+        
+        # A checkpoint of this search continues its walk; the time budget includes the seconds
+        # already spent, and the state is saved every checkpoint.interval seconds and at the end
+        if checkpoint is not None:
+            fingerprint = self._fingerprint()
+            if self._walk is None:
+                self.resume(checkpoint)
+        if self._walk is not None:
+            (key, score, step), self._walk = self._walk, None
+        else:
+            key = self.random_key()
+            score = self.score(key)
+            step = 0
+        
+        started = time.perf_counter()
+        deadline = started + self.options['seconds'] - self.elapsed
+        last_report = started
+        while True:
+            if self.iterations % _CHECK_EVERY == 0:
+                now = time.perf_counter()
+                if now >= deadline or (max_iterations is not None and self.iterations >= max_iterations):
+                    break
+                if should_stop is not None and should_stop():
+                    stopped = True
+                    break
+                if on_progress is not None and self.best_key is not None and now - last_report >= self.options['progress_interval']:
+                    on_progress(self.progress(started))
+                    last_report = now
+                if checkpoint is not None and checkpoint.due():
+                    checkpoint.save(CHECKPOINT_KIND, fingerprint, self._checkpoint_state(key, score, step, started))
+            
+            if step >= restart_iterations:
+                key = self.random_key()
+                score = self.score(key)
+                step = 0
+                self.restarts += 1
+            
+            # Linear cooling within each restart
+            cooling = scale / max(1 - step / restart_iterations, 1e-3)
+            candidate = self.neighbour(key)
+            candidate_score = self.score(candidate)
+            delta = candidate_score - score
+            if delta >= 0 or self.rng.random() < math.exp(delta * cooling):
+                key, score = candidate, candidate_score
+                if score > self.best_score:
+                    self.best_key, self.best_score = key, score
+            self.iterations += 1
+            step += 1
+        
+        if self.best_key is None:
+            self.best_key, self.best_score = key, score
+        if checkpoint is not None:
+            checkpoint.save(CHECKPOINT_KIND, fingerprint, self._checkpoint_state(key, score, step, started, stopped))
+        seconds = self.elapsed + time.perf_counter() - started
+        result = self.progress(started)
+        key = result['key']
+        result.update({
+            'plaintext': self.cipher.from_buffer(self.cipher.decrypt_buffer(self.buffer, key)),
+            'evaluations_per_second': round(self.iterations / seconds, 1) if seconds else None,
+            'stopped': stopped,
+        })
+        del result['preview']
+        return result
+
+
+class SubstitutionSolver(StochasticSolver):
+    """Key is the plaintext letter of every ciphertext letter; the sample is decrypted with one lookup"""
+    
+    cipher_type = 'substitution'
+    
+    def __init__(self, ciphertext: str, **options):
+        super().__init__(ciphertext, **options)
+        import numpy as np  # imported on first use to keep module import cheap
+        
+        self.letters = np.frombuffer(self.sample, dtype=np.uint8).astype(np.intp)
+        self.by_frequency = np.argsort(-np.bincount(self.letters, minlength=26), kind='stable')
+        self.english_order = np.argsort(-self.unigram, kind='stable')
+    
+    def random_key(self):
+        import numpy as np
+        
+        # Start from the frequency match, shuffled more on every restart
+        key = np.empty(26, dtype=np.intp)
+        key[self.by_frequency] = self.english_order
+        for _ in range(min(self.restarts * 2, 40)):
+            i, j = self.rng.randrange(26), self.rng.randrange(26)
+            key[i], key[j] = key[j], key[i]
+        return key
+    
+    def neighbour(self, key):
+        key = key.copy()
+        i, j = self.rng.randrange(26), self.rng.randrange(26)
+        key[i], key[j] = key[j], key[i]
+        return key
+    
+    def score(self, key) -> float:
+        return self._score_letters(key[self.letters])
+    
+    def key_string(self, key) -> str:
+        # The substitution key lists the ciphertext letter of every plaintext letter
+        cipher_letters = [''] * 26
+        for cipher_letter, plain_letter in enumerate(key):
+            cipher_letters[plain_letter] = string.ascii_uppercase[cipher_letter]
+        return ''.join(cipher_letters)
+
+
+class PlayfairSolver(StochasticSolver):
+    """Key is the 5x5 square as 25 letter indices; every digraph is decrypted with array operations"""
+    
+    cipher_type = 'playfair'
+    # The square needs far longer walks than a substitution key to settle
+    restart_iterations = 100000
+    
+    def __init__(self, ciphertext: str, **options):
+        super().__init__(ciphertext, **options)
+        import numpy as np
+        
+        sample = self.sample[:len(self.sample) - len(self.sample) % 2]
+        if not sample:
+            raise ValueError("Playfair ciphertext needs at least two letters")
+        pairs = np.frombuffer(sample, dtype=np.uint8).reshape(-1, 2).astype(np.intp)
+        self.first_letters, self.second_letters = pairs[:, 0], pairs[:, 1]
+        self.to_english = np.frombuffer(alphabet_translation(self.cipher.alphabet)[:25], dtype=np.uint8).astype(np.intp)
+        
+        # The Playfair rules only depend on where the two letters sit in the square, so the plaintext
+        # cells of every pair of ciphertext cells are worked out once for all keys
+        row, col = np.divmod(np.arange(25), 5)
+        row1, col1, row2, col2 = row[:, None], col[:, None], row[None, :], col[None, :]
+        same_row, same_col = row1 == row2, col1 == col2
+        plain1 = np.where(same_row, row1 * 5 + (col1 - 1) % 5, np.where(same_col, (row1 - 1) % 5 * 5 + col1, row1 * 5 + col2))
+        plain2 = np.where(same_row, row2 * 5 + (col2 - 1) % 5, np.where(same_col, (row2 - 1) % 5 * 5 + col2, row2 * 5 + col1))
+        self.plain_cells = np.stack([plain1.ravel(), plain2.ravel()], axis=1)
+    
+    def random_key(self):
+        import numpy as np
+        
+        return np.array(self.rng.sample(range(25), 25), dtype=np.intp)
+    
+    def neighbour(self, key):
+        import numpy as np
+        
+        choice = self.rng.random()
+        grid = key.reshape(5, 5)
+        if choice < 0.9:
+            key = key.copy()
+            i, j = self.rng.randrange(25), self.rng.randrange(25)
+            key[i], key[j] = key[j], key[i]
+            return key
+        if choice < 0.94:
+            i, j = self.rng.randrange(5), self.rng.randrange(5)
+            grid = grid.copy()
+            grid[[i, j]] = grid[[j, i]]
+        elif choice < 0.98:
+            i, j = self.rng.randrange(5), self.rng.randrange(5)
+            grid = grid.copy()
+            grid[:, [i, j]] = grid[:, [j, i]]
+        else:
+            grid = (grid.T, grid[::-1], grid[:, ::-1])[self.rng.randrange(3)]
+        return np.ascontiguousarray(grid).ravel()
+    
+    def decrypt_letters(self, key) -> 'np.ndarray':
+        """Decrypt the sample digraphs with a square, returning (digraphs, 2) A-Z letter indices"""
+        import numpy as np
+        
+        cells = np.empty(25, dtype=np.intp)
+        cells[key] = np.arange(25)
+        plain = self.plain_cells[cells[self.first_letters] * 25 + cells[self.second_letters]]
+        return self.to_english[key][plain]
+    
+    def score(self, key) -> float:
+        return self._score_letters(self.decrypt_letters(key).ravel())
+    
+    def key_string(self, key) -> str:
+        return ''.join(self.cipher.alphabet[letter] for letter in key)
+
+
+class PermutationSolver(StochasticSolver):
+    """Key is a column count and the rank of every plaintext column; the score sums precomputed column adjacencies"""
+    
+    cipher_type = 'permutation'
+    # Widest column count tried
+    max_columns = 20
+    
+    def __init__(self, ciphertext: str, **options):
+        super().__init__(ciphertext, **options)
+        import numpy as np
+        
+        # Column counts that divide the text, as the cipher pads every row
+        self.widths = [width for width in range(2, min(self.max_columns, len(self.buffer) // 2) + 1)
+                       if len(self.buffer) % width == 0]
+        if not self.widths:
+            raise ValueError("Ciphertext length has no column count the permutation cipher could have used")
+        
+        letters = np.frombuffer(self.buffer, dtype=np.uint8).astype(np.intp)
+        self.adjacency = {}
+        for width in self.widths:
+            rows = len(letters) // width
+            blocks = letters.reshape(width, rows)[:, :max(self.options['sample_letters'] // width, 2)]
+            # adjacent[a, b]: column block a directly left of block b in the same row;
+            # wrapped[a, b]: block a ends a row and block b starts the next one
+            adjacent = self.bigram[blocks[:, None, :], blocks[None, :, :]].sum(axis=2)
+            wrapped = self.bigram[blocks[:, None, :-1], blocks[None, :, 1:]].sum(axis=2)
+            self.adjacency[width] = (adjacent, wrapped, blocks.size)
+    
+    def random_key(self):
+        width = self.widths[self.restarts % len(self.widths)]
+        ranks = list(range(width))
+        self.rng.shuffle(ranks)
+        return (width, tuple(ranks))
+    
+    def neighbour(self, key):
+        width, ranks = key
+        ranks = list(ranks)
+        i, j = sorted(self.rng.sample(range(width), 2))
+        choice = self.rng.random()
+        if choice < 0.5:
+            ranks[i], ranks[j] = ranks[j], ranks[i]
+        elif choice < 0.8:
+            ranks[i:j + 1] = ranks[i:j + 1][::-1]
+        else:
+            # Move one column elsewhere
+            ranks.insert(j, ranks.pop(i))
+        return (width, tuple(ranks))
+    
+    def score(self, key) -> float:
+        width, ranks = key
+        adjacent, wrapped, letters = self.adjacency[width]
+        total = sum(adjacent[ranks[column], ranks[column + 1]] for column in range(width - 1))
+        return float((total + wrapped[ranks[-1], ranks[0]]) / letters)
+    
+    def encode_key(self, key) -> list:
+        width, ranks = key
+        return [width, list(ranks)]
+    
+    def decode_key(self, data: list):
+        return (data[0], tuple(data[1]))
+    
+    def key_string(self, key) -> str:
+        # Sorting the key letters must give back the rank of every column
+        width, ranks = key
+        return ''.join(string.ascii_uppercase[rank] for rank in ranks)
+
+
+SOLVERS = {
+    'substitution': SubstitutionSolver,
+    'playfair': PlayfairSolver,
+    'permutation': PermutationSolver,
+}
+
+
+def create_solver(cipher_type: str, ciphertext: str, **options) -> StochasticSolver:
+    """Build the solver for a cipher type"""
+    if cipher_type not in SOLVERS:
+        raise ValueError(f"Stochastic search is not supported for {cipher_type}")
+    return SOLVERS[cipher_type](ciphertext, **options)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Stochastic key search against a classical cipher')
+    parser.add_argument('--cipher', required=True, choices=SOLVER_CIPHERS)
+    parser.add_argument('--input', help='ciphertext file (default: stdin)')
+    parser.add_argument('--seconds', type=float, default=DEFAULT_OPTIONS['seconds'], help='time budget')
+    parser.add_argument('--seed', type=int, help='random seed')
+    parser.add_argument('--progress', action='store_true', help='print progress reports to stderr')
+    parser.add_argument('--checkpoint', help='JSON file to save the search to and resume it from')
+    parser.add_argument('--checkpoint-interval', type=float, default=30.0, help='seconds between checkpoint saves')
+    args = parser.parse_args(argv)
+    
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8', errors='ignore') as f:
+            ciphertext = f.read()
+    else:
+        ciphertext = sys.stdin.read()
+    
+    try:
+        solver = create_solver(args.cipher, ciphertext, seconds=args.seconds, seed=args.seed)
+    except ValueError as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+    
+    report = None
+    if args.progress:
+        def report(progress):
+            print(json.dumps(progress), file=sys.stderr)
+    checkpoint = Checkpoint(args.checkpoint, args.checkpoint_interval) if args.checkpoint else None
+    try:
+        result = solver.run(on_progress=report, checkpoint=checkpoint)
+    except ValueError as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
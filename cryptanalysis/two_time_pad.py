@@ -0,0 +1,288 @@
+"""Two-time pad detection and crib dragging for stored one-time pad ciphertexts.
+
+Every message encrypted with the same 'file:' key starts at pad offset 0, so
+the mod-26 difference of two such ciphertexts is the difference of their
+plaintexts, with the pad cancelled out.
+
+Usage:
+    python -m cryptanalysis.two_time_pad scan encrypted/
+    python -m cryptanalysis.two_time_pad drag encrypted/a.dat encrypted/b.dat --crib ATTACKATDAWN
+    python -m cryptanalysis.two_time_pad drag encrypted/a.dat encrypted/b.dat   (interactive)
+"""
+import argparse
+import json
+import math
+import os
+import string
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from cryptanalysis.scoring import english_tables, text_to_buffer
+from utils.file_processor import FileProcessor
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# max_letters: leading letters of each ciphertext compared; min_overlap: shortest common length
+# worth testing; alpha: chance of reporting any unrelated pair across the whole scan
+DEFAULT_OPTIONS = {
+    'max_letters': 4096,
+    'min_overlap': 200,
+    'alpha': 0.01,
+    'batch_size': 512,
+}
+
+# Degrees of freedom of the chi-square statistic of a 26-bin histogram
+_DEGREES = 25
+
+
+def index_ciphertexts(folder: str, max_letters: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Read the leading letters of every one-time pad .dat file in a folder"""
+    processor = FileProcessor(folder)
+    entries = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if not name.endswith('.dat') or not os.path.isfile(path):
+            continue
+        try:
+            with processor.open_content(path) as reader:
+                if reader.metadata.get('cipher_type') != 'onetimepad':
+                    continue
+                letters = text_to_buffer(reader.read(0, max_letters or reader.length))
+        except (OSError, ValueError, UnicodeDecodeError):
+            # Not a readable encrypted file
+            continue
+        if letters:
+            entries.append({'name': name, 'path': path, 'letters': letters})
+    return entries
+
+
+def _chi_square_tail(statistic: float, degrees: int = _DEGREES) -> float:
+    """Upper tail probability of a chi-square statistic (Wilson-Hilferty approximation)"""
+    z = ((statistic / degrees) ** (1 / 3) - (1 - 2 / (9 * degrees))) / math.sqrt(2 / (9 * degrees))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _phases(letters: 'np.ndarray', t: int) -> 'np.ndarray':
+    """exp(2*pi*i*t*letter/26) per position, 0 where the padding value 26 marks no letter"""
+    import numpy as np
+    
+    table = np.zeros(27, dtype=np.complex64)
+    table[:26] = np.exp(2j * np.pi * t * np.arange(26) / 26)
+    return table[letters]
+
+
+def pad_reuse_pairs(buffers: List[bytes], max_letters: int = DEFAULT_OPTIONS['max_letters'],
+                    min_overlap: int = DEFAULT_OPTIONS['min_overlap'], alpha: float = DEFAULT_OPTIONS['alpha'],
+                    batch_size: int = DEFAULT_OPTIONS['batch_size']) -> Dict[str, Any]:
+    """Find pairs of letter buffers whose mod-26 difference has the letter repetition of English
+    
+    For a pair with overlap N and difference histogram c, sum(c_d ** 2) equals
+    (N ** 2 + P) / 26 with P the sum over t = 1..25 of |F_t| ** 2, F_t = sum_k w ** (t * (a_k - b_k))
+    and w = exp(2*pi*i / 26), so each block of pairs needs only 13 complex matrix products. The
+    chi-square statistic of the histogram against uniform letters is then simply P / N.
+    """
+    import numpy as np  # imported on first use to keep module import cheap
+    
+    count = len(buffers)
+    width = min(max_letters, max((len(buffer) for buffer in buffers), default=0))
+    letters = np.full((count, width), 26, dtype=np.uint8)
+    lengths = np.zeros(count, dtype=np.int64)
+    for index, buffer in enumerate(buffers):
+        row = np.frombuffer(bytes(buffer[:width]), dtype=np.uint8)
+        letters[index, :len(row)] = row
+        lengths[index] = len(row)
+    
+    # Pairs that overlap enough to be tested; the reporting threshold is shared between them
+    sorted_lengths = np.sort(lengths)
+    eligible = np.searchsorted(sorted_lengths, min_overlap)
+    tested = (count - eligible) * (count - eligible - 1) // 2
+    threshold = alpha / max(tested, 1)
+    
+    pairs = []
+    for row_start in range(0, count, batch_size):
+        row_end = min(row_start + batch_size, count)
+        for col_start in range(row_start, count, batch_size):
+            col_end = min(col_start + batch_size, count)
+            power = np.zeros((row_end - row_start, col_end - col_start))
+            for t in range(1, 14):
+                product = _phases(letters[row_start:row_end], t) @ _phases(letters[col_start:col_end], t).conj().T
+                # |F_t| = |F_(26 - t)|, and t = 13 is its own mirror
+                power += (2 if t < 13 else 1) * np.abs(product).astype(np.float64) ** 2
+            
+            overlap = np.minimum.outer(lengths[row_start:row_end], lengths[col_start:col_end]).astype(np.float64)
+            statistic = power / np.maximum(overlap, 1)
+            candidate = (overlap >= min_overlap) & (statistic > _DEGREES)
+            if col_start == row_start:
+                candidate &= np.triu(np.ones(candidate.shape, dtype=bool), 1)
+            
+            for row, col in zip(*np.nonzero(candidate)):
+                p_value = _chi_square_tail(float(statistic[row, col]))
+                if p_value <= threshold:
+                    n = overlap[row, col]
+                    sum_squares = (n ** 2 + power[row, col]) / 26
+                    pairs.append({
+                        'first': row_start + int(row),
+                        'second': col_start + int(col),
+                        'overlap': int(n),
+                        'ioc': float((sum_squares - n) / (n * (n - 1))),
+                        'chi_square': float(statistic[row, col]),
+                        'p_value': p_value,
+                    })
+    
+    pairs.sort(key=lambda pair: pair['p_value'])
+    return {'buffers': count, 'pairs_tested': int(tested), 'threshold': threshold, 'pairs': pairs}
+
+
+def scan_folder(folder: str, **options) -> Dict[str, Any]:
+    """Find the stored one-time pad ciphertexts of a folder that were encrypted with the same pad"""
+    unknown = set(options) - set(DEFAULT_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown options: {', '.join(sorted(unknown))}")
+    options = dict(DEFAULT_OPTIONS, **options)
+    
+    entries = index_ciphertexts(folder, options['max_letters'])
+    result = pad_reuse_pairs([entry['letters'] for entry in entries], **options)
+    for pair in result['pairs']:
+        pair['first'] = entries[pair['first']]['name']
+        pair['second'] = entries[pair['second']]['name']
+    result['files'] = result.pop('buffers')
+    return result
+
+
+class CribDragger:
+    """Slides guessed plaintext across the difference of two ciphertexts that share a pad"""
+    
+    def __init__(self, first: bytes, second: bytes):
+        import numpy as np
+        
+        length = min(len(first), len(second))
+        a = np.frombuffer(bytes(first[:length]), dtype=np.uint8).astype(np.int16)
+        b = np.frombuffer(bytes(second[:length]), dtype=np.uint8).astype(np.int16)
+        # first plaintext - second plaintext, letter by letter
+        self.difference = (a - b) % 26
+        # Letters placed so far per message, -1 where still unknown
+        self.known = {'first': np.full(length, -1, dtype=np.int16), 'second': np.full(length, -1, dtype=np.int16)}
+    
+    @property
+    def length(self) -> int:
+        return len(self.difference)
+    
+    def _crib(self, crib: str) -> 'np.ndarray':
+        import numpy as np
+        
+        letters = text_to_buffer(crib)
+        if not letters:
+            raise ValueError("Crib contains no letters")
+        if len(letters) > self.length:
+            raise ValueError(f"Crib is longer than the common length ({self.length})")
+        return np.frombuffer(letters, dtype=np.uint8).astype(np.int16)
+    
+    def drag(self, crib: str, top: int = 10) -> List[Dict[str, Any]]:
+        """Score the other message's letters for the crib at every offset of either message, best first"""
+        import numpy as np
+        from numpy.lib.stride_tricks import sliding_window_view
+        
+        letters = self._crib(crib)
+        windows = sliding_window_view(self.difference, len(letters))
+        unigram, bigram = english_tables()
+        
+        candidates = []
+        # Crib in the first message reveals second = crib - difference, and the other way around
+        for message, revealed in (('first', (letters - windows) % 26), ('second', (letters + windows) % 26)):
+            scores = unigram[revealed[:, 0]] + bigram[revealed[:, :-1], revealed[:, 1:]].sum(axis=1)
+            scores /= len(letters)
+            for offset in np.argsort(scores)[::-1][:top]:
+                candidates.append({
+                    'offset': int(offset),
+                    'message': message,
+                    'revealed': ''.join(string.ascii_uppercase[c] for c in revealed[offset]),
+                    'score': round(float(scores[offset]), 4),
+                })
+        
+        candidates.sort(key=lambda candidate: candidate['score'], reverse=True)
+        return candidates[:top]
+    
+    def place(self, crib: str, offset: int, message: str = 'first') -> Dict[str, str]:
+        """Fix the crib at an offset of one message, reveal the other's letters there and return both"""
+        if message not in self.known:
+            raise ValueError("Message must be 'first' or 'second'")
+        letters = self._crib(crib)
+        if not 0 <= offset <= self.length - len(letters):
+            raise ValueError(f"Offset must be between 0 and {self.length - len(letters)}")
+        
+        difference = self.difference[offset:offset + len(letters)]
+        other = 'second' if message == 'first' else 'first'
+        self.known[message][offset:offset + len(letters)] = letters
+        self.known[other][offset:offset + len(letters)] = (letters - difference if message == 'first'
+                                                           else letters + difference) % 26
+        return self.plaintexts()
+    
+    def plaintexts(self) -> Dict[str, str]:
+        """Both partial plaintexts, with '.' for letters not placed yet"""
+        return {message: ''.join(string.ascii_uppercase[c] if c >= 0 else '.' for c in known)
+                for message, known in self.known.items()}
+
+
+def read_ciphertext(path: str, max_letters: Optional[int] = None) -> bytes:
+    """Letter buffer of a stored .dat file"""
+    with FileProcessor(os.path.dirname(path) or '.').open_content(path) as reader:
+        return text_to_buffer(reader.read(0, max_letters or reader.length))
+
+
+def _interactive(dragger: CribDragger, top: int) -> None:
+    """Read cribs from stdin; '@<offset> <first|second> <crib>' places one"""
+    print(f"{dragger.length} common letters. Enter a crib, '@<offset> <first|second> <crib>' to place one, "
+          f"or an empty line to quit.", file=sys.stderr)
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            break
+        try:
+            if line.startswith('@'):
+                offset, message, crib = line[1:].split(None, 2)
+                for name, text in dragger.place(crib, int(offset), message).items():
+                    print(f"{name:<7} {text}")
+            else:
+                for candidate in dragger.drag(line, top):
+                    print(f"{candidate['score']:8.3f}  {candidate['message']:<6} @{candidate['offset']:<6} "
+                          f"{candidate['revealed']}")
+        except ValueError as e:
+            print(f'error: {e}', file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Two-time pad detection and crib dragging')
+    commands = parser.add_subparsers(dest='command', required=True)
+    scan = commands.add_parser('scan', help='find stored ciphertexts that share a pad')
+    scan.add_argument('folder')
+    scan.add_argument('--max-letters', type=int, default=DEFAULT_OPTIONS['max_letters'])
+    scan.add_argument('--min-overlap', type=int, default=DEFAULT_OPTIONS['min_overlap'])
+    scan.add_argument('--alpha', type=float, default=DEFAULT_OPTIONS['alpha'])
+    drag = commands.add_parser('drag', help='crib drag two ciphertexts that share a pad')
+    drag.add_argument('first')
+    drag.add_argument('second')
+    drag.add_argument('--crib', help='crib to drag (default: read cribs interactively)')
+    drag.add_argument('--top', type=int, default=10)
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.command == 'scan':
+            report = scan_folder(args.folder, max_letters=args.max_letters, min_overlap=args.min_overlap,
+                                 alpha=args.alpha)
+            print(json.dumps(report, indent=2))
+            return 0 if report['pairs'] else 1
+        
+        dragger = CribDragger(read_ciphertext(args.first), read_ciphertext(args.second))
+        if args.crib:
+            print(json.dumps(dragger.drag(args.crib, args.top), indent=2))
+        else:
+            _interactive(dragger, args.top)
+        return 0
+    except (OSError, ValueError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
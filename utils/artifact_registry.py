@@ -0,0 +1,163 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Optional
+
+class ArtifactRegistry:
+    """SQLite index of generated files with expiry times, a disk quota and a background reaper"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS artifacts (
+            name TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            owner TEXT,
+            download_name TEXT,
+            created REAL NOT NULL,
+            expires REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS artifacts_expires ON artifacts (expires);
+    """
+    
+    def __init__(self, db_path: str, default_ttl: float = 24 * 60 * 60, quota_bytes: int = 1024 ** 3,
+                 reap_interval: float = 60):
+        self.db_path = db_path
+        self.default_ttl = default_ttl
+        self.quota_bytes = quota_bytes
+        self.reap_interval = reap_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper = None
+        self._listeners = []
+        
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(self.SCHEMA)
+    
+    def on_delete(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback invoked with each artifact row the registry deletes"""
+        self._listeners.append(listener)
+    
+    def register(self, path: str, kind: str, owner: Optional[str] = None, ttl: Optional[float] = None,
+                 download_name: Optional[str] = None) -> str:
+        """Index a generated file (or refresh its expiry) and return its public name"""
+        name = os.path.basename(path)
+        now = time.time()
+        expires = now + (self.default_ttl if ttl is None else ttl)
+        
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO artifacts (name, path, kind, size, owner, download_name, created, expires) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (name, path, kind, os.path.getsize(path), owner, download_name or name, now, expires))
+        
+        self.enforce_quota()
+        return name
+    
+    def resolve(self, name: str, kind: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Look up a live artifact by public name (and kind)"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM artifacts WHERE name = ? AND expires > ?',
+                                     (name, time.time())).fetchone()
+        
+        if row is None or (kind is not None and row['kind'] != kind):
+            return None
+        return dict(row)
+    
+    def unregister(self, name: str) -> None:
+        """Drop an artifact from the index without touching the file"""
+        with self._lock:
+            self._conn.execute('DELETE FROM artifacts WHERE name = ?', (name,))
+    
+    def _delete_rows(self, rows) -> int:
+        """Delete the files and index rows of the given artifacts"""
+        deleted = 0
+        for row in rows:
+            try:
+                os.remove(row['path'])
+                deleted += 1
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            
+            with self._lock:
+                self._conn.execute('DELETE FROM artifacts WHERE name = ? AND path = ?', (row['name'], row['path']))
+            for listener in self._listeners:
+                listener(dict(row))
+        return deleted
+    
+    def reap(self, now: Optional[float] = None) -> int:
+        """Delete every expired artifact, soonest expiry first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute('SELECT * FROM artifacts WHERE expires <= ? ORDER BY expires',
+                                      (now,)).fetchall()
+        return self._delete_rows(rows)
+    
+    def enforce_quota(self) -> int:
+        """Delete artifacts closest to expiry until total size fits the quota (keeps the newest one)"""
+        deleted = 0
+        
+        while True:
+            with self._lock:
+                count, total = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts').fetchone()
+                if total <= self.quota_bytes or count <= 1:
+                    return deleted
+                row = self._conn.execute('SELECT * FROM artifacts ORDER BY expires LIMIT 1').fetchone()
+            
+            if row is None:
+                return deleted
+            
+            self._delete_rows([row])
+            with self._lock:
+                # Drop the row even if its file could not be removed so the loop always progresses
+                self._conn.execute('DELETE FROM artifacts WHERE name = ?', (row['name'],))
+            deleted += 1
+    
+    def adopt_folder(self, folder: str, classify: Callable[[str], Optional[str]]) -> int:
+        """Index files already present in folder, expiring them relative to their mtime"""
+        adopted = 0
+        for filename in os.listdir(folder):
+            path = os.path.join(folder, filename)
+            kind = classify(filename)
+            if kind is None or not os.path.isfile(path) or self.resolve(filename) is not None:
+                continue
+            
+            age = time.time() - os.path.getmtime(path)
+            self.register(path, kind, ttl=max(self.default_ttl - age, 0))
+            adopted += 1
+        return adopted
+    
+    def usage(self) -> Dict[str, int]:
+        """Return the number and total size of indexed artifacts"""
+        with self._lock:
+            count, total = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts').fetchone()
+        return {'artifacts': count, 'bytes': total, 'quota_bytes': self.quota_bytes}
+    
+    def start_reaper(self) -> None:
+        """Start the background thread that deletes expired artifacts"""
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        
+        self._stop.clear()
+        self._reaper = threading.Thread(target=self._reap_loop, name='artifact-reaper', daemon=True)
+        self._reaper.start()
+    
+    def stop_reaper(self) -> None:
+        """Stop the background reaper thread"""
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join()
+    
+    def _reap_loop(self) -> None:
+        while not self._stop.wait(self.reap_interval):
+            try:
+                self.reap()
+            except Exception:
+                pass  # Keep reaping on the next tick
@@ -0,0 +1,133 @@
+import math
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import ChainMap
+from typing import Any, Callable, Dict, Mapping, Optional
+from ciphers.registry import CipherRegistry
+from ciphers.pipeline_cipher import PipelineCipher
+from utils.segment_runner import SegmentRunner
+
+# Cipher registry of a pool worker process; ciphers are created on first use
+_worker_ciphers: Mapping[str, Any] = {}
+_worker_segments = SegmentRunner(1)
+
+
+def _init_worker(segment_threads: int = 1) -> None:
+    """Build the lazy cipher registry and segment runner of a worker process"""
+    global _worker_ciphers, _worker_segments
+    registry = CipherRegistry()
+    _worker_ciphers = ChainMap({'pipeline': PipelineCipher(registry)}, registry)
+    _worker_segments = SegmentRunner(segment_threads)
+
+
+def _execute(cipher_type: str, operation: str, buffer: bytes, key, submitted: float) -> tuple:
+    """Run one cipher call in a worker process; returns (result, wait, service) in seconds"""
+    started = time.time()
+    result = _worker_segments.run(_worker_ciphers[cipher_type], operation, buffer, key)
+    return result, max(started - submitted, 0.0), time.time() - started
+
+
+class CipherQueueFull(Exception):
+    """Raised when the worker pool queue is full; retry_after is a hint in seconds"""
+    
+    def __init__(self, retry_after: int):
+        super().__init__('Server is busy, please retry later')
+        self.retry_after = retry_after
+
+
+class CipherExecutor:
+    """Runs large cipher calls in a bounded process pool and small ones inline"""
+    
+    def __init__(self, registry: Mapping[str, Any], max_workers: Optional[int] = None, max_queue: int = 32,
+                 inline_threshold: int = 64 * 1024, segment_threads: int = 1,
+                 on_complete: Optional[Callable[[float, float], None]] = None):
+        self.registry = registry
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.max_queue = max_queue
+        self.inline_threshold = inline_threshold
+        self.segment_threads = segment_threads
+        self.on_complete = on_complete
+        self.pending = 0
+        self.inline_calls = 0
+        self.offloaded_calls = 0
+        self.rejected_calls = 0
+        self.service_time = 0.0  # moving average of offloaded call duration
+        self._pool = None
+        self._lock = threading.Lock()
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                             initargs=(self.segment_threads,))
+        return self._pool
+    
+    def run(self, cipher_type: str, operation: str, buffer: bytes, key) -> bytes:
+        """Encrypt or decrypt a letter buffer, offloading it to the pool when it is large"""
+        cipher = self.registry[cipher_type]
+        if self.max_workers <= 0 or len(buffer) <= self.inline_threshold:
+            with self._lock:
+                self.inline_calls += 1
+            if operation == 'encrypt':
+                return cipher.encrypt_buffer(buffer, key)
+            return cipher.decrypt_buffer(buffer, key)
+        
+        # Validate the key here so bad keys fail fast without using a worker
+        cipher.compile_key(key)
+        
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected_calls += 1
+                raise CipherQueueFull(self.retry_after())
+            self.pending += 1
+            self.offloaded_calls += 1
+            pool = self._get_pool()
+        
+        try:
+            future = pool.submit(_execute, cipher_type, operation, bytes(buffer), key, time.time())
+            result, wait, service = future.result()
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool on the next call
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+        
+        with self._lock:
+            self.service_time = service if not self.service_time else 0.8 * self.service_time + 0.2 * service
+        if self.on_complete is not None:
+            self.on_complete(wait, service)
+        return result
+    
+    def queue_depth(self) -> int:
+        """Number of offloaded calls waiting for a free worker"""
+        return max(self.pending - self.max_workers, 0)
+    
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        backlog = self.queue_depth() + 1
+        return max(1, math.ceil(backlog * self.service_time / max(self.max_workers, 1)))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return pool counters"""
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'pending': self.pending,
+                'queue_depth': self.queue_depth(),
+                'max_queue': self.max_queue,
+                'inline': self.inline_calls,
+                'offloaded': self.offloaded_calls,
+                'rejected': self.rejected_calls
+            }
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
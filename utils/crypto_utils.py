@@ -1,11 +1,19 @@
 import string
-import random
 import os
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, Iterator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Affine 'a' values coprime with 26
+AFFINE_MULTIPLIERS = (1, 3, 5, 7, 9, 11, 15, 17, 19, 21, 23, 25)
 
 class CryptoUtils:
     """Utility functions for cryptographic operations"""
     
+    # Cipher types generate_random_keys can produce keys for
+    BULK_KEY_TYPES = ('shift', 'substitution', 'affine', 'vigenere', 'hill', 'permutation', 'playfair')
+    
     @staticmethod
     def analyze_text(text: str) -> Dict[str, Any]:
         """Analyze text for frequency analysis"""
@@ -41,42 +49,83 @@ class CryptoUtils:
     @staticmethod
     def generate_random_key(cipher_type: str) -> str:
         """Generate random key for specified cipher type"""
+        if cipher_type not in CryptoUtils.BULK_KEY_TYPES:
+            return ""
+        return next(CryptoUtils.generate_random_keys(cipher_type, 1))
+    
+    @staticmethod
+    def random_below(bound: int, shape) -> 'np.ndarray':
+        """Uniform integers in [0, bound) drawn from os.urandom, rejecting biased bytes"""
+        import numpy as np  # imported on first use to keep module import cheap
+        
+        count = int(np.prod(shape))
+        limit = 256 - 256 % bound
+        values = np.empty(0, dtype=np.uint8)
+        
+        while len(values) < count:
+            # Draw a little extra so one pass is almost always enough
+            needed = count - len(values)
+            raw = np.frombuffer(os.urandom(needed * 256 // limit + 16), dtype=np.uint8)
+            values = np.concatenate([values, raw[raw < limit]])
+        
+        return (values[:count] % bound).reshape(shape).astype(np.int64)
+    
+    @staticmethod
+    def _random_words(count: int, min_length: int, max_length: int) -> list:
+        """Random uppercase words with lengths in [min_length, max_length]"""
+        import numpy as np
+        
+        lengths = CryptoUtils.random_below(max_length - min_length + 1, count) + min_length
+        letters = (CryptoUtils.random_below(26, (count, max_length)) + ord('A')).astype(np.uint8)
+        return [row.tobytes()[:length].decode('ascii') for row, length in zip(letters, lengths)]
+    
+    @staticmethod
+    def _random_key_batch(cipher_type: str, count: int) -> list:
+        """Generate up to count keys in one vectorized draw (hill may return fewer)"""
+        import numpy as np
+        
         if cipher_type == 'shift':
-            return str(random.randint(1, 25))
+            return [str(value) for value in CryptoUtils.random_below(25, count) + 1]
         
         elif cipher_type == 'substitution':
-            alphabet = list(string.ascii_uppercase)
-            random.shuffle(alphabet)
-            return ''.join(alphabet)
+            # Sorting 64-bit random keys gives a uniformly random permutation per row
+            sort_keys = np.frombuffer(os.urandom(count * 26 * 8), dtype=np.uint64).reshape(count, 26)
+            letters = (np.argsort(sort_keys, axis=1) + ord('A')).astype(np.uint8)
+            return [row.tobytes().decode('ascii') for row in letters]
         
         elif cipher_type == 'affine':
-            # Generate coprime 'a' values
-            coprime_values = [1, 3, 5, 7, 9, 11, 15, 17, 19, 21, 23, 25]
-            a = random.choice(coprime_values)
-            b = random.randint(0, 25)
-            return f"{a},{b}"
+            a_values = np.array(AFFINE_MULTIPLIERS)[CryptoUtils.random_below(len(AFFINE_MULTIPLIERS), count)]
+            b_values = CryptoUtils.random_below(26, count)
+            return [f"{a},{b}" for a, b in zip(a_values, b_values)]
         
-        elif cipher_type == 'vigenere':
-            length = random.randint(3, 8)
-            return ''.join(random.choice(string.ascii_uppercase) for _ in range(length))
-        
-        elif cipher_type == 'hill':
-            # Generate random 2x2 matrix with determinant coprime to 26
-            while True:
-                matrix = [random.randint(0, 25) for _ in range(4)]
-                det = (matrix[0] * matrix[3] - matrix[1] * matrix[2]) % 26
-                if CryptoUtils.gcd(det, 26) == 1:
-                    return ','.join(map(str, matrix))
-        
-        elif cipher_type == 'permutation':
-            length = random.randint(3, 8)
-            return ''.join(random.choice(string.ascii_uppercase) for _ in range(length))
+        elif cipher_type in ('vigenere', 'permutation'):
+            return CryptoUtils._random_words(count, 3, 8)
         
         elif cipher_type == 'playfair':
-            length = random.randint(5, 10)
-            return ''.join(random.choice(string.ascii_uppercase) for _ in range(length))
+            return CryptoUtils._random_words(count, 5, 10)
+        
+        elif cipher_type == 'hill':
+            # Draw whole batches of 2x2 matrices and keep those with det coprime to 26
+            matrices = CryptoUtils.random_below(26, (count, 4))
+            det = (matrices[:, 0] * matrices[:, 3] - matrices[:, 1] * matrices[:, 2]) % 26
+            valid = matrices[(det % 2 != 0) & (det % 13 != 0)]
+            return [','.join(map(str, row)) for row in valid.tolist()]
         
-        return ""
+        raise ValueError(f"Cannot generate keys for cipher type '{cipher_type}'")
+    
+    @staticmethod
+    def generate_random_keys(cipher_type: str, count: int, batch_size: int = 4096) -> Iterator[str]:
+        """Yield count random keys, generated in batches from a CSPRNG"""
+        remaining = count
+        while remaining > 0:
+            size = min(remaining, batch_size)
+            if cipher_type == 'hill':
+                # About a third of random matrices are invertible mod 26
+                size = min(size * 3 + 16, batch_size * 3)
+            
+            for key in CryptoUtils._random_key_batch(cipher_type, size)[:remaining]:
+                yield key
+                remaining -= 1
     
     @staticmethod
     def gcd(a: int, b: int) -> int:
@@ -122,6 +171,19 @@ class CryptoUtils:
                 else:
                     result['message'] = 'Key must contain only letters'
             
+            elif cipher_type == 'onetimepad':
+                if key.startswith('file:'):
+                    # Only key files generated into the keys folder, never other paths on the server
+                    filename = key[5:]
+                    if filename and filename == os.path.basename(filename) and not filename.startswith('.'):
+                        result['valid'] = True
+                    else:
+                        result['message'] = 'Key file must be a file name inside the keys folder'
+                elif key and key.replace(' ', '').isalpha():
+                    result['valid'] = True
+                else:
+                    result['message'] = 'One-time pad key must contain only letters or be "file:<name>"'
+            
             elif cipher_type == 'hill':
                 parts = key.split(',')
                 if len(parts) == 4:
@@ -133,7 +195,7 @@ class CryptoUtils:
                         result['message'] = 'Matrix determinant must be coprime with 26'
                 else:
                     result['message'] = 'Hill key must contain 4 numbers for 2x2 matrix'
-            
+        
         except ValueError:
             result['message'] = 'Invalid key format'
         except Exception as e:
@@ -1,15 +1,149 @@
+import io
 import os
+import time
+import codecs
+import lzma
 import mimetypes
 import zipfile
 import tempfile
-from typing import List, Dict, Any
-from werkzeug.utils import secure_filename
+import zlib
+from typing import List, Dict, Any, Optional, Union, BinaryIO, Iterable, Iterator
+
+# Letters per entry of the block offset index written into encrypted files
+CONTENT_BLOCK_SIZE = 1024 * 1024
+
+# Payload compression name -> (compress one block, create a streaming decompressor)
+COMPRESSORS = {
+    'zlib': (lambda data: zlib.compress(data, 9), zlib.decompressobj),
+    'lzma': (lzma.compress, lzma.LZMADecompressor),
+}
+
+def payload_compression(metadata: Dict[str, Any]) -> Optional[str]:
+    """Compression of an encrypted file's payload, or None for plain letters"""
+    compression = metadata.get('compression')
+    if not compression or compression == 'none':
+        return None
+    if compression not in COMPRESSORS:
+        raise ValueError(f"Unsupported payload compression: {compression}")
+    return compression
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable write target that collects what zipfile writes until it is taken"""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class BoundedReader:
+    """Binary reader that fails once more than limit bytes have come out of the wrapped stream"""
+    
+    def __init__(self, stream: BinaryIO, limit: int):
+        self._stream = stream
+        self.limit = limit
+        self.consumed = 0
+    
+    def _take(self, reader, size: int) -> bytes:
+        # Never ask for more than one byte past the limit, even for unbounded reads
+        remaining = self.limit - self.consumed + 1
+        data = reader(remaining if size is None or size < 0 else min(size, remaining))
+        self.consumed += len(data)
+        if self.consumed > self.limit:
+            raise ValueError(f"Content is larger than {self.limit} bytes")
+        return data
+    
+    def read(self, size: int = -1) -> bytes:
+        return self._take(self._stream.read, size)
+    
+    def readline(self, size: int = -1) -> bytes:
+        return self._take(self._stream.readline, size)
+
+class EncryptedContentReader:
+    """Random access to the encrypted letters of a .dat file through its block offset index"""
+    
+    def __init__(self, file_path: str, processor: 'FileProcessor'):
+        self._file = open(file_path, 'rb')
+        try:
+            self.metadata = processor.read_header(self._file)
+            self.compression = payload_compression(self.metadata)
+        except Exception:
+            self._file.close()
+            raise
+        
+        self.data_start = self._file.tell()
+        self.data_length = os.path.getsize(file_path) - self.data_start
+        self._cached_block = (None, b'')
+        
+        if 'block_index' in self.metadata:
+            self.block_size = int(self.metadata['block_size'])
+            self.block_offsets = [int(offset) for offset in str(self.metadata['block_index']).split(',')]
+            self.length = int(self.metadata['content_length'])
+        else:
+            # Files written before the index existed hold plain letters after the header
+            self.block_size = CONTENT_BLOCK_SIZE
+            self.length = self.data_length
+            self.block_offsets = list(range(0, max(self.length, 1), self.block_size))
+    
+    def _read_block(self, block: int) -> bytes:
+        """Return the decompressed letters of one block, keeping the last one cached"""
+        if self._cached_block[0] != block:
+            start = self.block_offsets[block]
+            end = self.block_offsets[block + 1] if block + 1 < len(self.block_offsets) else self.data_length
+            self._file.seek(self.data_start + start)
+            # A block never holds more than block_size letters, whatever its compressed form expands to
+            data = COMPRESSORS[self.compression][1]().decompress(self._file.read(end - start), self.block_size + 1)
+            if len(data) > self.block_size:
+                raise ValueError(f"Compressed block {block} holds more than {self.block_size} letters")
+            self._cached_block = (block, data)
+        return self._cached_block[1]
+    
+    def read(self, start: int, length: int) -> str:
+        """Return the encrypted letters at positions [start, start + length)"""
+        start = max(0, min(start, self.length))
+        end = max(start, min(start + length, self.length))
+        parts = []
+        
+        position = start
+        while position < end:
+            block = position // self.block_size
+            block_start = block * self.block_size
+            block_end = min(block_start + self.block_size, end)
+            if self.compression:
+                parts.append(self._read_block(block)[position - block_start:block_end - block_start].decode('ascii'))
+            else:
+                self._file.seek(self.data_start + self.block_offsets[block] + position - block_start)
+                parts.append(self._file.read(block_end - position).decode('ascii'))
+            position = block_end
+        
+        return ''.join(parts)
+    
+    def close(self) -> None:
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
 
 class FileProcessor:
     """Advanced file processing for cryptographic operations"""
     
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, max_decompressed_bytes: Optional[int] = None):
         self.base_path = base_path
+        # Most letters a compressed payload may expand to (None: only its CONTENT_LENGTH bounds it)
+        self.max_decompressed_bytes = max_decompressed_bytes
         self.supported_text_extensions = {
             '.txt', '.md', '.py', '.js', '.html', '.css', '.json', '.xml', 
             '.csv', '.sql', '.php', '.java', '.cpp', '.c', '.h', '.rb', 
@@ -34,66 +168,251 @@ class FileProcessor:
             # Try to determine by content or default to binary
             return 'unknown'
     
-    def process_file_for_encryption(self, file_path: str, cipher_type: str) -> Dict[str, Any]:
-        """Process file for encryption with metadata preservation"""
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        filename = os.path.basename(file_path)
-        file_type = self.get_file_type(filename)
-        file_size = os.path.getsize(file_path)
-        mime_type = mimetypes.guess_type(file_path)[0]
+    def _read_source(self, source: Union[str, bytes, BinaryIO]) -> bytes:
+        """Read all bytes from a path, a bytes-like object or a binary file-like object"""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return f.read()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return bytes(source)
+        return source.read()
+    
+    def _source_filename(self, source: Union[str, bytes, BinaryIO], filename: Optional[str]) -> str:
+        """Resolve the filename of a source, which must be given for non-path sources"""
+        if isinstance(source, (str, os.PathLike)):
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"File not found: {source}")
+            return filename or os.path.basename(source)
+        if not filename:
+            raise ValueError("A filename is required when processing an uploaded stream")
+        return filename
+    
+    def process_file_for_encryption(self, source: Union[str, bytes, BinaryIO], cipher_type: str,
+                                    filename: Optional[str] = None) -> Dict[str, Any]:
+        """Process a file path, buffer or stream for encryption with metadata preservation"""
+        filename = self._source_filename(source, filename)
         
         # Read file content
-        with open(file_path, 'rb') as f:
-            content = f.read()
+        content = self._read_source(source)
         
-        # Create metadata
-        metadata = {
+        return {
+            'content': content,
+            'metadata': self.build_metadata(filename, len(content), cipher_type),
+            'filename': filename
+        }
+    
+    def build_metadata(self, filename: str, file_size: int, cipher_type: str) -> Dict[str, Any]:
+        """Create the metadata header fields for a file about to be encrypted"""
+        file_type = self.get_file_type(filename)
+        return {
             'original_filename': filename,
             'original_extension': os.path.splitext(filename)[1],
             'file_type': file_type,
             'file_size': file_size,
-            'mime_type': mime_type,
+            'mime_type': mimetypes.guess_type(filename)[0],
             'cipher_type': cipher_type,
             'is_binary': file_type != 'text'
         }
+    
+    def create_encrypted_file(self, encrypted_content: str, metadata: Dict[str, Any], output_path: str,
+                              compression: Optional[str] = None) -> str:
+        """Create encrypted file with embedded metadata, optionally compressing the payload"""
+        blocks = self.encode_blocks((encrypted_content[i:i + CONTENT_BLOCK_SIZE]
+                                     for i in range(0, len(encrypted_content), CONTENT_BLOCK_SIZE)), compression)
         
-        return {
-            'content': content,
-            'metadata': metadata,
-            'filename': filename
-        }
+        # Combine metadata, the block offset index and encrypted content
+        header = self.format_header(self.index_metadata(metadata, len(encrypted_content), blocks, compression))
+        
+        # Write to file
+        with open(output_path, 'wb') as f:
+            f.write(header.encode('utf-8'))
+            for block in blocks:
+                f.write(block)
+        
+        return output_path
+    
+    def encode_blocks(self, blocks: Iterable[str], compression: Optional[str] = None) -> List[bytes]:
+        """Encode payload blocks of CONTENT_BLOCK_SIZE letters, compressing each one independently"""
+        if compression and compression not in COMPRESSORS:
+            raise ValueError(f"Unsupported payload compression: {compression}")
+        
+        encoded = [block.encode('ascii') for block in blocks]
+        if compression:
+            compress = COMPRESSORS[compression][0]
+            encoded = [compress(block) for block in encoded] or [compress(b'')]
+        return encoded
+    
+    def write_blocks(self, f: BinaryIO, blocks: Iterable[str], compression: Optional[str] = None) -> tuple:
+        """Encode and write payload blocks as they arrive; returns (content length, block offsets)"""
+        if compression and compression not in COMPRESSORS:
+            raise ValueError(f"Unsupported payload compression: {compression}")
+        
+        content_length, offsets, written = 0, [], 0
+        for block in blocks:
+            data = block.encode('ascii')
+            if compression:
+                data = COMPRESSORS[compression][0](data)
+            offsets.append(written)
+            f.write(data)
+            written += len(data)
+            content_length += len(block)
+        
+        if not offsets:
+            offsets.append(0)
+            if compression:
+                f.write(COMPRESSORS[compression][0](b''))
+        return content_length, offsets
+    
+    def index_metadata(self, metadata: Dict[str, Any], content_length: int, blocks: Optional[List[bytes]] = None,
+                       compression: Optional[str] = None, offsets: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Add the content length, compression and block offset index of a payload to metadata"""
+        if offsets is not None:
+            offsets = list(offsets)
+        elif blocks is None:
+            offsets = list(range(0, max(content_length, 1), CONTENT_BLOCK_SIZE))
+        else:
+            offsets = [0]
+            for block in blocks[:-1]:
+                offsets.append(offsets[-1] + len(block))
+        
+        indexed = dict(metadata, content_length=content_length, block_size=CONTENT_BLOCK_SIZE,
+                       block_index=','.join(map(str, offsets)))
+        if compression:
+            indexed['compression'] = compression
+        return indexed
+    
+    def open_content(self, file_path: str) -> EncryptedContentReader:
+        """Open an encrypted file for random access to its encrypted letters"""
+        return EncryptedContentReader(file_path, self)
     
-    def create_encrypted_file(self, encrypted_content: str, metadata: Dict[str, Any], output_path: str) -> str:
-        """Create encrypted file with embedded metadata"""
-        # Create metadata header
+    def format_header(self, metadata: Dict[str, Any], size: Optional[int] = None) -> str:
+        """Render metadata as the header that precedes the encrypted content, padded to size bytes if given"""
         metadata_lines = []
         for key, value in metadata.items():
             metadata_lines.append(f"{key.upper()}:{value}")
         
-        metadata_header = '\n'.join(metadata_lines)
+        header = '\n'.join(metadata_lines) + "\n---ENCRYPTED_CONTENT---\n"
+        if size is None:
+            return header
         
-        # Combine metadata and encrypted content
-        full_content = f"{metadata_header}\n---ENCRYPTED_CONTENT---\n{encrypted_content}"
-        
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(full_content)
+        # The filler line holds no ':' so the metadata parser skips it
+        gap = size - len(header.encode('utf-8'))
+        if gap < 2:
+            raise ValueError("Header does not fit in the space reserved for it")
+        return '\n'.join(metadata_lines) + '\n' + ' ' * (gap - 1) + "\n---ENCRYPTED_CONTENT---\n"
+    
+    def header_capacity(self, metadata: Dict[str, Any], max_content_length: int,
+                        compression: Optional[str] = None) -> int:
+        """Bytes to reserve for a header whose content length and block index are written after the payload"""
+        blocks = max(-(-max_content_length // CONTENT_BLOCK_SIZE), 1)
+        # Compressed blocks can come out slightly larger than the letters they hold
+        largest_offset = 2 * max_content_length + 1024 * blocks
+        widest = dict(self.index_metadata(metadata, max_content_length, compression=compression),
+                      content_length=max_content_length,
+                      block_index=','.join([str(largest_offset)] * blocks))
+        return len(self.format_header(widest).encode('utf-8')) + 2
+    
+    def read_header(self, f: BinaryIO) -> Dict[str, Any]:
+        """Read the metadata header from an open binary file, leaving f at the encrypted content"""
+        header = []
+        for line in iter(f.readline, b''):
+            line = line.decode('utf-8')
+            if line.rstrip('\r\n') == '---ENCRYPTED_CONTENT---':
+                return self._parse_metadata(''.join(header).replace('\r\n', '\n').replace('\r', '\n'))
+            header.append(line)
         
-        return output_path
+        raise ValueError("Invalid encrypted file format")
+    
+    def decompressed_limit(self, metadata: Dict[str, Any], max_bytes: Optional[int] = None) -> Optional[int]:
+        """Most bytes a compressed payload may expand to: its CONTENT_LENGTH and the configured caps"""
+        limits = [limit for limit in (self.max_decompressed_bytes, max_bytes) if limit is not None]
+        content_length = metadata.get('content_length')
+        if isinstance(content_length, int):
+            limits.append(content_length)
+        return min(limits) if limits else None
     
-    def parse_encrypted_file(self, file_path: str) -> Dict[str, Any]:
-        """Parse encrypted file to extract metadata and content"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+    def iter_content(self, stream: BinaryIO, metadata: Dict[str, Any], chunk_size: int = 64 * 1024,
+                     max_bytes: Optional[int] = None) -> Iterator[str]:
+        """Yield the encrypted letters after the header in chunks, decompressing on the fly
         
-        if '---ENCRYPTED_CONTENT---' not in content:
-            raise ValueError("Invalid encrypted file format")
+        A compressed payload that expands past decompressed_limit raises ValueError; no
+        decompression step produces more than chunk_size bytes, so the check costs no memory.
+        """
+        compression = payload_compression(metadata)
+        chunks = iter(lambda: stream.read(chunk_size), b'')
+        
+        if compression is None:
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            for chunk in chunks:
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            text = decoder.decode(b'', final=True)
+            if text:
+                yield text
+            return
+        
+        limit = self.decompressed_limit(metadata, max_bytes)
+        produced = 0
+        new_decompressor = COMPRESSORS[compression][1]
+        decompressor, started = new_decompressor(), False
+        for chunk in chunks:
+            while chunk:
+                data = decompressor.decompress(chunk, chunk_size)
+                started = True
+                while True:
+                    produced += len(data)
+                    if limit is not None and produced > limit:
+                        raise ValueError(f"Compressed payload expands to more than {limit} bytes")
+                    if data:
+                        yield data.decode('ascii')
+                    # zlib keeps input it could not decompress yet in unconsumed_tail; LZMA buffers
+                    # it and clears needs_input until the pending output has been read
+                    pending = getattr(decompressor, 'unconsumed_tail', b'')
+                    if decompressor.eof or not (pending or len(data) == chunk_size
+                                                or not getattr(decompressor, 'needs_input', True)):
+                        break
+                    data = decompressor.decompress(pending, chunk_size)
+                
+                if decompressor.eof:
+                    # The next compressed block starts right after this one
+                    chunk = decompressor.unused_data
+                    decompressor, started = new_decompressor(), False
+                else:
+                    chunk = b''
+        
+        if started:
+            raise ValueError("Compressed payload is truncated")
+    
+    def open_encrypted_stream(self, stream: BinaryIO, chunk_size: int = 64 * 1024,
+                              max_bytes: Optional[int] = None) -> tuple:
+        """Read the header of an encrypted binary stream; returns (metadata, iterator of content chunks)"""
+        metadata = self.read_header(stream)
+        return metadata, self.iter_content(stream, metadata, chunk_size, max_bytes)
+    
+    def read_metadata(self, file_path: str) -> Dict[str, Any]:
+        """Read only the metadata header of an encrypted file"""
+        with open(file_path, 'rb') as f:
+            return self.read_header(f)
+    
+    def parse_encrypted_file(self, source: Union[str, bytes, BinaryIO]) -> Dict[str, Any]:
+        """Parse an encrypted file path, buffer or stream to extract metadata and content"""
+        stream = io.BytesIO(self._read_source(source))
+        metadata = self.read_header(stream)
         
-        metadata_part, encrypted_content = content.split('---ENCRYPTED_CONTENT---\n', 1)
+        if payload_compression(metadata):
+            encrypted_content = ''.join(self.iter_content(stream, metadata))
+        else:
+            # Decode with universal newlines, as reading the file in text mode did
+            encrypted_content = stream.read().decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
         
-        # Parse metadata
+        return {
+            'metadata': metadata,
+            'encrypted_content': encrypted_content.strip()
+        }
+    
+    def _parse_metadata(self, metadata_part: str) -> Dict[str, Any]:
+        """Parse KEY:value metadata header lines"""
         metadata = {}
         for line in metadata_part.strip().split('\n'):
             if ':' in line:
@@ -109,35 +428,63 @@ class FileProcessor:
                 
                 metadata[key.lower()] = value
         
-        return {
-            'metadata': metadata,
-            'encrypted_content': encrypted_content.strip()
-        }
+        return metadata
     
-    def restore_binary_file(self, decrypted_text: str, output_path: str) -> str:
-        """Restore binary file from decrypted text representation"""
-        binary_data = []
+    def encode_binary_content(self, content: bytes) -> str:
+        """Convert raw bytes to the escaped text representation used for encryption"""
+        return ''.join(chr(b) if b < 128 else f'\\x{b:02x}' for b in content)
+    
+    def _restore_escapes(self, text: str, final: bool) -> tuple:
+        """Decode \\xHH escapes; returns (bytes, tail that may continue in the next chunk)"""
+        data = bytearray()
         i = 0
         
-        while i < len(decrypted_text):
-            if i + 3 < len(decrypted_text) and decrypted_text[i:i+2] == '\\x':
-                # Hex encoded byte
-                try:
-                    hex_val = decrypted_text[i+2:i+4]
-                    binary_data.append(int(hex_val, 16))
-                    i += 4
-                except ValueError:
-                    # Invalid hex, treat as regular character
-                    binary_data.append(ord(decrypted_text[i]))
-                    i += 1
+        while i < len(text):
+            j = text.find('\\', i)
+            if j == -1:
+                # Regular ASCII characters up to the end
+                data += text[i:].encode('latin-1')
+                break
+            data += text[i:j].encode('latin-1')
+            
+            if j + 3 < len(text):
+                if text[j + 1] == 'x':
+                    # Hex encoded byte
+                    try:
+                        data.append(int(text[j + 2:j + 4], 16))
+                        i = j + 4
+                        continue
+                    except ValueError:
+                        pass  # Invalid hex, treat as regular character
+                data.append(ord('\\'))
+                i = j + 1
+            elif final:
+                data.append(ord('\\'))
+                i = j + 1
             else:
-                # Regular ASCII character
-                binary_data.append(ord(decrypted_text[i]))
-                i += 1
+                # Possibly an escape split across chunks
+                return bytes(data), text[j:]
+        
+        return bytes(data), ''
+    
+    def restore_binary_chunks(self, chunks: Iterable[str]) -> Iterator[bytes]:
+        """Restore binary data from decrypted text that arrives in chunks"""
+        carry = ''
+        for chunk in chunks:
+            data, carry = self._restore_escapes(carry + chunk, final=False)
+            if data:
+                yield data
         
+        data, _ = self._restore_escapes(carry, final=True)
+        if data:
+            yield data
+    
+    def restore_binary_file(self, decrypted_text: str, output_path: str) -> str:
+        """Restore binary file from decrypted text representation"""
         # Write binary data to file
         with open(output_path, 'wb') as f:
-            f.write(bytes(binary_data))
+            for data in self.restore_binary_chunks([decrypted_text]):
+                f.write(data)
         
         return output_path
     
@@ -153,6 +500,25 @@ class FileProcessor:
         
         return package_path
     
+    def iter_zip(self, entries: Iterable[tuple]) -> Iterator[bytes]:
+        """Build a ZIP archive of (name, byte chunks) entries on the fly, yielding its bytes as they are written"""
+        # zipfile writes data descriptors instead of seeking back when the target cannot seek
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for name, chunks in entries:
+                with zipf.open(name, 'w') as member:
+                    for chunk in chunks:
+                        member.write(chunk)
+                        data = sink.take()
+                        if data:
+                            yield data
+                data = sink.take()
+                if data:
+                    yield data
+        data = sink.take()
+        if data:
+            yield data
+    
     def cleanup_temp_files(self, file_paths: List[str]) -> None:
         """Clean up temporary files"""
         for file_path in file_paths:
@@ -162,29 +528,41 @@ class FileProcessor:
             except Exception:
                 pass  # Ignore cleanup errors
     
-    def get_file_info(self, file_path: str) -> Dict[str, Any]:
-        """Get comprehensive file information"""
-        if not os.path.exists(file_path):
-            return None
+    def get_file_info(self, source: Union[str, BinaryIO], filename: Optional[str] = None) -> Dict[str, Any]:
+        """Get comprehensive information about a file path or an uploaded stream"""
+        if isinstance(source, (str, os.PathLike)):
+            if not os.path.exists(source):
+                return None
+            
+            stat = os.stat(source)
+            filename = filename or os.path.basename(source)
+            size, created, modified = stat.st_size, stat.st_ctime, stat.st_mtime
+        else:
+            if not filename:
+                raise ValueError("A filename is required when inspecting an uploaded stream")
+            
+            # Measure the stream without reading it into memory
+            position = source.tell()
+            size = source.seek(0, os.SEEK_END) - position
+            source.seek(position)
+            created = modified = time.time()
         
-        stat = os.stat(file_path)
-        filename = os.path.basename(file_path)
         name, ext = os.path.splitext(filename)
-        mime_type = mimetypes.guess_type(file_path)[0]
+        mime_type = mimetypes.guess_type(filename)[0]
         file_type = self.get_file_type(filename)
         
         return {
             'filename': filename,
             'name': name,
             'extension': ext,
-            'size': stat.st_size,
-            'size_human': self._format_file_size(stat.st_size),
+            'size': size,
+            'size_human': self._format_file_size(size),
             'mime_type': mime_type,
             'file_type': file_type,
             'is_text': file_type == 'text',
             'is_binary': file_type != 'text',
-            'created': stat.st_ctime,
-            'modified': stat.st_mtime
+            'created': created,
+            'modified': modified
         }
     
     def _format_file_size(self, size_bytes: int) -> str:
@@ -0,0 +1,137 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Metrics:
+    """In-process counters and latency histograms exported in Prometheus text format"""
+
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, prefix: str = 'cryptosystem', buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._descriptions: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, Any], float]]]] = []
+
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        """Register the type and help text of a metric"""
+        self._descriptions[name] = (metric_type, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Increment a counter"""
+        key = self._label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to an absolute value"""
+        key = self._label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a value in a histogram"""
+        key = self._label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                # One slot per bucket, one for +Inf, then sum and count
+                state = series[key] = [0.0] * (len(self.buckets) + 3)
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time_stage(self, stage: str, **labels):
+        """Time a block of code as one stage of a request"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_duration_seconds', time.perf_counter() - start, stage=stage, **labels)
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Dict[str, Any], float]]]) -> None:
+        """Register a callable yielding (name, type, help, labels, value) samples at render time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            histograms = {name: {key: list(state) for key, state in series.items()}
+                          for name, series in self._histograms.items()}
+
+        for name in sorted(counters):
+            self._render_header(lines, name, 'counter')
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{self.prefix}_{name}{self._format_labels(key)} {self._format_value(value)}")
+
+        for name in sorted(gauges):
+            self._render_header(lines, name, 'gauge')
+            for key, value in sorted(gauges[name].items()):
+                lines.append(f"{self.prefix}_{name}{self._format_labels(key)} {self._format_value(value)}")
+
+        for name in sorted(histograms):
+            self._render_header(lines, name, 'histogram')
+            for key, state in sorted(histograms[name].items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, state):
+                    cumulative += count
+                    labels = self._format_labels(key + (('le', self._format_value(bound)),))
+                    lines.append(f"{self.prefix}_{name}_bucket{labels} {self._format_value(cumulative)}")
+                cumulative += state[len(self.buckets)]
+                labels = self._format_labels(key + (('le', '+Inf'),))
+                lines.append(f"{self.prefix}_{name}_bucket{labels} {self._format_value(cumulative)}")
+                lines.append(f"{self.prefix}_{name}_sum{self._format_labels(key)} {self._format_value(state[-2])}")
+                lines.append(f"{self.prefix}_{name}_count{self._format_labels(key)} {self._format_value(state[-1])}")
+
+        rendered_headers = set()
+        for collector in self._collectors:
+            for name, metric_type, help_text, labels, value in collector():
+                if name not in rendered_headers:
+                    lines.append(f"# HELP {self.prefix}_{name} {help_text}")
+                    lines.append(f"# TYPE {self.prefix}_{name} {metric_type}")
+                    rendered_headers.add(name)
+                lines.append(f"{self.prefix}_{name}{self._format_labels(self._label_key(labels))} {self._format_value(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+    def _render_header(self, lines: List[str], name: str, default_type: str) -> None:
+        metric_type, help_text = self._descriptions.get(name, (default_type, name.replace('_', ' ')))
+        lines.append(f"# HELP {self.prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {self.prefix}_{name} {metric_type}")
+
+    @staticmethod
+    def _label_key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((k, '' if v is None else str(v)) for k, v in labels.items()))
+
+    @staticmethod
+    def _format_labels(key: LabelKey) -> str:
+        if not key:
+            return ''
+        escaped = []
+        for name, value in key:
+            value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{name}="{value}"')
+        return '{' + ','.join(escaped) + '}'
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
@@ -0,0 +1,167 @@
+import os
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+class _Flight:
+    """A computation in progress that concurrent identical requests wait on"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.path = None
+        self.error = None
+
+class ResultCache:
+    """Content-addressed LRU cache of encrypted files with single-flight computation"""
+    
+    def __init__(self, folder: str, max_bytes: int, prefix: str = 'cache_',
+                 on_evict: Optional[Callable[[str], None]] = None):
+        self.folder = folder
+        self.on_evict = on_evict
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        
+        os.makedirs(folder, exist_ok=True)
+        self._load()
+    
+    def _load(self) -> None:
+        """Index cache files left by a previous run, least recently used first"""
+        found = []
+        for filename in os.listdir(self.folder):
+            if self.owns(filename):
+                stat = os.stat(os.path.join(self.folder, filename))
+                found.append((stat.st_mtime, filename[len(self.prefix):-len('.dat')], stat.st_size))
+        
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+    
+    @staticmethod
+    def make_key(cipher_type: str, key_fingerprint: str, content: bytes, filename: str, variant: str = '') -> str:
+        """Hash (cipher type, compiled key, content digest, filename, output variant) into a cache key"""
+        content_digest = hashlib.sha256(content).hexdigest()
+        material = '\0'.join([cipher_type, key_fingerprint, content_digest, filename, variant])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def owns(self, filename: str) -> bool:
+        """Check whether a filename in the cache folder belongs to the cache"""
+        return filename.startswith(self.prefix) and filename.endswith('.dat')
+    
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.folder, f"{self.prefix}{key}.dat")
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached file path for key, or None"""
+        with self._lock:
+            return self._lookup(key)
+    
+    def _lookup(self, key: str) -> Optional[str]:
+        if key not in self._entries:
+            return None
+        
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            # Removed behind our back
+            self.total_bytes -= self._entries.pop(key)
+            return None
+        
+        self._entries.move_to_end(key)
+        try:
+            os.utime(path)  # Keep recency across restarts
+        except OSError:
+            pass
+        return path
+    
+    def get_or_compute(self, key: str, compute: Callable[[str], None]) -> Tuple[str, bool]:
+        """Return (path, cached), running compute(path) once even for concurrent callers"""
+        with self._lock:
+            path = self._lookup(key)
+            if path:
+                self.hits += 1
+                return path, True
+            
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+        
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            with self._lock:
+                self.coalesced += 1
+            return flight.path, True
+        
+        path = self.path_for(key)
+        try:
+            # Write under a unique name so readers never see a partial file
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            try:
+                compute(temp_path)
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            
+            with self._lock:
+                size = os.path.getsize(path)
+                if key in self._entries:
+                    self.total_bytes -= self._entries.pop(key)
+                self._entries[key] = size
+                self.total_bytes += size
+                self._evict()
+            
+            flight.path = path
+            return path, False
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.event.set()
+    
+    def _evict(self) -> None:
+        """Delete least recently used files until the byte budget is met (keeps the newest entry)"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+            if self.on_evict is not None:
+                self.on_evict(self.path_for(key))
+    
+    def discard(self, filename: str) -> None:
+        """Forget a cache file that was deleted by someone else"""
+        key = filename[len(self.prefix):-len('.dat')]
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)
+    
+    def stats(self) -> Dict[str, int]:
+        """Return cache counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions
+            }
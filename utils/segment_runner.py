@@ -0,0 +1,66 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+class SegmentRunner:
+    """Encrypts or decrypts one large letter buffer as aligned segments on a thread pool"""
+    
+    def __init__(self, threads: Optional[int] = None, segment_size: int = 4 * 1024 * 1024,
+                 min_parallel_bytes: int = 8 * 1024 * 1024):
+        self.threads = (os.cpu_count() or 1) if threads is None else threads
+        self.segment_size = segment_size
+        self.min_parallel_bytes = min_parallel_bytes
+        self._pool = None
+        self._lock = threading.Lock()
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='cipher-segment')
+            return self._pool
+    
+    def run(self, cipher, operation: str, buffer: bytes, key, start: int = 0) -> bytes:
+        """Encrypt or decrypt the letters at position start of a text, splitting them across threads when the cipher allows it"""
+        block_size = None
+        if self.threads > 1 and len(buffer) >= self.min_parallel_bytes:
+            block_size = cipher.segment_block_size(key, operation)
+        if block_size is None:
+            if start:
+                return cipher.encrypt_at(buffer, start, key) if operation == 'encrypt' else cipher.decrypt_at(buffer, start, key)
+            if operation == 'encrypt':
+                return cipher.encrypt_buffer(buffer, key)
+            return cipher.decrypt_buffer(buffer, key)
+        
+        import numpy as np  # imported on first use to keep module import cheap
+        
+        letters = np.frombuffer(buffer, dtype=np.uint8)
+        aligned = len(letters) - len(letters) % block_size
+        
+        # The last partial block may grow (Hill pads it), so it is done first to size the output
+        tail = buffer[aligned:]
+        if tail:
+            tail = (cipher.encrypt_at(tail, start + aligned, key) if operation == 'encrypt'
+                    else cipher.decrypt_at(tail, start + aligned, key))
+        out = np.empty(aligned + len(tail), dtype=np.uint8)
+        out[aligned:] = np.frombuffer(tail, dtype=np.uint8)
+        
+        # Every thread writes its segment straight into the shared output array
+        step = max(block_size, self.segment_size - self.segment_size % block_size)
+        pool = self._get_pool()
+        futures = []
+        for offset in range(0, aligned, step):
+            end = min(offset + step, aligned)
+            futures.append(pool.submit(cipher.transform_into, letters[offset:end], out[offset:end], start + offset,
+                                       key, operation))
+        for future in futures:
+            future.result()
+        
+        return out.tobytes()
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None